@@ -25,6 +25,7 @@ class AppConfigurationObject:
     - random_name_length (int): The length of the random name to be generated.
     - colors (ColorHelper): The color settings for the application.
     - resize_mode (int): The current resize mode (0 for adjust, 1 for stretch).
+    - poster_mode (bool): If True, videos are first shown as a contact sheet of frames, and only played on demand.
     """
     
     def __init__(self, config_fp: str) -> None:
@@ -44,6 +45,7 @@ class AppConfigurationObject:
 
         self._color_config: ColorHelper = ColorHelper(app_config)
         self._random_name_length: int = app_config['random_name_length']
+        self._poster_mode: bool = app_config.get('poster_mode', False)
         
     @property
     def config_file_path(self) -> str:
@@ -61,6 +63,13 @@ class AppConfigurationObject:
     def resize_mode(self) -> int:
         return self._resize_mode
  
+    @property
+    def poster_mode(self) -> bool:
+        return self._poster_mode
+
+    def set_poster_mode(self, boolvar: bool) -> None:
+        self._poster_mode = boolvar
+
     def is_in_adjust_mode(self) -> bool:
         return self.resize_mode == 0
 
@@ -79,6 +88,7 @@ class AppConfigurationObject:
 
             'resize_mode': 'adjust' if self.is_in_adjust_mode() else 'stretch',
             'random_name_length': self.random_name_length,
+            'poster_mode': self.poster_mode,
 
             'background1_color': self.colors.background1_color,
             'background2_color': self.colors.background2_color,
@@ -1,6 +1,8 @@
 
 
 from src.core.assertion_helper import AssertionHelper
+from src.core.video_decoder import VideoDecoder
+from src.core.header_probe import HeaderProbe
 
 from PIL import Image
 import cv2
@@ -16,10 +18,14 @@ class FileObject:
     FileObject is a base class for representing and managing a file within the application.
     It provides methods for validating file paths and retrieving metadata such as the file name, size, and timestamps
     for when the file was last accessed or modified.
+    The metadata is read once (a single os.stat, plus the header of the file in the subclasses) and cached on the object,
+    until the path of the file changes.
 
     Methods:
-    - set_new_path(new_fp: str): Sets a new file path after verifying its validity.
+    - set_new_path(new_fp: str): Sets a new file path after verifying its validity, and forgets the cached metadata.
     - get_file_data(): Returns a dictionary containing metadata such as the file's path, name, size, last opened, and last modified times.
+    - load_metadata(): Reads and caches the metadata of the file (can be called from a prefetch thread).
+    - invalidate_metadata(): Forgets the cached metadata, which will be read again on the next access.
     - close(): Placeholder method, can be extended in subclasses for resource management.
 
     Properties:
@@ -27,6 +33,8 @@ class FileObject:
     - dirname (str): Returns the directory of the file.
     - filename (str): Returns the name of the file.
     - extension (str): Returns the file's extension (e.g., .txt, .png).
+    - stat (os.stat_result): Returns the (cached) os.stat result of the file.
+    - has_metadata (bool): Returns True if the metadata of the file is already cached.
     - filesize (int): Returns the size of the file in bytes.
     - last_opened (str): Returns a string representing the last time the file was accessed.
     - last_modified (str): Returns a string representing the last time the file was modified.
@@ -38,10 +46,27 @@ class FileObject:
     def __init__(self, fp: str) -> None:
         AssertionHelper.verify_filepath(fp=fp)
         self._fp: str = fp
+        self._stat: os.stat_result | None = None
 
     def set_new_path(self, new_fp: str) -> None:
         AssertionHelper.verify_filepath(fp=new_fp)
         self._fp = new_fp
+        self.invalidate_metadata()
+
+    def invalidate_metadata(self) -> None:
+        self._stat = None
+
+    def load_metadata(self) -> None:
+        self._stat = os.stat(self.path)
+
+    @property
+    def has_metadata(self) -> bool:
+        return self._stat is not None
+
+    @property
+    def stat(self) -> os.stat_result:
+        if self._stat is None: self._stat = os.stat(self.path)
+        return self._stat
 
     @property
     def path(self) -> str:
@@ -61,15 +86,15 @@ class FileObject:
     
     @property
     def filesize(self) -> int:
-        return os.path.getsize(self.path)
+        return self.stat.st_size
     
     @property
     def last_opened(self) -> str:
-        return datetime.fromtimestamp(os.path.getatime(self.path)).strftime("%Y-%m-%d %H:%M:%S")
+        return datetime.fromtimestamp(self.stat.st_atime).strftime("%Y-%m-%d %H:%M:%S")
     
     @property
     def last_modified(self) -> str:
-        return datetime.fromtimestamp(os.path.getmtime(self.path)).strftime("%Y-%m-%d %H:%M:%S")
+        return datetime.fromtimestamp(self.stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
     
     def get_file_data(self) -> dict[str: str | int]:
         return {
@@ -89,33 +114,96 @@ class ImageObject(FileObject):
 
     """
     ImageObject is a subclass of FileObject, specifically designed to handle image files.
-    In addition to the basic file operations provided by FileObject, ImageObject adds functionality to retrieve image dimensions.
+    In addition to the basic file operations provided by FileObject, ImageObject adds functionality to retrieve image dimensions
+    and to load the image at a reduced resolution, when only a smaller version is needed (e.g. for display).
+    The header of the image (dimensions, EXIF orientation) is read once (see HeaderProbe) and cached with the other metadata.
 
     Methods:
-    - get_file_data(): Returns a dictionary containing the file's metadata and the dimensions of the image.
+    - get_file_data(): Returns a dictionary containing the file's metadata, the dimensions and the EXIF orientation of the image.
+    - load_for_size(target_size: tuple[int, int]) -> Image: Loads the image, decoding only the resolution needed to be resized
+    to target_size afterwards (JPEG draft mode, integer reduce for the other formats). The returned image is at least as big as target_size.
 
     Properties:
     - dimension (tuple): Returns the width and height of the image as a tuple (width, height). If the dimensions cannot be retrieved, it returns None.
+    - orientation (int): Returns the EXIF orientation of the image (1 if unknown).
+    - header (dict): Returns the (cached) header information of the image ('dimension', 'orientation').
 
     Raises:
     - Exception: If there is an issue when trying to open the image to retrieve its dimensions.
     """
 
+    # Ratio minimal gardé entre l'image réduite et la taille cible, pour que le resize final reste de bonne qualité.
+    REDUCING_GAP: int = 2
+    EXIF_ORIENTATION_TAG: int = 0x0112
+
     def __init__(self, fp: str) -> None:
         super().__init__(fp)
+        self._header: dict | None = None
+
+    def invalidate_metadata(self) -> None:
+        super().invalidate_metadata()
+        self._header = None
+
+    def load_metadata(self) -> None:
+        super().load_metadata()
+        self._header = self._read_header()
 
     @property
-    def dimension(self) -> tuple:
+    def has_metadata(self) -> bool:
+        return super().has_metadata and self._header is not None
+
+    def _read_header(self) -> dict:
+
+        # Les formats courants sont lus directement dans l'en-tête, sans passer par PIL.
+        probed: dict | None = HeaderProbe.probe(self.path)
+        if probed is not None: return {'dimension': probed['dimension'], 'orientation': probed.get('orientation', 1)}
+
+        # Sinon, Image.open ne lit que l'en-tête du fichier, les pixels ne sont décodés qu'au load.
         try:
             with Image.open(self.path) as img:
-                return img.size
+                return {'dimension': img.size, 'orientation': img.getexif().get(self.EXIF_ORIENTATION_TAG, 1)}
         except Exception as img_exception:
             print(f"[W] Impossible de récupérer les dimensions de l'image @ {self.path}. (e: {img_exception})")
-            return None
+            return {'dimension': None, 'orientation': 1}
+
+    @property
+    def header(self) -> dict:
+        if self._header is None: self._header = self._read_header()
+        return self._header
+
+    def load_for_size(self, target_size: tuple[int, int]) -> Image:
+
+        target_width, target_height = max(1, target_size[0]), max(1, target_size[1])
+
+        with Image.open(self.path) as pil_image:
+
+            # Les JPEG peuvent être décodés directement en 1/2, 1/4 ou 1/8 de leur résolution (sans descendre sous target_size).
+            # Pour les autres formats, draft ne fait rien.
+            pil_image.draft(None, (target_width * self.REDUCING_GAP, target_height * self.REDUCING_GAP))
+            pil_image.load()
+
+        # On réduit ensuite d'un facteur entier (bien moins coûteux qu'un LANCZOS sur l'image entière).
+        # reduce ne gère pas les images en palette ou en 1 bit (GIF, PNG indexés, ...) : on les convertit d'abord.
+        factor: int = min(pil_image.width // (target_width * self.REDUCING_GAP), pil_image.height // (target_height * self.REDUCING_GAP))
+        if factor >= 2:
+            if pil_image.mode in ('P', '1', 'LA'):
+                has_alpha: bool = pil_image.mode == 'LA' or (pil_image.mode == 'P' and 'transparency' in pil_image.info)
+                pil_image = pil_image.convert('RGBA' if has_alpha else 'RGB')
+            pil_image = pil_image.reduce(factor)
+
+        return pil_image
+
+    @property
+    def dimension(self) -> tuple:
+        return self.header['dimension']
+
+    @property
+    def orientation(self) -> int:
+        return self.header['orientation']
 
     def get_file_data(self) -> dict:
         data_dict: dict = super().get_file_data()
-        data_dict.update({'dimension': self.dimension})
+        data_dict.update({'dimension': self.dimension, 'orientation': self.orientation})
         return data_dict
 
 
@@ -125,17 +213,25 @@ class VideoObject(FileObject):
     """
     VideoObject is a subclass of FileObject, specifically designed to handle video files.
     It includes functionality for loading video files, replaying videos, retrieving the current frame, and obtaining the video's dimensions and duration.
+    The frames are decoded on a background thread by a VideoDecoder, started on the first call to get_current_frame.
+    The header of the video (dimensions, FPS, frame count) is read once (see HeaderProbe) and cached with the other metadata.
 
     Methods:
-    - load_video_cap(): Loads the video file into a cv2.VideoCapture object for further operations.
+    - load_video_cap(): Loads the video file into a cv2.VideoCapture object (video_cap).
     - replay_video(): Resets the video to the beginning for replaying.
-    - get_current_frame(): Retrieves the current frame of the video as a PIL Image object. If the end of the video is reached, it automatically replays.
-    - close_video_cap(): Closes and releases the cv2.VideoCapture object.
+    - get_current_frame(target_size: tuple[int, int] | None = None): Retrieves the frame of the video to display now as a PIL Image object,
+    scaled to target_size (full resolution if None). Returns None while the first frame is being decoded. The video loops when its end is reached.
+    - close_video_cap(): Closes and releases the cv2.VideoCapture object and stops the decoder.
+    - request_playback(): Asks for the video to be played (in poster mode, videos are only played on demand).
     - get_file_data(): Returns a dictionary containing the file's metadata, video dimensions, and video duration.
 
     Properties:
     - dimension (tuple): Returns the video's width and height as a tuple (width, height).
     - duration (int): Returns the duration of the video in seconds.
+    - fps (float): Returns the number of frames per second of the video (0 if unknown).
+    - decoder (VideoDecoder | None): Returns the decoder of the video, if it has been started.
+    - playback_requested (bool): Returns True if the playback of the video has been requested.
+    - header (dict): Returns the (cached) header information of the video ('dimension', 'fps', 'frame_count').
 
     Raises:
     - AssertionError: If the file path is invalid or the file does not exist.
@@ -145,66 +241,102 @@ class VideoObject(FileObject):
         
         super().__init__(fp)
         self.video_cap = None
+        self._decoder: VideoDecoder | None = None
+        self._playback_requested: bool = False
+        self._header: dict | None = None
+
+    def invalidate_metadata(self) -> None:
+        super().invalidate_metadata()
+        self._header = None
+
+    def load_metadata(self) -> None:
+        super().load_metadata()
+        self._header = self._read_header()
+
+    @property
+    def has_metadata(self) -> bool:
+        return super().has_metadata and self._header is not None
+
+    def _read_header(self) -> dict:
+
+        # Les conteneurs courants (MP4/MOV, AVI, GIF) sont lus directement dans l'en-tête, sans ouvrir de capture.
+        probed: dict | None = HeaderProbe.probe(self.path)
+        if probed is not None and 'fps' in probed and 'frame_count' in probed:
+            return {'dimension': probed['dimension'], 'fps': probed['fps'], 'frame_count': probed['frame_count']}
+
+        # Sinon, une capture dédiée, relâchée tout de suite : self.video_cap peut être utilisé par le thread de Tk en même temps.
+        video_cap: cv2.VideoCapture = cv2.VideoCapture(self.path)
+        try:
+            return {
+                'dimension': (int(video_cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(video_cap.get(cv2.CAP_PROP_FRAME_HEIGHT))),
+                'fps': video_cap.get(cv2.CAP_PROP_FPS),
+                'frame_count': int(video_cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+            }
+        finally:
+            video_cap.release()
+
+    @property
+    def header(self) -> dict:
+        if self._header is None: self._header = self._read_header()
+        return self._header
+
+    @property
+    def decoder(self) -> VideoDecoder | None:
+        return self._decoder
+
+    @property
+    def playback_requested(self) -> bool:
+        return self._playback_requested
+
+    def request_playback(self) -> None:
+        self._playback_requested = True
 
     def load_video_cap(self) -> None:
         self.video_cap = cv2.VideoCapture(self.path)
 
     def replay_video(self) -> None:
-        if self.video_cap:
-            self.video_cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-
-    def get_current_frame(self) -> Image:
+        if self._decoder:
+            self._decoder.replay()
 
-        # Si le videoCapture n'est pas encore load, on le load.
-        if not self.video_cap:
-            self.load_video_cap()
+    def get_current_frame(self, target_size: tuple[int, int] | None = None) -> Image:
 
-        ret, frame = self.video_cap.read()
+        if target_size is None: target_size = self.dimension
 
-        # Si la fin de la vidéo a été atteinte, alors ret sera False.
-        # On replay alors la vidéo, puis on récupère de nouveau la frame.
-        if not ret:
-            self.replay_video()
-            ret, frame = self.video_cap.read()
+        # Le décodage se fait dans un thread dédié, démarré au premier affichage de la vidéo.
+        if not self._decoder:
+            self._decoder = VideoDecoder(self.path, target_size)
+        else: self._decoder.set_target_size(target_size)
 
-        if ret:
-
-            # On transforme la frame en une imagePIL lisible par Tkinter.
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil_image: Image = Image.fromarray(frame_rgb)
-            return pil_image
-        
-        return None
+        return self._decoder.get_frame()
 
     def close(self) -> None:
         self.close_video_cap() 
 
     def close_video_cap(self) -> None:
 
+        # En poster mode, revenir sur la vidéo réaffiche le poster.
+        self._playback_requested = False
+
+        if self._decoder:
+            self._decoder.close()
+            self._decoder = None
+
         if self.video_cap:
             self.video_cap.release()
             self.video_cap = None
 
     @property
     def dimension(self) -> tuple:
-        
-        if not self.video_cap:
-            self.load_video_cap()
+        return self.header['dimension']
 
-        width: int = int(self.video_cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height: int = int(self.video_cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        return width, height
+    @property
+    def fps(self) -> float:
+        return self.header['fps']
 
     @property
     def duration(self) -> int:
-
-        if not self.video_cap:
-            self.load_video_cap()
-
-        fps: float = self.video_cap.get(cv2.CAP_PROP_FPS)
-        frame_count: int = self.video_cap.get(cv2.CAP_PROP_FRAME_COUNT)
-
-        return fps if fps == 0 else round(frame_count / fps)
+        fps: float = self.header['fps']
+        return fps if fps == 0 else round(self.header['frame_count'] / fps)
 
     def get_file_data(self) -> dict:
         
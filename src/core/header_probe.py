@@ -0,0 +1,295 @@
+from typing import Iterator
+import struct
+import os
+
+
+
+class HeaderProbe:
+
+    """
+    HeaderProbe reads the dimensions (and, for videos and animated GIFs, the duration, FPS and frame count) of a file
+    from its header only, without decoding it : a few KB are read for images and AVI files, and only the box headers
+    (plus the 'moov' box) for MP4/MOV files. The format is detected from the content of the file, not from its extension.
+
+    Supported formats: PNG, JPEG (with the EXIF orientation), GIF, BMP, WEBP, MP4/MOV, AVI.
+
+    Methods:
+    - probe(fp: str) -> dict | None: Returns the header information of the file ('dimension', and depending on the format
+    'orientation', 'duration' (seconds), 'fps', 'frame_count'), or None if the format is not supported or the header cannot be parsed.
+    """
+
+    HEAD_SIZE: int = 64 * 1024
+    MAX_MOOV_SIZE: int = 64 * 1024 * 1024
+    EXIF_ORIENTATION_TAG: int = 0x0112
+
+    # Marqueurs SOF des JPEG (tous les SOFn, sauf DHT (C4), JPG (C8) et DAC (CC)).
+    JPEG_SOF_MARKERS: frozenset[int] = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+    @staticmethod
+    def probe(fp: str) -> dict | None:
+
+        try:
+            with open(fp, 'rb') as f:
+                head: bytes = f.read(HeaderProbe.HEAD_SIZE)
+
+                if head.startswith(b'\x89PNG\r\n\x1a\n'): return HeaderProbe._probe_png(head)
+                if head.startswith(b'\xff\xd8'): return HeaderProbe._probe_jpeg(f)
+                if head[:6] in (b'GIF87a', b'GIF89a'): return HeaderProbe._probe_gif(f, head)
+                if head.startswith(b'BM'): return HeaderProbe._probe_bmp(head)
+                if head[:4] == b'RIFF' and head[8:12] == b'WEBP': return HeaderProbe._probe_webp(head)
+                if head[:4] == b'RIFF' and head[8:12] == b'AVI ': return HeaderProbe._probe_avi(head)
+                if head[4:8] == b'ftyp' or head[4:8] in (b'moov', b'mdat', b'wide', b'free'): return HeaderProbe._probe_mp4(f)
+
+        # En-tête tronqué ou corrompu : l'appelant se rabat sur un décodeur complet.
+        except (OSError, struct.error, ValueError, IndexError):
+            return None
+
+        return None
+
+    @staticmethod
+    def _probe_png(head: bytes) -> dict:
+        width, height = struct.unpack('>II', head[16:24])
+        return {'dimension': (width, height)}
+
+    @staticmethod
+    def _probe_bmp(head: bytes) -> dict:
+
+        # BITMAPCOREHEADER (12 octets) : dimensions sur 16 bits. Sinon (BITMAPINFOHEADER et suivants) : sur 32 bits signés.
+        if struct.unpack('<I', head[14:18])[0] == 12: width, height = struct.unpack('<HH', head[18:22])
+        else: width, height = struct.unpack('<ii', head[18:26])
+        return {'dimension': (abs(width), abs(height))}
+
+    @staticmethod
+    def _probe_webp(head: bytes) -> dict | None:
+
+        chunk: bytes = head[12:16]
+        if chunk == b'VP8X':
+            return {'dimension': (1 + int.from_bytes(head[24:27], 'little'), 1 + int.from_bytes(head[27:30], 'little'))}
+        if chunk == b'VP8L':
+            bits: int = int.from_bytes(head[21:25], 'little')
+            return {'dimension': (1 + (bits & 0x3FFF), 1 + ((bits >> 14) & 0x3FFF))}
+        if chunk == b'VP8 ':
+            width, height = struct.unpack('<HH', head[26:30])
+            return {'dimension': (width & 0x3FFF, height & 0x3FFF)}
+        return None
+
+    @staticmethod
+    def _probe_jpeg(f) -> dict | None:
+
+        # On parcourt les segments (marqueur + longueur) jusqu'au SOF, en ne lisant que le segment EXIF.
+        orientation: int = 1
+        f.seek(2)
+        while True:
+
+            marker_head: bytes = f.read(2)
+            if len(marker_head) < 2 or marker_head[0] != 0xFF: return None
+            marker: int = marker_head[1]
+
+            # Octets de remplissage (0xFF répétés), et marqueurs sans longueur (RSTn, TEM).
+            while marker == 0xFF: marker = f.read(1)[0]
+            if marker == 0x01 or 0xD0 <= marker <= 0xD7: continue
+
+            length: int = struct.unpack('>H', f.read(2))[0]
+
+            if marker in HeaderProbe.JPEG_SOF_MARKERS:
+                height, width = struct.unpack('>HH', f.read(5)[1:5])
+                return {'dimension': (width, height), 'orientation': orientation}
+
+            if marker == 0xE1:
+                segment: bytes = f.read(length - 2)
+                if segment[:6] == b'Exif\x00\x00': orientation = HeaderProbe._exif_orientation(segment[6:]) or orientation
+            else: f.seek(length - 2, os.SEEK_CUR)
+
+    @staticmethod
+    def _exif_orientation(tiff: bytes) -> int | None:
+
+        if len(tiff) < 8: return None
+        endian: str = '<' if tiff[:2] == b'II' else '>'
+        ifd_offset: int = struct.unpack(endian + 'I', tiff[4:8])[0]
+        entry_count: int = struct.unpack(endian + 'H', tiff[ifd_offset:ifd_offset + 2])[0]
+
+        for entry in range(entry_count):
+            start: int = ifd_offset + 2 + entry * 12
+            tag: int = struct.unpack(endian + 'H', tiff[start:start + 2])[0]
+            if tag == HeaderProbe.EXIF_ORIENTATION_TAG: return struct.unpack(endian + 'H', tiff[start + 8:start + 10])[0]
+        return None
+
+    @staticmethod
+    def _probe_gif(f, head: bytes) -> dict:
+
+        width, height = struct.unpack('<HH', head[6:10])
+
+        # La durée d'un GIF est la somme des délais de ses frames : on parcourt les blocs sans décoder les images
+        # (seules les longueurs des sous-blocs sont lues).
+        f.seek(13)
+        flags: int = head[10]
+        if flags & 0x80: f.seek(3 * (2 << (flags & 0x07)), os.SEEK_CUR)
+
+        frame_count: int = 0
+        delay: int = 0
+        while True:
+            block: bytes = f.read(1)
+            if not block or block == b'\x3b': break
+
+            if block == b'\x21':
+                label: bytes = f.read(1)
+                if label == b'\xf9':
+                    # Taille du bloc (4), flags, délai (en centièmes de seconde), couleur transparente ; le terminateur est sauté ensuite.
+                    extension: bytes = f.read(5)
+                    delay += struct.unpack('<H', extension[2:4])[0]
+                HeaderProbe._skip_gif_sub_blocks(f)
+
+            elif block == b'\x2c':
+                descriptor: bytes = f.read(9)
+                if len(descriptor) < 9: break
+                if descriptor[8] & 0x80: f.seek(3 * (2 << (descriptor[8] & 0x07)), os.SEEK_CUR)
+                f.seek(1, os.SEEK_CUR)
+                HeaderProbe._skip_gif_sub_blocks(f)
+                frame_count += 1
+
+            else: break
+
+        duration: float = delay / 100
+        return {
+            'dimension': (width, height),
+            'frame_count': frame_count,
+            'duration': duration,
+            'fps': frame_count / duration if duration else 0,
+        }
+
+    @staticmethod
+    def _skip_gif_sub_blocks(f) -> None:
+        while True:
+            size: bytes = f.read(1)
+            if not size or size == b'\x00': return
+            f.seek(size[0], os.SEEK_CUR)
+
+    @staticmethod
+    def _probe_avi(head: bytes) -> dict | None:
+
+        # Le main header ('avih') est au début de la liste 'hdrl', juste après l'en-tête RIFF.
+        position: int = head.find(b'avih')
+        if position < 0: return None
+
+        avih: bytes = head[position + 8:position + 8 + 40]
+        micro_sec_per_frame, _, _, _, total_frames, _, _, _, width, height = struct.unpack('<10I', avih)
+
+        fps: float = 1_000_000 / micro_sec_per_frame if micro_sec_per_frame else 0
+        return {
+            'dimension': (width, height),
+            'frame_count': total_frames,
+            'fps': fps,
+            'duration': total_frames / fps if fps else 0,
+        }
+
+    @staticmethod
+    def _iter_boxes(data: bytes, start: int = 0, end: int | None = None) -> Iterator[tuple[bytes, int, int]]:
+
+        end = len(data) if end is None else end
+        position: int = start
+        while position + 8 <= end:
+            size, box_type = struct.unpack('>I4s', data[position:position + 8])
+            header: int = 8
+            if size == 1:
+                size = struct.unpack('>Q', data[position + 8:position + 16])[0]
+                header = 16
+            elif size == 0: size = end - position
+            if size < header: return
+            yield box_type, position + header, position + size
+            position += size
+
+    @staticmethod
+    def _probe_mp4(f) -> dict | None:
+
+        # On saute de box en box (sans lire 'mdat') jusqu'à la box 'moov', qui peut être en fin de fichier.
+        f.seek(0, os.SEEK_END)
+        file_size: int = f.tell()
+        position: int = 0
+        moov: bytes | None = None
+
+        while position + 8 <= file_size:
+            f.seek(position)
+            size, box_type = struct.unpack('>I4s', f.read(8))
+            header: int = 8
+            if size == 1:
+                size = struct.unpack('>Q', f.read(8))[0]
+                header = 16
+            elif size == 0: size = file_size - position
+            if size < header: return None
+
+            if box_type == b'moov':
+                if size > HeaderProbe.MAX_MOOV_SIZE: return None
+                moov = f.read(size - header)
+                break
+            position += size
+
+        if moov is None: return None
+
+        timescale, duration = 0, 0
+        for box_type, start, end in HeaderProbe._iter_boxes(moov):
+
+            if box_type == b'mvhd':
+                version: int = moov[start]
+                if version == 1: timescale, duration = struct.unpack('>IQ', moov[start + 20:start + 32])
+                else: timescale, duration = struct.unpack('>II', moov[start + 12:start + 20])
+
+            elif box_type == b'trak':
+                track: dict | None = HeaderProbe._probe_mp4_track(moov, start, end)
+                if track is not None:
+                    if not track.get('duration') and timescale: track['duration'] = duration / timescale
+                    return track
+
+        return None
+
+    @staticmethod
+    def _probe_mp4_track(moov: bytes, start: int, end: int) -> dict | None:
+
+        width, height = 0, 0
+        frame_count: int | None = None
+        track_duration: float = 0
+
+        for box_type, box_start, box_end in HeaderProbe._iter_boxes(moov, start, end):
+
+            # Les dimensions (en virgule fixe 16.16) sont à la fin de la box 'tkhd', juste après la matrice de transformation
+            # (3x3 : a, b, u, c, d, v, x, y, w). Une rotation de 90° ou 270° (a = d = 0) est appliquée au décodage :
+            # la vidéo s'affiche alors avec la largeur et la hauteur inversées (vidéos portrait des téléphones).
+            if box_type == b'tkhd':
+                width, height = (value >> 16 for value in struct.unpack('>II', moov[box_end - 8:box_end]))
+                a, b, _, c, d, _, _, _, _ = struct.unpack('>9i', moov[box_end - 44:box_end - 8])
+                if a == 0 and d == 0 and b != 0 and c != 0: width, height = height, width
+
+            elif box_type == b'mdia':
+                for mdia_type, mdia_start, mdia_end in HeaderProbe._iter_boxes(moov, box_start, box_end):
+
+                    if mdia_type == b'mdhd':
+                        version: int = moov[mdia_start]
+                        if version == 1: timescale, duration = struct.unpack('>IQ', moov[mdia_start + 20:mdia_start + 32])
+                        else: timescale, duration = struct.unpack('>II', moov[mdia_start + 12:mdia_start + 20])
+                        if timescale: track_duration = duration / timescale
+
+                    elif mdia_type == b'minf':
+                        frame_count = HeaderProbe._mp4_sample_count(moov, mdia_start, mdia_end)
+
+        # Les pistes audio n'ont pas de dimensions.
+        if not width or not height: return None
+
+        track: dict = {'dimension': (width, height), 'duration': track_duration}
+        if frame_count is not None:
+            track['frame_count'] = frame_count
+            track['fps'] = frame_count / track_duration if track_duration else 0
+        return track
+
+    @staticmethod
+    def _mp4_sample_count(moov: bytes, start: int, end: int) -> int | None:
+
+        # minf > stbl > stts : (nombre d'échantillons, durée) par plage, le total est le nombre de frames de la piste.
+        for box_type, box_start, box_end in HeaderProbe._iter_boxes(moov, start, end):
+            if box_type != b'stbl': continue
+            for stbl_type, stbl_start, _ in HeaderProbe._iter_boxes(moov, box_start, box_end):
+                if stbl_type != b'stts': continue
+                entry_count: int = struct.unpack('>I', moov[stbl_start + 4:stbl_start + 8])[0]
+                return sum(
+                    struct.unpack('>I', moov[stbl_start + 8 + 8 * entry:stbl_start + 12 + 8 * entry])[0]
+                    for entry in range(entry_count)
+                )
+        return None
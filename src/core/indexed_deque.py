@@ -0,0 +1,274 @@
+from array import array
+from collections import deque
+from itertools import islice
+from typing import Iterable, Iterator
+
+
+
+class IntRingBuffer:
+
+    """
+    IntRingBuffer is a growable ring buffer of unsigned ints backed by an array('I'), exposing the subset of the
+    collections.deque API used by IndexedDeque. It costs 4 bytes per value (no Python int object is kept alive).
+
+    Methods:
+    - append(v: int) / appendleft(v: int) -> None: Adds a value at the right / left end, in amortized O(1).
+    - extend(values: Iterable[int]) -> None: Adds several values at the right end.
+    - pop() / popleft() -> int: Removes and returns the value at the right / left end, in O(1).
+
+    Raises:
+    - IndexError: If a value is popped or accessed out of range.
+    """
+
+    def __init__(self, values: Iterable[int] = ()) -> None:
+
+        initial: array = array('I', values)
+        capacity: int = 16
+        while capacity < len(initial): capacity *= 2
+
+        self._data: array = array('I', bytes(4 * capacity))
+        self._data[:len(initial)] = initial
+        self._head: int = 0
+        self._count: int = len(initial)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _ordered(self) -> array:
+        end: int = self._head + self._count
+        if end <= len(self._data): return self._data[self._head:end]
+        return self._data[self._head:] + self._data[:end - len(self._data)]
+
+    def _grow(self, min_capacity: int = 0) -> None:
+
+        ordered: array = self._ordered()
+        capacity: int = 2 * len(self._data)
+        while capacity < min_capacity: capacity *= 2
+
+        self._data = array('I', bytes(4 * capacity))
+        self._data[:len(ordered)] = ordered
+        self._head = 0
+
+    def append(self, v: int) -> None:
+        if self._count == len(self._data): self._grow()
+        self._data[(self._head + self._count) % len(self._data)] = v
+        self._count += 1
+
+    def extend(self, values: Iterable[int]) -> None:
+
+        new_values: array = array('I', values)
+        if self._count + len(new_values) > len(self._data): self._grow(self._count + len(new_values))
+
+        # La zone libre peut être coupée en deux par la fin du buffer.
+        start: int = (self._head + self._count) % len(self._data)
+        first_part: int = min(len(new_values), len(self._data) - start)
+        self._data[start:start + first_part] = new_values[:first_part]
+        self._data[:len(new_values) - first_part] = new_values[first_part:]
+        self._count += len(new_values)
+
+    def appendleft(self, v: int) -> None:
+        if self._count == len(self._data): self._grow()
+        self._head = (self._head - 1) % len(self._data)
+        self._data[self._head] = v
+        self._count += 1
+
+    def pop(self) -> int:
+        if not self._count: raise IndexError('pop from an empty IntRingBuffer')
+        self._count -= 1
+        return self._data[(self._head + self._count) % len(self._data)]
+
+    def popleft(self) -> int:
+        if not self._count: raise IndexError('pop from an empty IntRingBuffer')
+        v: int = self._data[self._head]
+        self._head = (self._head + 1) % len(self._data)
+        self._count -= 1
+        return v
+
+    def __getitem__(self, i: int) -> int:
+        if i < 0: i += self._count
+        if not 0 <= i < self._count: raise IndexError('IntRingBuffer index out of range')
+        return self._data[(self._head + i) % len(self._data)]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ordered())
+
+    def __reversed__(self) -> Iterator[int]:
+        return reversed(self._ordered())
+
+
+
+class IndexedDeque:
+
+    """
+    IndexedDeque is the common base of Queue and Stack. It stores the objects in a collections.deque (O(1) operations on both ends)
+    and keeps a membership index, so that removing an arbitrary object is O(1) : the object is only marked as removed (tombstone),
+    and is physically dropped once it reaches one of the ends, or when the tombstones get too numerous (compaction).
+
+    Methods:
+    - is_empty() -> bool: Returns True if there are no (live) objects, otherwise False.
+    - contains(obj: object) -> bool: Returns True if the object is currently stored, in O(1).
+    - remove(obj: object) -> None: Removes the specified object, if it exists, in O(1).
+    - iter_values() -> Iterator: Iterates over the live objects, from the left end to the right end.
+
+    Properties:
+    - size (int): Returns the number of live objects.
+    - values (list): Returns a list of the live objects, from the left end to the right end.
+
+    Note:
+    - The stored objects must be hashable (objects without __eq__/__hash__ are hashed by identity).
+    - Removing an object stored several times removes its first occurrence (from the left end), in O(n).
+    - In dense mode, the stored objects must be non-negative ints (e.g. PathTable indices) : they are kept in an IntRingBuffer
+    and the membership index is a bytearray indexed by value, so that an entry only costs a few bytes.
+    """
+
+    # Au-delà de ce ratio de tombstones dans le deque, on le reconstruit.
+    COMPACTION_RATIO: float = 0.5
+
+    def __init__(self, init_values: list[object] | None, dense: bool = False) -> None:
+
+        self._dense: bool = dense
+        self._values: deque | IntRingBuffer = self._new_container(init_values if init_values else [])
+        self._members: dict[object, int] | bytearray = bytearray() if dense else {}
+        self._removed: dict[object, int] = {}
+        self._size: int = len(self._values)
+
+        for obj in self._values:
+            self._add_member(obj, 1)
+
+    def _new_container(self, values: Iterable) -> deque | IntRingBuffer:
+        return IntRingBuffer(values) if self._dense else deque(values)
+
+    def _member_count(self, obj: object) -> int:
+        if self._dense: return self._members[obj] if obj < len(self._members) else 0
+        return self._members.get(obj, 0)
+
+    def _add_member(self, obj: object, delta: int) -> None:
+
+        if not self._dense:
+            count: int = self._members.get(obj, 0) + delta
+            if count: self._members[obj] = count
+            else: del self._members[obj]
+            return
+
+        # Le bytearray grandit par doublement, comme une list.
+        if obj >= len(self._members):
+            self._members.extend(bytes(max(obj + 1, 2 * len(self._members)) - len(self._members)))
+        self._members[obj] += delta
+
+    def _extend_right(self, new_values: list | range) -> None:
+
+        # Même logique que _register, mais en bloc (création d'une tâche, ajout d'un batch du crawler).
+        if self._removed and any(obj in self._removed for obj in new_values): self._compact()
+
+        if self._dense and isinstance(new_values, range) and new_values.step == 1 and new_values.start >= len(self._members):
+            self._members.extend(bytes(new_values.start - len(self._members)))
+            self._members.extend(b'\x01' * len(new_values))
+        else:
+            for obj in new_values: self._add_member(obj, 1)
+
+        self._values.extend(new_values)
+        self.set_size(self.size + len(new_values))
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def set_size(self, n: int) -> None:
+        self._size = n
+
+    @property
+    def values(self) -> list:
+        return list(self.iter_values())
+
+    def is_empty(self) -> bool:
+        return self.size == 0
+
+    def contains(self, obj: object) -> bool:
+        return self._member_count(obj) > 0
+
+    def __contains__(self, obj: object) -> bool:
+        return self.contains(obj)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def iter_values(self) -> Iterator:
+        return self._iter_live(self._values)
+
+    def _iter_live(self, raw_values: Iterator) -> Iterator:
+
+        if not self._removed:
+            yield from raw_values
+            return
+
+        # On ne copie pas les tombstones : on compte seulement celles déjà sautées pendant ce parcours.
+        skipped: dict[object, int] = {}
+        for obj in raw_values:
+            if self._removed.get(obj, 0) > skipped.get(obj, 0):
+                skipped[obj] = skipped.get(obj, 0) + 1
+                continue
+            yield obj
+
+    def remove(self, obj: object) -> None:
+
+        if not self.contains(obj): return
+
+        # Une tombstone ne dit pas laquelle des copies d'un doublon est morte : on retire alors physiquement la première
+        # (comme list.remove). Ainsi, une valeur marquée n'a jamais de copie vivante, et les parcours sont cohérents.
+        if self._member_count(obj) > 1:
+            live_values: list = list(self.iter_values())
+            live_values.remove(obj)
+            self._forget(obj)
+            self.set_size(self.size - 1)
+            self._reset(live_values)
+            return
+
+        self._forget(obj)
+        self._removed[obj] = self._removed.get(obj, 0) + 1
+        self.set_size(self.size - 1)
+
+        if len(self._values) > 32 and (len(self._values) - self.size) > len(self._values) * self.COMPACTION_RATIO:
+            self._compact()
+
+    def _register(self, obj: object) -> None:
+
+        # Un objet retiré puis ré-ajouté ne doit pas être confondu avec sa tombstone : on compacte d'abord (cas rare).
+        if obj in self._removed: self._compact()
+        self._add_member(obj, 1)
+        self.set_size(self.size + 1)
+
+    def _forget(self, obj: object) -> None:
+        self._add_member(obj, -1)
+
+    def _is_tombstone(self, obj: object) -> bool:
+
+        count: int = self._removed.get(obj, 0)
+        if not count: return False
+
+        if count == 1: del self._removed[obj]
+        else: self._removed[obj] = count - 1
+        return True
+
+    def _prune_left(self) -> None:
+        while self._values and self._removed and self._is_tombstone(self._values[0]):
+            self._values.popleft()
+
+    def _prune_right(self) -> None:
+        while self._values and self._removed and self._is_tombstone(self._values[-1]):
+            self._values.pop()
+
+    def _peek_left(self, n: int) -> list:
+        return list(islice(self.iter_values(), max(n, 0)))
+
+    def _peek_right(self, n: int) -> list:
+        return list(islice(self._iter_live(reversed(self._values)), max(n, 0)))
+
+    def _compact(self) -> None:
+        self._values = self._new_container(list(self.iter_values()))
+        self._removed.clear()
+
+    def _reset(self, new_values: list) -> None:
+
+        # Les nouvelles valeurs doivent être exactement les objets vivants (shuffle, réordonnancement).
+        self._values = self._new_container(new_values)
+        self._removed.clear()
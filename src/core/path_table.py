@@ -0,0 +1,154 @@
+from array import array
+from itertools import accumulate
+import os
+
+
+
+class PathTable:
+
+    """
+    PathTable is a compact, array-backed table of file paths, used by SortingTask instead of one FileObject per file.
+    Each entry is identified by its index (int) and stores an interned directory prefix id, the UTF-8 encoded basename
+    (in one shared buffer) and a type byte, which keeps the cost of an entry around a few dozen bytes.
+
+    Methods:
+    - append(fp: str, kind: int) -> int: Adds a path to the table and returns its index.
+    - extend(fps: list[str], kinds: bytes) -> range: Adds several paths at once (one kind byte per path) and returns their indices.
+    - path(i: int) -> str: Returns the full path of the entry.
+    - dirname(i: int) -> str: Returns the directory of the entry.
+    - filename(i: int) -> str: Returns the basename of the entry.
+    - kind(i: int) -> int: Returns the type byte of the entry (KIND_IMAGE or KIND_VIDEO).
+    - dir_id(i: int) -> int: Returns the id of the interned directory prefix of the entry.
+    - dir_prefix(dir_id: int) -> str: Returns an interned directory prefix (separator included, '' for a bare filename).
+    - set_path(i: int, fp: str) -> None: Changes the path of the entry (rename, move).
+    - split_path(fp: str) -> tuple[str, str]: Splits a path into its directory prefix (separator included) and its basename.
+
+    Properties:
+    - nbytes (int): Returns the approximate number of bytes used by the per-entry arrays and buffers.
+
+    Raises:
+    - IndexError: If the index does not exist in the table.
+    """
+
+    KIND_IMAGE: int = 0
+    KIND_VIDEO: int = 1
+
+    # Les noms de fichiers non décodables (Windows, surrogates) doivent pouvoir faire l'aller-retour.
+    ENCODING_ERRORS: str = 'surrogatepass'
+
+    def __init__(self) -> None:
+
+        self._dirs: list[str] = []
+        self._dir_ids: dict[str, int] = {}
+        self._entry_dirs: array = array('I')
+        self._name_starts: array = array('Q')
+        self._name_lengths: array = array('H')
+        self._kinds: bytearray = bytearray()
+        self._name_data: bytearray = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self._entry_dirs.itemsize * len(self._entry_dirs) +
+            self._name_starts.itemsize * len(self._name_starts) +
+            self._name_lengths.itemsize * len(self._name_lengths) +
+            len(self._kinds) + len(self._name_data) +
+            sum(len(d) for d in self._dirs)
+        )
+
+    @staticmethod
+    def split_path(fp: str) -> tuple[str, str]:
+
+        # On garde le séparateur dans le préfixe, pour reconstruire exactement le même chemin (séparateurs mixtes sous Windows).
+        separator_index: int = fp.rfind('/') if os.sep == '/' else max(fp.rfind('/'), fp.rfind(os.sep))
+        return fp[:separator_index + 1], fp[separator_index + 1:]
+
+    def _intern_dir(self, directory: str) -> int:
+
+        dir_id: int | None = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = len(self._dirs)
+            self._dirs.append(directory)
+            self._dir_ids[directory] = dir_id
+
+        return dir_id
+
+    def _store_name(self, name: str) -> tuple[int, int]:
+        data: bytes = name.encode('utf-8', self.ENCODING_ERRORS)
+        start: int = len(self._name_data)
+        self._name_data += data
+        return start, len(data)
+
+    def append(self, fp: str, kind: int) -> int:
+
+        directory, name = PathTable.split_path(fp)
+        start, length = self._store_name(name)
+
+        self._entry_dirs.append(self._intern_dir(directory))
+        self._name_starts.append(start)
+        self._name_lengths.append(length)
+        self._kinds.append(kind)
+
+        return len(self._kinds) - 1
+
+    def extend(self, fps: list[str], kinds: bytes) -> range:
+
+        assert len(fps) == len(kinds), f"[E] {len(fps)} chemins pour {len(kinds)} types."
+
+        # Version en bloc de append : une seule passe Python par chemin, les buffers étant étendus d'un coup.
+        first_index: int = len(self._kinds)
+        dir_ids: list[int] = []
+        names: list[bytes] = []
+        encoding_errors: str = self.ENCODING_ERRORS
+        last_directory: str | None = None
+        last_dir_id: int = 0
+
+        for fp in fps:
+
+            # Même découpage que split_path, en ligne pour éviter un appel de fonction par chemin.
+            cut: int = (fp.rfind('/') if os.sep == '/' else max(fp.rfind('/'), fp.rfind(os.sep))) + 1
+            directory: str = fp[:cut]
+
+            # Les fichiers d'un même dossier se suivent presque toujours (crawler), inutile de ré-interner le dossier.
+            if directory != last_directory: last_directory, last_dir_id = directory, self._intern_dir(directory)
+
+            dir_ids.append(last_dir_id)
+            names.append(fp[cut:].encode('utf-8', encoding_errors))
+
+        lengths: array = array('H', map(len, names))
+        self._name_starts.extend(accumulate(lengths[:-1], initial=len(self._name_data)) if names else ())
+        self._name_lengths.extend(lengths)
+        self._name_data += b''.join(names)
+        self._entry_dirs.extend(dir_ids)
+        self._kinds += kinds
+
+        return range(first_index, len(self._kinds))
+
+    def dirname(self, i: int) -> str:
+        return os.path.dirname(self.path(i))
+
+    def filename(self, i: int) -> str:
+        start: int = self._name_starts[i]
+        return self._name_data[start:start + self._name_lengths[i]].decode('utf-8', self.ENCODING_ERRORS)
+
+    def path(self, i: int) -> str:
+        return self._dirs[self._entry_dirs[i]] + self.filename(i)
+
+    def kind(self, i: int) -> int:
+        return self._kinds[i]
+
+    def dir_id(self, i: int) -> int:
+        return self._entry_dirs[i]
+
+    def dir_prefix(self, dir_id: int) -> str:
+        return self._dirs[dir_id]
+
+    def set_path(self, i: int, fp: str) -> None:
+
+        # L'ancien nom reste dans le buffer : les renommages sont rares comparés au nombre d'entrées.
+        directory, name = PathTable.split_path(fp)
+        self._entry_dirs[i] = self._intern_dir(directory)
+        self._name_starts[i], self._name_lengths[i] = self._store_name(name)
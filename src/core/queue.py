@@ -1,18 +1,29 @@
+from src.core.indexed_deque import IndexedDeque
 
+import random
 
-class Queue:
+
+class Queue(IndexedDeque):
 
     """
     Queue is a class that implements a basic queue data structure, allowing for typical queue operations such as enqueue, dequeue, and priority insertion.
     It also provides methods to check if the queue is empty, retrieve the current size, and inspect the first element.
+    It is backed by a collections.deque with a membership index (see IndexedDeque), so that every operation below is O(1), except values, peek and shuffle.
 
     Methods:
     - is_empty() -> bool: Returns True if the queue is empty, otherwise False.
     - enqueue(obj: object) -> None: Adds an object to the end of the queue.
+    - enqueue_many(objs: list | range) -> None: Adds several objects to the end of the queue, in order.
     - dequeue() -> object: Removes and returns the first object from the queue. Returns None if the queue is empty.
     - enqueue_max_priority(obj: object) -> None: Adds an object to the front of the queue (priority insertion).
     - remove(obj: object) -> None: Removes the specified object from the queue, if it exists.
     - top() -> object: Returns the first object in the queue without removing it.
+    - peek(n: int) -> list: Returns the n first objects in the queue without removing them.
+    - shuffle(keep_head: bool = False, rng: random.Random | None = None) -> None: Shuffles the queue, optionally keeping the first object in place
+    (a seeded rng makes the shuffle reproducible).
+
+    Parameters:
+    - dense (bool): If True, the queue only holds non-negative ints (e.g. PathTable indices) and uses a compact storage.
 
     Properties:
     - size (int): Returns the current size of the queue.
@@ -22,43 +33,44 @@ class Queue:
     - None. The methods handle queue underflow internally by checking if the queue is empty.
     """
 
-    def __init__(self, init_values: list[object]) -> None:
+    def __init__(self, init_values: list[object], dense: bool = False) -> None:
+        super().__init__(init_values, dense)
 
-        self._values: list = init_values if init_values else []
-        self._size: int = len(self.values)
-
-    @property
-    def size(self) -> int:
-        return self._size
-    
-    def set_size(self, n: int) -> None:
-        self._size = n
-
-    @property
-    def values(self) -> list:
-        return self._values
-    
-    def is_empty(self) -> bool:
-        return self.size == 0
-    
     def enqueue(self, obj: object) -> None:
-        self.set_size(self.size + 1)
-        self.values.append(obj)
+        self._register(obj)
+        self._values.append(obj)
+
+    def enqueue_many(self, objs: list | range) -> None:
+        self._extend_right(objs)
 
     def dequeue(self) -> object:
         if not self.is_empty():
+            self._prune_left()
+            obj: object = self._values.popleft()
+            self._forget(obj)
             self.set_size(self.size - 1)
-            return self.values.pop(0)
+            return obj
     
     def enqueue_max_priority(self, obj: object) -> None:
-        self.set_size(self.size + 1)
-        self.values.insert(0, obj)
-    
-    def remove(self, obj: object) -> None:
-        if obj in self.values:
-            self.values.remove(obj)
-            self.set_size(self.size - 1)
+        self._register(obj)
+        self._values.appendleft(obj)
 
     def top(self) -> object:
         if not self.is_empty():
-            return self.values[0]
\ No newline at end of file
+            self._prune_left()
+            return self._values[0]
+
+    def peek(self, n: int) -> list:
+        return self._peek_left(n)
+
+    def shuffle(self, keep_head: bool = False, rng: random.Random | None = None) -> None:
+
+        shuffle = rng.shuffle if rng else random.shuffle
+        values: list = self.values
+        if keep_head and values:
+            tail: list = values[1:]
+            shuffle(tail)
+            values[1:] = tail
+        else: shuffle(values)
+
+        self._reset(values)
@@ -1,9 +1,14 @@
 
 
-from src.core.file_objects import FileObject
+from src.core.file_objects import FileObject, ImageObject, VideoObject
+from src.core.path_table import PathTable
 from src.core.queue import Queue
 from src.core.stack import Stack
 
+from array import array
+import random
+from typing import Iterator
+
 
 class SortingTask:
 
@@ -12,29 +17,94 @@ class SortingTask:
     It utilizes a Queue to hold files that need to be sorted and a Stack to keep track of files that have already been reviewed. 
     Additionally, it supports custom categorization for sorting.
 
+    The files are stored in a compact PathTable, the Queue and the Stack only holding table indices. FileObjects are
+    materialized lazily, when a file is accessed, and only those close to the current file (see MATERIALIZED_WINDOW) are kept.
+
+    Each entry of the table also has a state (pending, reviewed or removed) and a sequence number giving its position in the
+    queue or the stack. The entries changed since the last save are tracked, so that a task store can only write those
+    (see SQLiteTaskHelper).
+
     Attributes:
-    - files (Queue): A queue that holds files pending sorting.
-    - reviewed_files (Stack): A stack that contains files that have been reviewed.
+    - files (Queue): A queue that holds the table indices of the files pending sorting.
+    - reviewed_files (Stack): A stack that contains the table indices of the files that have been reviewed.
+    - table (PathTable): The table holding the paths and types of every file of the task.
     - custom_categories (list): A list of custom categories for sorting files.
     - path (str | None): The path associated with the sorting task.
     - init_file_count (int | None): The initial count of files to be sorted.
+    - file_feed (object | None): A source still producing files for the task (e.g. a CrawlStream), if the task is still being built.
+    - path_validation (object | None): A background check of the task files (e.g. a PathValidationStream), if the task is still being validated.
+    - journal (object | None): A journal recording the operations done on the task (e.g. a TaskJournal), if the task is saved.
+    - deferred_mode (bool): If True, the sorting actions (move to a category, trash, rename) are only recorded as assignments,
+    to be applied all at once later (see DeferredAssignmentHelper).
+    - assignments (dict[int, dict]): The recorded assignments, by table index ('category': str, 'trash': bool, 'name': str).
+    - needs_full_save (bool): True if the task has to be entirely rewritten on its next save (never saved, shuffled, ...).
+    - categories_version (int): A counter incremented each time the custom categories change (e.g. to rebuild a CategoryIndex).
+    - category_clock (int): The number of the last category use (see record_category_hit).
+    - has_snapshot (bool): True while a snapshot is taken (see take_snapshot).
 
     Methods:
     - is_empty() -> bool: Returns True if there are no files to sort, otherwise False.
+    - add_file(fp: str, kind: int) -> int: Adds a file path (of the given PathTable kind) to the queue, without creating its FileObject.
+    - add_files(fps: list[str], kinds: bytes) -> range: Adds several file paths (one PathTable kind byte per path) to the queue at once.
+    - add_reviewed_file(fp: str, kind: int) -> int: Adds a file path (of the given PathTable kind) to the reviewed files stack.
     - file_enqueue(file: FileObject) -> None: Adds a file to the queue for sorting.
     - file_dequeue() -> FileObject: Removes the next file from the queue and pushes it onto the reviewed files stack.
+    - dequeue_entry() -> int | None: Same as file_dequeue, but returns the table index without materializing the FileObject.
+    - review_entry(index: int) -> None: Moves a pending entry, wherever it is in the queue, onto the reviewed files stack.
+    - get_file(index: int) -> FileObject: Returns the FileObject of a table index, creating it if needed.
+    - index_of(file: FileObject) -> int | None: Returns the table index of a materialized FileObject.
     - get_current_file() -> FileObject: Returns the file currently at the front of the queue without removing it.
     - get_most_recent_reviewed_file() -> FileObject: Returns the most recently reviewed file from the stack without removing it.
     - restore_previous_reviewed_file() -> None: Restores the most recently reviewed file back to the front of the queue.
+    - get_upcoming_files(n: int) -> list[FileObject]: Returns the n files following the current file in the queue.
+    - get_recent_reviewed_files(n: int) -> list[FileObject]: Returns the n most recently reviewed files, the most recent first.
+    - remove_file(file: FileObject) -> None: Removes a file from the task (queue or reviewed files).
+    - remove_entry(index: int) -> None: Removes a table entry from the task (queue or reviewed files).
+    - requeue_entry(index: int) -> None: Moves a reviewed entry back to the front of the queue (e.g. after a failed move).
+    - set_entry_path(index: int, new_fp: str) -> None: Changes the path of a table entry (and of its FileObject, if materialized).
+    - set_file_path(file: FileObject, new_fp: str) -> None: Changes the path of a file of the task (rename, move).
+    - shuffle(keep_head: bool = False, seed: int | None = None) -> None: Shuffles the files pending sorting (with the given seed, if any).
+    - entry_state(index: int) -> int: Returns the state of a table entry (STATE_PENDING, STATE_REVIEWED or STATE_REMOVED).
+    - entry_seq(index: int) -> int: Returns the sequence number of a table entry (its order in the queue or in the stack).
+    - load_entries(fps: list[str], kinds: bytes, states: bytes, seqs: list[int]) -> range: Adds saved entries to the table, without queuing them.
+    - load_order(pending: list[int], reviewed: list[int]) -> None: Fills the queue and the stack with saved entries, in order.
+    - get_unsaved_entries() -> tuple[list[int], range]: Returns the changed entries and the new entries since the last save.
+    - mark_saved() -> None: Marks every entry as saved.
+    - iter_file_paths() -> Iterator[str]: Iterates over the paths of the files pending sorting, in order.
+    - iter_reviewed_file_paths() -> Iterator[str]: Iterates over the paths of the reviewed files, from the oldest to the most recent.
+    - assign(index: int, **assignment) -> None: Records (or updates) the deferred assignment of a table entry.
+    - get_assignment(index: int) -> dict | None: Returns the deferred assignment of a table entry, if any.
+    - clear_assignment(index: int) -> None: Forgets the deferred assignment of a table entry.
     - get_custom_categories(sort_by_name: bool = True) -> list: Returns the list of custom categories, sorted by name if specified.
     - add_custom_categories(*new_categories: dict) -> None: Adds new custom categories to the existing list.
     - remove_custom_category(target: dict) -> None: Removes a specified custom category from the list.
     - clear_custom_categories() -> None: Clears all custom categories from the list.
+    - record_category_hit(custom_category: dict) -> None: Records a use of the category (its 'hits' count and its 'last_hit' number are stored in the category dict).
+    - get_category_by_hotkey(hotkey: str) -> dict | None: Returns the custom category bound to the hotkey, if any.
+    - set_category_hotkey(custom_category: dict, hotkey: str | None) -> None: Binds the hotkey to the category (stored in its
+    'hotkey' key), unbinding it from any other category. None removes the hotkey of the category.
+
+    - take_snapshot() -> None: Starts a browsing session (viewer mode) : the moves between the queue and the stack are then
+    only recorded to be undone, and the custom categories are hidden. Nothing is copied.
+    - restore_snapshot() -> None: Ends the browsing session : the moves done since take_snapshot are undone (in O(moves)),
+    and the custom categories come back.
+
+    The changes that do not come from browsing (removed files, new paths, files added by a feed, ...) are kept by restore_snapshot.
+    The failed moves requeued during a snapshot (see requeue_entry) are only requeued when it is restored.
 
     Raises:
     - AssertionError: If a new category added is not a dictionary.
     """
 
+    FILE_OBJECT_TYPES: dict[int, type] = {PathTable.KIND_IMAGE: ImageObject, PathTable.KIND_VIDEO: VideoObject}
+
+    STATE_PENDING: int = 0
+    STATE_REVIEWED: int = 1
+    STATE_REMOVED: int = 2
+
+    # Nombre de fichiers gardés matérialisés de part et d'autre du fichier courant (affichage, prefetch).
+    MATERIALIZED_WINDOW: int = 16
+
     def __init__(self,
             files: list[FileObject] | None = None,
             reviewed_files: list[FileObject] | None = None,
@@ -42,12 +112,43 @@ class SortingTask:
         ) -> None:
 
         # SortingTask possède une Queue pour les fichiers à trier et un Stack pour les fichiers déjà triés.
-        self._files: Queue = Queue(init_values=files)
-        self._reviewed_files: Stack = Stack(init_values=reviewed_files)
+        # Les deux ne contiennent que des indices de la PathTable.
+        self._table: PathTable = PathTable()
+        self._files: Queue = Queue(init_values=None, dense=True)
+        self._reviewed_files: Stack = Stack(init_values=None, dense=True)
+        self._materialized: dict[int, FileObject] = {}
         self._custom_categories: list[dict[str: str]] = custom_categories if custom_categories else []
+        self._categories_version: int = 0
+        self._category_clock: int = max((c.get('last_hit', 0) for c in self._custom_categories), default=0)
 
         self._path: str | None = None
         self._init_file_count: int | None = None
+        self._file_feed: object | None = None
+        self._path_validation: object | None = None
+        self._journal: object | None = None
+        self._deferred_mode: bool = False
+        self._assignments: dict[int, dict] = {}
+
+        # État et numéro d'ordre de chaque entrée de la table, pour les sauvegardes incrémentales.
+        self._states: bytearray = bytearray()
+        self._seqs: array = array('q')
+        self._head_seq: int = 0
+        self._tail_seq: int = -1
+        self._review_seq: int = -1
+        self._changed: set[int] = set()
+        self._saved_count: int = 0
+        self._needs_full_save: bool = True
+
+        # Snapshot (viewer mode) : déplacements à défaire, et catégories cachées en attendant.
+        self._snapshot_categories: list[dict] | None = None
+        self._snapshot_forward: list[int] = []
+        self._snapshot_backward: list[int] = []
+        self._snapshot_requeued: list[int] = []
+
+        for file in (files or []): self.file_enqueue(file)
+        for reviewed_file in (reviewed_files or []):
+            index: int = self._adopt(reviewed_file, self.STATE_REVIEWED)
+            self.reviewed_files.push(index)
         
     @property
     def files(self) -> Queue:
@@ -57,13 +158,17 @@ class SortingTask:
     def reviewed_files(self) -> Stack:
         return self._reviewed_files
 
+    @property
+    def table(self) -> PathTable:
+        return self._table
+
     @property
     def size(self) -> int:
         return self.files.size
 
     @property
     def reviewed_size(self) -> int:
-        return self.reviewed_files.size()
+        return self.reviewed_files.size
 
     @property
     def path(self) -> str:
@@ -78,31 +183,372 @@ class SortingTask:
     
     def set_init_file_count(self, c: int) -> None:
         self._init_file_count = c
+
+    @property
+    def file_feed(self) -> object | None:
+        return self._file_feed
+
+    def set_file_feed(self, feed: object | None) -> None:
+        self._file_feed = feed
+
+    @property
+    def path_validation(self) -> object | None:
+        return self._path_validation
+
+    def set_path_validation(self, validation: object | None) -> None:
+        self._path_validation = validation
+
+    @property
+    def journal(self) -> object | None:
+        return self._journal
+
+    def set_journal(self, journal: object | None) -> None:
+        self._journal = journal
+
+    @property
+    def deferred_mode(self) -> bool:
+        return self._deferred_mode
+
+    def set_deferred_mode(self, boolvar: bool) -> None:
+        self._deferred_mode = boolvar
+
+    @property
+    def assignments(self) -> dict[int, dict]:
+        return self._assignments
+
+    def assign(self, index: int, **assignment) -> None:
+
+        # Un déplacement et une mise à la corbeille s'excluent ; un renommage peut s'ajouter à un déplacement.
+        current: dict = self._assignments.setdefault(index, {})
+        if 'category' in assignment: current.pop('trash', None)
+        if 'trash' in assignment: current.pop('category', None)
+        current.update(assignment)
+
+    def get_assignment(self, index: int) -> dict | None:
+        return self._assignments.get(index)
+
+    def clear_assignment(self, index: int) -> None:
+        self._assignments.pop(index, None)
+
+    def _record(self, op: dict) -> None:
+        if self._journal is not None: self._journal.record(op)
+
+    @property
+    def needs_full_save(self) -> bool:
+        return self._needs_full_save
+
+    def entry_state(self, index: int) -> int:
+        return self._states[index]
+
+    def entry_seq(self, index: int) -> int:
+        return self._seqs[index]
+
+    def _next_seq(self, state: int, at_head: bool = False) -> int:
+
+        # La queue grandit des deux côtés (restore en tête), d'où deux compteurs.
+        if state == self.STATE_PENDING and at_head:
+            self._head_seq -= 1
+            return self._head_seq
+        elif state == self.STATE_PENDING:
+            self._tail_seq += 1
+            return self._tail_seq
+        else:
+            self._review_seq += 1
+            return self._review_seq
+
+    def _track_new_entry(self, state: int) -> None:
+        self._states.append(state)
+        self._seqs.append(self._next_seq(state))
+
+    def _set_entry_state(self, index: int, state: int, at_head: bool = False) -> None:
+
+        self._states[index] = state
+        if state != self.STATE_REMOVED: self._seqs[index] = self._next_seq(state, at_head)
+
+        # Les entrées jamais sauvegardées seront de toute façon écrites en entier.
+        if index < self._saved_count: self._changed.add(index)
+
+    def load_entries(self, fps: list[str], kinds: bytes, states: bytes, seqs: list[int]) -> range:
+
+        indices: range = self.table.extend(fps, kinds)
+        self._states += states
+        self._seqs.extend(seqs)
+        return indices
+
+    def load_order(self, pending: list[int], reviewed: list[int]) -> None:
+
+        self.files.enqueue_many(pending)
+        self.reviewed_files.push_many(reviewed)
+
+        # Les nouveaux numéros d'ordre doivent continuer ceux des entrées chargées.
+        if pending:
+            self._head_seq = min(self._head_seq, self._seqs[pending[0]])
+            self._tail_seq = max(self._tail_seq, self._seqs[pending[-1]])
+        if reviewed: self._review_seq = max(self._review_seq, self._seqs[reviewed[-1]])
+
+    def get_unsaved_entries(self) -> tuple[list[int], range]:
+        return sorted(self._changed), range(self._saved_count, len(self.table))
+
+    def mark_saved(self) -> None:
+        self._changed.clear()
+        self._saved_count = len(self.table)
+        self._needs_full_save = False
     
     def is_empty(self) -> bool:
         return self.size == 0
 
+    def add_file(self, fp: str, kind: int) -> int:
+        self._record({'op': 'add', 'paths': [fp], 'kinds': [kind]})
+        index: int = self.table.append(fp, kind)
+        self._track_new_entry(self.STATE_PENDING)
+        self.files.enqueue(index)
+        return index
+
+    def add_files(self, fps: list[str], kinds: bytes) -> range:
+
+        # Les fichiers ajoutés après une sauvegarde (crawl encore en cours) doivent être rejoués avant les opérations suivantes.
+        if fps: self._record({'op': 'add', 'paths': list(fps), 'kinds': list(kinds)})
+
+        indices: range = self.table.extend(fps, kinds)
+        self._states += bytes(len(indices))
+        self._seqs.extend(range(self._tail_seq + 1, self._tail_seq + 1 + len(indices)))
+        self._tail_seq += len(indices)
+
+        self.files.enqueue_many(indices)
+        return indices
+
+    def add_reviewed_file(self, fp: str, kind: int) -> int:
+        index: int = self.table.append(fp, kind)
+        self._track_new_entry(self.STATE_REVIEWED)
+        self.reviewed_files.push(index)
+        return index
+
+    def _adopt(self, file: FileObject, state: int) -> int:
+
+        # Un FileObject créé à l'extérieur est enregistré dans la table, et gardé tel quel.
+        kind: int = PathTable.KIND_VIDEO if isinstance(file, VideoObject) else PathTable.KIND_IMAGE
+        index: int = self.table.append(file.path, kind)
+        self._track_new_entry(state)
+        self._materialized[index] = file
+        return index
+
     def file_enqueue(self, file: FileObject) -> None:
-        self.files.enqueue(file)
+        self.files.enqueue(self._adopt(file, self.STATE_PENDING))
+
+    def get_file(self, index: int) -> FileObject:
+
+        file: FileObject | None = self._materialized.get(index)
+        if file is None:
+            file = self.FILE_OBJECT_TYPES[self.table.kind(index)](self.table.path(index))
+            self._materialized[index] = file
+
+        return file
+
+    def index_of(self, file: FileObject) -> int | None:
+
+        # Seuls les fichiers proches du fichier courant sont matérialisés, ce parcours reste donc très court.
+        for index, materialized in self._materialized.items():
+            if materialized is file: return index
+
+        return None
+
+    def _release_far_files(self) -> None:
+
+        if len(self._materialized) <= 2 * self.MATERIALIZED_WINDOW: return
+
+        kept: set[int] = set(self.files.peek(self.MATERIALIZED_WINDOW)) | set(self.reviewed_files.peek(self.MATERIALIZED_WINDOW))
+        for index in [i for i in self._materialized if i not in kept]:
+            self._materialized.pop(index).close()
 
     def file_dequeue(self) -> FileObject:
+        index: int | None = self.dequeue_entry()
+        if index is not None: return self.get_file(index)
+
+    def dequeue_entry(self) -> int | None:
+
+        index: int | None = self.files.dequeue()
+        if index is not None:
+            self.reviewed_files.push(index)
+            if self.has_snapshot: self._snapshot_move(index, self._snapshot_forward, self._snapshot_backward)
+            else:
+                self._set_entry_state(index, self.STATE_REVIEWED)
+                self._record({'op': 'dequeue', 'path': self.table.path(index)})
+            self._release_far_files()
+
+        return index
+
+    def review_entry(self, index: int) -> None:
 
-        p: FileObject = self.files.dequeue()
-        if p:
-            self.reviewed_files.push(p)
-            return p
+        # Comme dequeue_entry, pour une entrée qui n'est pas (ou plus) en tête de la queue (rejeu du journal).
+        if index not in self.files: return
+
+        self._record({'op': 'dequeue', 'path': self.table.path(index)})
+        self.files.remove(index)
+        self.reviewed_files.push(index)
+        self._set_entry_state(index, self.STATE_REVIEWED)
+        self._release_far_files()
         
     def get_current_file(self) -> FileObject:
-        return self.files.top()
+        index: int | None = self.files.top()
+        return self.get_file(index) if index is not None else None
     
     def get_most_recent_reviewed_file(self) -> FileObject:
-        return self.reviewed_files.top()
+        index: int | None = self.reviewed_files.top()
+        return self.get_file(index) if index is not None else None
     
+    def get_upcoming_files(self, n: int) -> list[FileObject]:
+        return [self.get_file(index) for index in self.files.peek(n + 1)[1:]]
+
+    def get_recent_reviewed_files(self, n: int) -> list[FileObject]:
+        return [self.get_file(index) for index in self.reviewed_files.peek(n)]
+
     def restore_previous_reviewed_file(self) -> None:
 
-        p: FileObject = self.reviewed_files.pop()
-        if p:
-            self.files.enqueue_max_priority(p)
+        index: int | None = self.reviewed_files.pop()
+        if index is not None:
+            self.files.enqueue_max_priority(index)
+            if self.has_snapshot: self._snapshot_move(index, self._snapshot_backward, self._snapshot_forward)
+            else:
+                self._set_entry_state(index, self.STATE_PENDING, at_head=True)
+                self._record({'op': 'restore', 'path': self.table.path(index)})
+            self._release_far_files()
+
+    def remove_file(self, file: FileObject) -> None:
+        index: int | None = self.index_of(file)
+        if index is not None: self.remove_entry(index)
+
+    def remove_entry(self, index: int) -> None:
+
+        self._record({'op': 'drop', 'old': self.table.path(index)})
+        self.files.remove(index)
+        self.reviewed_files.remove(index)
+        self._set_entry_state(index, self.STATE_REMOVED)
+        self._assignments.pop(index, None)
+
+        file: FileObject | None = self._materialized.pop(index, None)
+        if file is not None: file.close()
+
+    def requeue_entry(self, index: int) -> None:
+
+        # Pendant un snapshot, l'entrée a pu être déplacée par la navigation : on attend qu'elle soit à sa vraie place.
+        if self.has_snapshot:
+            self._snapshot_requeued.append(index)
+            return
+
+        if index not in self.reviewed_files: return
+
+        self._record({'op': 'requeue', 'old': self.table.path(index)})
+        self.reviewed_files.remove(index)
+        self.files.enqueue_max_priority(index)
+        self._set_entry_state(index, self.STATE_PENDING, at_head=True)
+
+    def set_file_path(self, file: FileObject, new_fp: str) -> None:
+
+        index: int | None = self.index_of(file)
+        if index is not None: self.set_entry_path(index, new_fp)
+        else: file.set_new_path(new_fp)
+
+    def set_entry_path(self, index: int, new_fp: str) -> None:
+
+        self._record({'op': 'path', 'old': self.table.path(index), 'path': new_fp})
+        self.table.set_path(index, new_fp)
+        if index < self._saved_count: self._changed.add(index)
+
+        file: FileObject | None = self._materialized.get(index)
+        if file is not None: file.set_new_path(new_fp)
+
+    def shuffle(self, keep_head: bool = False, seed: int | None = None) -> None:
+
+        # Le shuffle est fait avec une seed connue, pour pouvoir être rejoué depuis le journal.
+        if seed is None: seed = random.getrandbits(64)
+        self._record({'op': 'shuffle', 'keep_head': keep_head, 'seed': seed})
+        self.files.shuffle(keep_head=keep_head, rng=random.Random(seed))
+        self._release_far_files()
+
+        # Toute la queue change d'ordre : on renumérote, et la prochaine sauvegarde sera complète.
+        for seq, index in enumerate(self.files.iter_values()): self._seqs[index] = seq
+        self._head_seq, self._tail_seq = 0, self.size - 1
+        self._needs_full_save = True
+
+    def iter_file_paths(self) -> Iterator[str]:
+        return (self.table.path(index) for index in self.files.iter_values())
+
+    def iter_reviewed_file_paths(self) -> Iterator[str]:
+        return (self.table.path(index) for index in self.reviewed_files.iter_values())
+
+    @property
+    def has_snapshot(self) -> bool:
+        return self._snapshot_categories is not None
+
+    @staticmethod
+    def _snapshot_move(index: int, moves: list[int], opposite: list[int]) -> None:
+        # Un déplacement qui défait le précédent s'annule avec lui : on ne garde que le déplacement net depuis le snapshot.
+        if opposite and opposite[-1] == index: opposite.pop()
+        else: moves.append(index)
+
+    def take_snapshot(self) -> None:
+
+        if self.has_snapshot: return
+        self._snapshot_categories = self._custom_categories
+        self._custom_categories = []
+        self._categories_version += 1
+
+    def restore_snapshot(self) -> None:
+
+        if not self.has_snapshot: return
+
+        # Les fichiers passés au stack pendant la navigation retournent en tête de la queue, du plus récent au plus ancien,
+        # puis ceux sortis du stack y retournent. Les entrées retirées entre temps sont ignorées.
+        for index in reversed(self._snapshot_forward):
+            if index not in self.reviewed_files: continue
+            if self.reviewed_files.top() == index: self.reviewed_files.pop()
+            else: self.reviewed_files.remove(index)
+            self.files.enqueue_max_priority(index)
+
+        for index in reversed(self._snapshot_backward):
+            if index not in self.files: continue
+            if self.files.top() == index: self.files.dequeue()
+            else: self.files.remove(index)
+            self.reviewed_files.push(index)
+
+        self._custom_categories = self._snapshot_categories
+        self._snapshot_categories = None
+        self._categories_version += 1
+        self._snapshot_forward, self._snapshot_backward = [], []
+        self._release_far_files()
+
+        requeued, self._snapshot_requeued = self._snapshot_requeued, []
+        for index in requeued: self.requeue_entry(index)
+
+    @property
+    def categories_version(self) -> int:
+        return self._categories_version
+
+    @property
+    def category_clock(self) -> int:
+        return self._category_clock
+
+    def record_category_hit(self, custom_category: dict) -> None:
+
+        # 'last_hit' est un numéro d'utilisation (et non une date) : la récence se compte en fichiers triés.
+        self._category_clock += 1
+        custom_category['hits'] = custom_category.get('hits', 0) + 1
+        custom_category['last_hit'] = self._category_clock
+
+    def get_category_by_hotkey(self, hotkey: str) -> dict | None:
+        for custom_category in self._custom_categories:
+            if custom_category.get('hotkey') == hotkey: return custom_category
+        return None
+
+    def set_category_hotkey(self, custom_category: dict, hotkey: str | None) -> None:
+
+        # Une touche ne route que vers une seule catégorie : elle est retirée à celle qui l'avait.
+        if hotkey is not None:
+            previous: dict | None = self.get_category_by_hotkey(hotkey)
+            if previous is not None: previous.pop('hotkey', None)
+            custom_category['hotkey'] = hotkey
+        else:
+            custom_category.pop('hotkey', None)
 
     def get_custom_categories(self, sort_by_name: bool = True) -> list[dict[str: str]]:
 
@@ -113,6 +559,8 @@ class SortingTask:
         for nc in new_categories:
             assert isinstance(nc, dict)
             self._custom_categories.append(nc)
+            self._category_clock = max(self._category_clock, nc.get('last_hit', 0))
+        self._categories_version += 1
 
     def remove_custom_category(self, target: dict) -> None:
         
@@ -120,8 +568,10 @@ class SortingTask:
             if custom_category['name'] == target['name'] and \
                 custom_category['path'] == target['path']:
                 self._custom_categories.remove(custom_category)
+                self._categories_version += 1
                 break
 
     def clear_custom_categories(self) -> None:
         self._custom_categories.clear()
+        self._categories_version += 1
 
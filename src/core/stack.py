@@ -1,18 +1,25 @@
+from src.core.indexed_deque import IndexedDeque
 
 
-class Stack:
+class Stack(IndexedDeque):
 
     """
     Stack is a class that implements a basic stack data structure, allowing for standard stack operations such as push, pop, and priority insertion.
     It provides methods to check if the stack is empty, retrieve the current size, and inspect the top element.
+    It is backed by a collections.deque with a membership index (see IndexedDeque), so that every operation below is O(1), except values and peek.
 
     Methods:
     - is_empty() -> bool: Returns True if the stack is empty, otherwise False.
     - push(obj: object) -> None: Adds an object to the top of the stack.
+    - push_many(objs: list | range) -> None: Pushes several objects onto the stack, in order (the last one ending on top).
     - pop() -> object: Removes and returns the top object from the stack. Returns None if the stack is empty.
     - push_lowest_priority(obj: object) -> None: Adds an object to the bottom of the stack (lowest priority).
     - remove(obj: object) -> None: Removes the specified object from the stack, if it exists.
     - top() -> object: Returns the top object in the stack without removing it.
+    - peek(n: int) -> list: Returns the n top objects in the stack (the top first) without removing them.
+
+    Parameters:
+    - dense (bool): If True, the stack only holds non-negative ints (e.g. PathTable indices) and uses a compact storage.
 
     Properties:
     - size (int): Returns the current size of the stack.
@@ -22,44 +29,33 @@ class Stack:
     - None. The methods handle stack underflow internally by checking if the stack is empty.
     """
 
-    def __init__(self, init_values: list[object]) -> None:
-
-        self._values: list = init_values if init_values else []
-        self._size: int = len(self.values)
+    def __init__(self, init_values: list[object], dense: bool = False) -> None:
+        super().__init__(init_values, dense)
 
-    @property
-    def size(self) -> int:
-        return self._size
-    
-    def set_size(self, n: int) -> None:
-        self._size = n
-
-    @property
-    def values(self) -> list:
-        return self._values
-    
-    def is_empty(self) -> bool:
-        return self.size == 0
-    
     def push(self, obj: object) -> None:
-        self.set_size(self.size + 1)
-        self.values.append(obj)
+        self._register(obj)
+        self._values.append(obj)
+
+    def push_many(self, objs: list | range) -> None:
+        self._extend_right(objs)
 
     def pop(self) -> object:
 
         if not self.is_empty():
+            self._prune_right()
+            obj: object = self._values.pop()
+            self._forget(obj)
             self.set_size(self.size - 1)
-            return self.values.pop(-1)
+            return obj
     
     def push_lowest_priority(self, obj: object) -> object:
-        self.set_size(self.size + 1)
-        self.values.insert(0, obj)
-
-    def remove(self, obj: object) -> None:
-        if obj in self.values:
-            self.values.remove(obj)
-            self.set_size(self.size - 1)
+        self._register(obj)
+        self._values.appendleft(obj)
 
     def top(self) -> object:
         if not self.is_empty():
-            return self.values[-1]
\ No newline at end of file
+            self._prune_right()
+            return self._values[-1]
+
+    def peek(self, n: int) -> list:
+        return self._peek_right(n)
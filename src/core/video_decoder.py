@@ -0,0 +1,205 @@
+from PIL import Image
+from collections import deque
+from threading import Thread, Condition, Event
+import time
+import cv2
+
+
+
+class VideoDecoder:
+
+    """
+    VideoDecoder decodes a video file on a dedicated thread, and keeps a bounded buffer of frames that are already scaled
+    to the display size and converted to RGB, so that the Tk thread only has to turn the current frame into a PhotoImage.
+    Frames are paced by the FPS of the file on a wall clock : when the display is late, the frames that are already
+    out of date are dropped (and the decoding thread skips the conversion of frames that would be late anyway).
+    The video loops when its end is reached. Hardware decoding is requested when the OpenCV build supports it.
+
+    Methods:
+    - get_frame() -> Image.Image | None: Returns the frame to display now (the last one if no newer frame is due), or None before the first frame.
+    - set_target_size(target_size: tuple[int, int]) -> None: Changes the size of the decoded frames (e.g. after a resize of the canvas).
+    - replay() -> None: Restarts the video from the beginning.
+    - close() -> None: Stops the decoding thread and releases the video.
+
+    Properties:
+    - fps (float): Returns the playback FPS of the video.
+    - frame_number (int): Returns the number of frames returned by get_frame so far (changes each time a new frame is due).
+    - dropped_frames (int): Returns the number of frames dropped because they were late.
+    - hardware_accelerated (bool): Returns True if the video is decoded with hardware acceleration.
+    """
+
+    BUFFER_FRAMES: int = 8
+    DEFAULT_FPS: float = 30.0
+    MAX_FPS: float = 120.0
+    JOIN_TIMEOUT: float = 1.0
+
+    def __init__(self, fp: str, target_size: tuple[int, int]) -> None:
+
+        self._fp: str = fp
+        self._target_size: tuple[int, int] = target_size
+        self._buffer: deque[tuple[float, Image.Image]] = deque()
+        self._lock: Condition = Condition()
+        self._stopped: Event = Event()
+        self._restart: bool = False
+        self._clock_start: float | None = None
+        self._current: Image.Image | None = None
+        self._frame_number: int = 0
+        self._dropped_frames: int = 0
+
+        self._video_cap: cv2.VideoCapture = self._open_video_cap(fp)
+        hw_property: int | None = getattr(cv2, 'CAP_PROP_HW_ACCELERATION', None)
+        self._hardware_accelerated: bool = hw_property is not None and self._video_cap.get(hw_property) > 0
+
+        # Certains fichiers renvoient un FPS nul ou absurde, on se rabat alors sur une valeur par défaut.
+        fps: float = self._video_cap.get(cv2.CAP_PROP_FPS)
+        self._fps: float = fps if 0 < fps <= self.MAX_FPS else self.DEFAULT_FPS
+
+        self._thread: Thread = Thread(target=self._run, name='video-decoder', daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _open_video_cap(fp: str) -> cv2.VideoCapture:
+
+        # Le décodage matériel n'existe que dans les builds récents d'OpenCV, et peut échouer selon le codec / la machine.
+        hw_property: int | None = getattr(cv2, 'CAP_PROP_HW_ACCELERATION', None)
+        hw_any: int | None = getattr(cv2, 'VIDEO_ACCELERATION_ANY', None)
+        if hw_property is not None and hw_any is not None:
+            try:
+                video_cap: cv2.VideoCapture = cv2.VideoCapture(fp, cv2.CAP_ANY, [hw_property, hw_any])
+                if video_cap.isOpened(): return video_cap
+                video_cap.release()
+            except cv2.error:
+                pass
+
+        return cv2.VideoCapture(fp)
+
+    @property
+    def fps(self) -> float:
+        return self._fps
+
+    @property
+    def frame_number(self) -> int:
+        return self._frame_number
+
+    @property
+    def dropped_frames(self) -> int:
+        return self._dropped_frames
+
+    @property
+    def hardware_accelerated(self) -> bool:
+        return self._hardware_accelerated
+
+    def set_target_size(self, target_size: tuple[int, int]) -> None:
+
+        with self._lock:
+            if target_size == self._target_size: return
+            self._target_size = target_size
+
+            # Les frames déjà décodées ne sont plus à la bonne taille.
+            self._buffer.clear()
+            self._lock.notify_all()
+
+    def replay(self) -> None:
+        with self._lock:
+            self._restart = True
+            self._lock.notify_all()
+
+    def _playback_time(self) -> float | None:
+        # Position (en secondes) de la lecture selon l'horloge murale, None tant que la première frame n'a pas été affichée.
+        return None if self._clock_start is None else time.monotonic() - self._clock_start
+
+    def _scale_frame(self, frame, target_size: tuple[int, int]) -> Image.Image:
+
+        # On réduit avant de convertir en RGB : la conversion se fait alors sur l'image à la taille d'affichage.
+        height, width = frame.shape[:2]
+        if (width, height) != target_size:
+            interpolation: int = cv2.INTER_AREA if target_size[0] < width else cv2.INTER_LINEAR
+            frame = cv2.resize(frame, target_size, interpolation=interpolation)
+        return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    def _run(self) -> None:
+
+        frame_index: int = 0
+        loop_offset: float = 0.0
+
+        try:
+            while not self._stopped.is_set():
+
+                with self._lock:
+                    self._lock.wait_for(lambda: self._stopped.is_set() or self._restart or len(self._buffer) < self.BUFFER_FRAMES)
+                    if self._stopped.is_set(): return
+
+                    if self._restart:
+                        self._restart = False
+                        self._buffer.clear()
+                        self._clock_start = None
+                        self._video_cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        frame_index, loop_offset = 0, 0.0
+
+                    target_size: tuple[int, int] = self._target_size
+                    playback_time: float | None = self._playback_time()
+
+                pts: float = loop_offset + frame_index / self.fps
+
+                # Cette frame serait déjà périmée une fois affichée : on avance sans la convertir ni la resize.
+                if playback_time is not None and pts + 1 / self.fps < playback_time:
+                    ret: bool = self._video_cap.grab()
+                    if ret:
+                        frame_index += 1
+                        self._dropped_frames += 1
+                        continue
+                else:
+                    ret, frame = self._video_cap.read()
+
+                # Fin de la vidéo : on recommence au début, en continuant l'horloge.
+                if not ret:
+                    if frame_index == 0: return
+                    loop_offset = pts
+                    frame_index = 0
+                    self._video_cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    continue
+
+                pil_image: Image.Image = self._scale_frame(frame, target_size)
+                frame_index += 1
+
+                with self._lock:
+                    # Un replay ou un resize a eu lieu pendant le décodage : cette frame n'est plus valable.
+                    if self._restart or target_size != self._target_size: continue
+                    self._buffer.append((pts, pil_image))
+
+        except Exception as decoder_exception:
+            print(f"[W] Erreur de décodage de la vidéo @ {self._fp}. (e: {decoder_exception})")
+
+        finally:
+            self._video_cap.release()
+
+    def get_frame(self) -> Image.Image | None:
+
+        with self._lock:
+
+            # L'horloge démarre avec l'affichage de la première frame.
+            if self._clock_start is None:
+                if not self._buffer: return self._current
+                self._clock_start = time.monotonic() - self._buffer[0][0]
+
+            # On garde la frame la plus récente qui est due, les précédentes (en retard) sont abandonnées.
+            playback_time: float = self._playback_time()
+            due: int = 0
+            while self._buffer and self._buffer[0][0] <= playback_time:
+                self._current = self._buffer.popleft()[1]
+                due += 1
+
+            if due:
+                self._frame_number += 1
+                self._dropped_frames += due - 1
+                self._lock.notify_all()
+
+            return self._current
+
+    def close(self) -> None:
+
+        with self._lock:
+            self._stopped.set()
+            self._lock.notify_all()
+
+        if self._thread.is_alive(): self._thread.join(self.JOIN_TIMEOUT)
@@ -5,6 +5,7 @@ from src.gui.subgui.task_edit_gui import TaskEditGUI
 from src.gui.subgui.custom_category_gui import CustomCategoryGUI
 from src.gui.subgui.name_changer_gui import NameChangerGUI
 from src.gui.subgui.favorite_crawler_gui import FavoriteCrawlerGUI
+from src.gui.widgets.virtualized_list import VirtualizedList
 
 from src.core.file_objects import FileObject, ImageObject, VideoObject
 from src.core.app_config_object import AppConfigurationObject
@@ -15,18 +16,23 @@ from src.scripts.yaml_helper import YAMLSafeHelper
 from src.scripts.custom_category_helper import CustomCategoryHelper
 from src.scripts.file_display import FileDisplayer
 from src.scripts.task_data_manager import SortingTaskDataManager
+from src.scripts.task_object_manager import SortingTaskObjectManager
 from src.scripts.name_changer_helper import FilenameManager
 from src.scripts.crawler import Crawler
-from src.scripts.string_maching_helper import StringMatchHelper
+from src.scripts.category_index import CategoryIndex
+from src.scripts.render_scheduler import RenderScheduler
+from src.scripts.file_prefetcher import FilePrefetcher
+from src.scripts.thumbnail_cache import ThumbnailCache
+from src.scripts.poster_cache import PosterCache
+from src.scripts.file_transfer import FileTransferEngine
+from src.scripts.assignment_helper import DeferredAssignmentHelper
 
 
 import tkinter as tk
 from tkinter import messagebox
 import subprocess
 import os
-import copy
 import math
-import random
 from send2trash import send2trash
 
 
@@ -42,6 +48,18 @@ class SortingGUI:
     APP_CONFIG_FILENAME: str = "app_config.yaml"
     SUPPORTED_EXTENSIONS_CONFIG_FILENAME: str = "supported.yaml"
 
+    PREFETCH_FORWARD_COUNT: int = 4
+    PREFETCH_BACKWARD_COUNT: int = 1
+
+    FILE_FEED_INTERVAL: int = 100
+    POSTER_POLL_INTERVAL: int = 100
+    FILE_FEED_BATCH: int = 5000
+
+    JOURNAL_MAINTENANCE_INTERVAL: int = 30000
+    JOURNAL_COMPACTION_COUNT: int = 500
+
+    CATEGORY_BUTTON_HEIGHT: int = 30
+
 
     def __init__(self, size: str, config_fp: str) -> None:
 
@@ -55,12 +73,25 @@ class SortingGUI:
         self._config_fp: str = config_fp
         self._unsaved_modification: bool = False
         self._viewer_mode_var: tk.BooleanVar = tk.BooleanVar()
+        self._deferred_mode_var: tk.BooleanVar = tk.BooleanVar()
+        self._poster_mode_var: tk.BooleanVar = tk.BooleanVar(value=self._app_configuration.poster_mode)
         self._remove_button_state: tk.BooleanVar = tk.BooleanVar()
         self._sorting_task: SortingTask = None
-        self._sorting_task_backup: SortingTask = None
         self._previous_bar_var: str = ""
         self._custom_category_pick: int = 0
-        self._current_sorting_categories: dict = dict()
+        self._current_sorting_categories: list[dict] = []
+        self._category_index: CategoryIndex = CategoryIndex()
+        self._render_scheduler: RenderScheduler = RenderScheduler(self.root, self.update_app)
+        self._file_prefetcher: FilePrefetcher = FilePrefetcher()
+        FileDisplayer.thumbnail_cache = ThumbnailCache()
+        FileDisplayer.poster_cache = PosterCache(FileDisplayer.thumbnail_cache)
+        self._file_feed_job: str | None = None
+        self._path_validation_job: str | None = None
+        self._file_transfer_engine: FileTransferEngine = FileTransferEngine()
+        self._file_transfer_job: str | None = None
+        self._closing_job: str | None = None
+        self._valid_extensions: dict[str: frozenset[str]] = SortingTaskObjectManager.load_valid_extensions(
+            os.path.join(config_fp, self.SUPPORTED_EXTENSIONS_CONFIG_FILENAME))
 
         self.init_app()
 
@@ -85,6 +116,10 @@ class SortingGUI:
     def viewer_mode(self) -> bool:
         return self._viewer_mode_var.get()
     
+    @property
+    def deferred_mode(self) -> bool:
+        return self._deferred_mode_var.get()
+
     @property
     def remove_button_state(self) -> bool:
         return self._remove_button_state.get()
@@ -98,9 +133,17 @@ class SortingGUI:
         return self._sorting_task
 
     @property
-    def current_sorting_categories(self) -> dict:
+    def current_sorting_categories(self) -> list[dict]:
         return self._current_sorting_categories
     
+    @property
+    def render_scheduler(self) -> RenderScheduler:
+        return self._render_scheduler
+
+    @property
+    def file_prefetcher(self) -> FilePrefetcher:
+        return self._file_prefetcher
+
     @property
     def custom_category_pick(self) -> int:
         return self._custom_category_pick
@@ -186,6 +229,7 @@ class SortingGUI:
         self.root.bind('<Return>', self.on_enter)
         self.root.bind('<Control-s>', self.on_ctrl_s)
         self.root.bind('<Control-f>', self.on_ctrl_f)
+        self.root.bind('<Key>', self.on_hotkey)
 
     def create_menubar(self) -> None:
 
@@ -219,6 +263,8 @@ class SortingGUI:
         self.tools_menu.add_command(label='Favorite File Crawler', foreground=text1_color, background=bg2_color, command=self.favorite_file_crawler)
         self.tools_menu.add_separator(background=bg2_color)
         self.tools_menu.add_command(label='Shuffle current Task', foreground=text1_color, background=bg2_color, command=self.shuffle_task)
+        self.tools_menu.add_separator(background=bg2_color)
+        self.tools_menu.add_command(label='Apply deferred assignments', foreground=text1_color, background=bg2_color, command=self.apply_deferred_assignments)
 
         # Menu Theme
         self.theme_menu = tk.Menu(self.menubar, tearoff=0, background=header_color)
@@ -236,6 +282,10 @@ class SortingGUI:
         self.menubar.add_cascade(label="Parameters", menu=self.parameters_menu, foreground=text2_color, background=header_color)
         self.parameters_menu.add_checkbutton(label="Viewer Mode", foreground=text1_color, background=bg2_color, selectcolor=text1_color,
                                              variable=self._viewer_mode_var, command=self.viewer_mode_logic)
+        self.parameters_menu.add_checkbutton(label="Deferred Mode", foreground=text1_color, background=bg2_color, selectcolor=text1_color,
+                                             variable=self._deferred_mode_var, command=self.deferred_mode_logic)
+        self.parameters_menu.add_checkbutton(label="Video Poster Mode", foreground=text1_color, background=bg2_color, selectcolor=text1_color,
+                                             variable=self._poster_mode_var, command=self.poster_mode_logic)
 
     def create_canvas(self) -> None:
 
@@ -275,6 +325,8 @@ class SortingGUI:
         self.display_canvas: tk.Canvas = tk.Canvas(self.root, width=canvas_width, height=canvas_height,
                                         bg=self.app_config.colors.frame1_color)
         self.display_canvas.place(x=x_offset, y=y_offset)
+        self.display_canvas.bind('<Configure>', self.on_display_canvas_resize)
+        self.display_canvas.bind('<Button-1>', self.on_display_canvas_click)
 
     def create_sorting_util_canvas(self) -> None:
 
@@ -329,15 +381,17 @@ class SortingGUI:
         self.sorting_canvas: tk.Canvas = tk.Canvas(self.root, width=(canvas_width - SCROLLBAR_WIDTH), height=canvas_height, bg=self.app_config.colors.frame2_color)
         self.sorting_canvas.place(x=x_offset, y=y_offset)
 
-        self.sorting_buttons_frame: tk.Frame = tk.Frame(self.sorting_canvas, background=self.app_config.colors.frame2_color)
-        self.sorting_buttons_frame.place(relheight=1.0, relwidth=1.0)
-
         self.sorting_scrollbar = tk.Scrollbar(self.root, orient="vertical")
         self.sorting_scrollbar.place(x=x_offset*2 + canvas_width - SCROLLBAR_WIDTH, y=y_offset, height=canvas_height)
 
-        self.sorting_canvas_window = self.sorting_canvas.create_window((0, 0), window=self.sorting_buttons_frame, anchor="nw")
-        self.sorting_canvas.itemconfig(self.sorting_canvas_window, width=canvas_width)
-        self.sorting_buttons_frame.bind("<Configure>", lambda event: self.sorting_canvas.configure(scrollregion=self.sorting_canvas.bbox("all")))
+        # Seules les lignes visibles ont un bouton, recyclé au scroll et à chaque recherche (voir VirtualizedList).
+        self.sorting_list: VirtualizedList = VirtualizedList(self.sorting_canvas, self.sorting_scrollbar, self.CATEGORY_BUTTON_HEIGHT,
+            on_select=lambda i: self.sorting_button_logic(self.current_sorting_categories[i]),
+            background=self.app_config.colors.frame2_color,
+            on_context=lambda i: self.category_hotkey_logic(self.current_sorting_categories[i]))
+        self.sorting_list.set_colors(self.app_config.colors.button2_color, self.app_config.colors.text1_color,
+            self.app_config.colors.button1_color, self.app_config.colors.text2_color)
+        self.root.bind("<MouseWheel>", self.on_mouse_wheel)
 
     def create_file_info_canvas(self) -> None:
 
@@ -449,6 +503,7 @@ class SortingGUI:
             bg=self.app_config.colors.button1_color, foreground=self.app_config.colors.text2_color, command=self.delete_custom_category_logic)
         
         self.search_bar: tk.Entry = tk.Entry(self.sorting_utilbuttons_frame, textvariable=self._search_bar_var, width=40)
+        self._search_bar_var.trace_add('write', lambda *_: self.detect_entry())
 
         self.add_sorting_button_button.pack(fill=tk.BOTH, expand=True)
         self.remove_sorting_button_button.pack(fill=tk.BOTH, expand=True)
@@ -481,20 +536,157 @@ class SortingGUI:
     # ----- Sorting Management ----- #
 
     def start_sorting_task(self, sortingtask: SortingTask) -> None:
+
+        # Si l'ancienne task était encore en train d'être crawlée ou validée, on arrête son crawl / sa validation.
+        if self.sorting_task and self.sorting_task is not sortingtask and self.sorting_task.file_feed:
+            self.sorting_task.file_feed.cancel()
+            self.sorting_task.set_file_feed(None)
+        if self.sorting_task and self.sorting_task is not sortingtask and self.sorting_task.path_validation:
+            self.sorting_task.path_validation.cancel()
+            self.sorting_task.set_path_validation(None)
+
+        # Le journal ne sert qu'en cas de crash : une task fermée normalement n'en a plus besoin.
+        if self.sorting_task and self.sorting_task is not sortingtask and self.sorting_task.journal:
+            self.sorting_task.journal.discard()
+            self.sorting_task.set_journal(None)
+
+        # Une task sauvegardée est journalisée. Si son journal contenait déjà des opérations (crash), elles ne sont pas encore sauvegardées.
+        if sortingtask and sortingtask.path and not sortingtask.journal: SortingTaskDataManager.attach_journal(sortingtask)
+        if sortingtask and sortingtask.journal and sortingtask.journal.count: self.set_unsaved_modification(True)
+
+        # Le mode différé est un paramètre de l'app : il s'applique aussi à la nouvelle task.
+        if sortingtask: sortingtask.set_deferred_mode(self.deferred_mode)
+
         self.set_sorting_task(sortingtask)
         self.load_custom_categories_buttons()
         self.update_info_frame()
         self.update_app_status()
+        self.schedule_file_feed()
+        self.schedule_path_validation()
+
+    def schedule_file_feed(self) -> None:
+        if self._file_feed_job is not None: return
+        if not self.sorting_task or not self.sorting_task.file_feed: return
+        self._file_feed_job = self.root.after(self.FILE_FEED_INTERVAL, self.poll_file_feed)
+
+    def poll_file_feed(self) -> None:
+
+        self._file_feed_job = None
+        if not self.sorting_task: return
+
+        was_empty: bool = self.sorting_task.is_empty()
+        feeding: bool = SortingTaskDataManager.feed_task(self.sorting_task, self._valid_extensions, self.FILE_FEED_BATCH)
+
+        # Les premiers fichiers viennent d'arriver : il faut tout mettre à jour. Sinon, seul le compteur change.
+        if was_empty and not self.sorting_task.is_empty():
+            self.update_info_frame()
+            self.update_app_status()
+        else:
+            self.update_remaining_files_label()
+            if not feeding: self.prefetch_neighbour_files()
+
+        if feeding: self.schedule_file_feed()
+
+    def schedule_path_validation(self) -> None:
+        if self._path_validation_job is not None: return
+        if not self.sorting_task or not self.sorting_task.path_validation: return
+        self._path_validation_job = self.root.after(self.FILE_FEED_INTERVAL, self.poll_path_validation)
+
+    def poll_path_validation(self) -> None:
+
+        self._path_validation_job = None
+        if not self.sorting_task: return
+
+        current: int | None = self.sorting_task.files.top()
+        validating: bool = SortingTaskDataManager.validate_task(self.sorting_task)
+
+        # Si le fichier courant vient d'être retiré de la task, il faut tout mettre à jour. Sinon, seul le compteur change.
+        if self.sorting_task.files.top() != current:
+            self.update_info_frame()
+            self.update_app_status()
+        else: self.update_remaining_files_label()
+
+        if validating: self.schedule_path_validation()
+
+    def schedule_file_transfer_poll(self) -> None:
+        if self._file_transfer_job is not None: return
+        self._file_transfer_job = self.root.after(self.FILE_FEED_INTERVAL, self.poll_file_transfers)
+
+    def poll_file_transfers(self) -> None:
+
+        self._file_transfer_job = None
+        self.apply_file_transfer_results()
+        if self._file_transfer_engine.pending: self.schedule_file_transfer_poll()
+
+    def apply_file_transfer_results(self) -> None:
+
+        # On vérifie que l'entrée n'a pas changé entre temps (autre task chargée, ...).
+        task: SortingTask | None = self.sorting_task
+        current: int | None = task.files.top() if task else None
+
+        failures: list[str] = []
+        current_changed: bool = False
+        for index, src, dst, error in self._file_transfer_engine.drain_results():
+            if not task or index is None or index >= len(task.table) or task.table.path(index) != src: continue
+            if index == current: current_changed = True
+
+            # Une destination None est un envoi à la corbeille (assignations différées).
+            if error is None:
+                if dst is None: task.remove_entry(index)
+                else: task.set_entry_path(index, dst)
+                continue
+
+            # En cas d'échec, le fichier retourne en tête de la queue, avec son chemin d'origine.
+            task.requeue_entry(index)
+            failures.append(f'{src} -> {dst or "trash"} : {error}')
+
+        # Une seule fenêtre pour tous les échecs d'un même passage (une application différée peut en produire beaucoup).
+        if failures:
+            examples: str = '\n'.join(failures[:DeferredAssignmentHelper.REPORT_DIRECTORIES])
+            if len(failures) > DeferredAssignmentHelper.REPORT_DIRECTORIES: examples += f'\n... and {len(failures) - DeferredAssignmentHelper.REPORT_DIRECTORIES} more'
+            messagebox.showerror(title='Move failed', message=f'{len(failures)} file(s) could not be moved :\n{examples}\nThese files have been put back in the queue.')
+
+        # Le fichier affiché peut aussi avoir seulement changé de chemin.
+        if task and (task.files.top() != current or current_changed):
+            self.update_info_frame()
+            self.update_app_status()
+
+    def is_current_file_in_transfer(self, file: FileObject | None = None) -> bool:
+
+        # Par défaut, le fichier vérifié est le fichier courant.
+        if file is None: file = self.sorting_task.get_current_file()
+        if not self._file_transfer_engine.is_busy(file.path): return False
+
+        messagebox.showwarning(message=f'This file is still being moved (@ {file.path}), please wait for the transfer to end.')
+        return True
+
+    def journal_maintenance(self) -> None:
+
+        # Les opérations en attente sont écrites sur le disque, et le journal est compacté dans le fichier de la task
+        # (sauvegarde) quand il devient long.
+        if self.sorting_task and self.sorting_task.journal and not self.viewer_mode:
+            self.sorting_task.journal.sync()
+            if self.sorting_task.journal.count >= self.JOURNAL_COMPACTION_COUNT: self.save_task()
+
+        self.root.after(self.JOURNAL_MAINTENANCE_INTERVAL, self.journal_maintenance)
 
     def make_sorting_task_backup(self) -> None:
+
         if not self.sorting_task: return
-        self.sorting_task.get_current_file().close()
-        self._sorting_task_backup: SortingTask = copy.deepcopy(self.sorting_task)
-    
+        current: FileObject | None = self.sorting_task.get_current_file()
+        if current: current.close()
+
+        # Rien n'est copié : la navigation du viewer est notée pour être défaite à la sortie (voir SortingTask.take_snapshot).
+        # Le crawl, la validation, les transferts et le journal continuent donc sur la même task.
+        self.sorting_task.take_snapshot()
+
     def load_sorting_task_backup(self) -> None:
-        if not self._sorting_task_backup: return
-        self.start_sorting_task(self._sorting_task_backup)
-        self._sorting_task_backup = None
+
+        if not self.sorting_task or not self.sorting_task.has_snapshot: return
+        current: FileObject | None = self.sorting_task.get_current_file()
+        if current: current.close()
+
+        self.sorting_task.restore_snapshot()
 
     def create_custom_category_logic(self) -> None:
 
@@ -535,62 +727,45 @@ class SortingGUI:
 
         # Logique de redirection ;
         else:
-            status: bool = CustomCategoryHelper.move_file_into_category(self.sorting_task, cc)
-            if status: self.next_task()
-
+            if self.is_current_file_in_transfer(): return
+            status: bool = CustomCategoryHelper.move_file_into_category(self.sorting_task, cc, self._file_transfer_engine)
+            if status:
+                self.sorting_task.record_category_hit(cc)
+                self.next_task()
+                self.schedule_file_transfer_poll()
+
+        # La recherche est terminée : le focus quitte la barre de recherche, pour que les raccourcis des catégories
+        # soient de nouveau actifs (sinon, après « recherche + Entrée », toutes les touches iraient dans la barre).
         self.set_search_bar('')
+        self.display_canvas.focus_set()
 
-    def load_custom_categories_buttons(self) -> None:
- 
-        # On clear la frame avant de replacer les catégories présentes dans la SortingTask.
-
-        # print(self.sorting_canvas.winfo_width(), self.sorting_buttons_frame.winfo_width())
-
-        self.clear_frame(self.sorting_buttons_frame)
-        self.current_sorting_categories.clear()
+    def category_hotkey_logic(self, cc: dict) -> None:
 
+        if self.viewer_mode: return
         if not self.sorting_task: return
 
-        text_color: str = self.app_config.colors.text1_color
-        entry: str = self.search_bar_var
-        button_height: int = 30
-        
-        i: int = 0
+        if CustomCategoryHelper.ask_category_hotkey(self.sorting_task, cc):
+            self.set_unsaved_modification(True)
+            self.load_custom_categories_buttons()
 
-        for custom_category in self.sorting_task.get_custom_categories(sort_by_name=True):
-            
-            # Si la catégorie ne match pas avec le champ de recherche, alors on peut simplement le skip
-            if not StringMatchHelper.string_match(entry, custom_category['name']): continue
-
-            if i == self.custom_category_pick:
-                button_color: str = self.app_config.colors.button1_color
-                text_color: str = self.app_config.colors.text2_color
-            else:
-                button_color:str = self.app_config.colors.button2_color
-                text_color: str = self.app_config.colors.text1_color
-
-            cc_button: tk.Button = tk.Button(self.sorting_buttons_frame, text=f"{custom_category['name']}",
-                    bg=button_color,
-                    foreground=text_color,
-                    command=lambda custom_category=custom_category: self.sorting_button_logic(custom_category))
-            
-            cc_button.place(relwidth=1, rely=0, y=(i * button_height), height=button_height)
-            
-            self.current_sorting_categories[i] = custom_category
-            self.current_sorting_categories[i].update({'button_ref': cc_button})
+    def load_custom_categories_buttons(self) -> None:
 
-            i += 1
+        # Seules les catégories qui matchent avec le champ de recherche sont affichées (voir CategoryIndex). La liste
+        # ne crée des boutons que pour les lignes visibles : filtrer ne coûte pas un widget par catégorie.
+        self._current_sorting_categories = self._category_index.search(self.sorting_task, self.search_bar_var) if self.sorting_task else []
 
-        # On redimensionne rapidement de la frame et on désactive le scroll si il n'est pas nécessaire
-        total_height = i * button_height
-        self.toggle_sorting_scroll((total_height >= self.sorting_buttons_frame.winfo_height()))
-        self.sorting_buttons_frame.config(height=total_height)
+        self.sorting_list.set_items([
+            f"[{custom_category['hotkey']}] {custom_category['name']}" if custom_category.get('hotkey') else custom_category['name']
+            for custom_category in self.current_sorting_categories
+        ])
+        self.sorting_list.set_selection(self.custom_category_pick)
 
     # ----- Task Options (Menubar) ----- #
 
     def create_task(self) -> None:
 
         if self.viewer_mode: return
+        if not self.resolve_pending_assignments(): return
         
         task_gui: TaskCreationGUI = TaskCreationGUI(self.root, self.app_config,
                                 os.path.join(self.config_folder_path, self.SUPPORTED_EXTENSIONS_CONFIG_FILENAME))
@@ -610,6 +785,7 @@ class SortingGUI:
     def load_task(self) -> None:
 
         if self.viewer_mode: return
+        if not self.resolve_pending_assignments(): return
         
         new_task: SortingTask = SortingTaskDataManager.load_task(os.path.join(self.config_folder_path, self.SUPPORTED_EXTENSIONS_CONFIG_FILENAME))
         if new_task:
@@ -633,6 +809,7 @@ class SortingGUI:
 
         if not self.sorting_task: return
         if self.viewer_mode: return
+        if not self.resolve_pending_assignments(): return
         # Pas besoin de del ici, puisque Python est garbage collecté.
         self.start_sorting_task(None)
         self.set_unsaved_modification(False)
@@ -656,12 +833,18 @@ class SortingGUI:
 
         if not self.sorting_task: return
 
+        # Les transferts déjà terminés sont appliqués d'abord, pour ne pas restaurer un fichier avec son ancien chemin,
+        # et un fichier dont le déplacement est encore en cours n'est pas restauré.
+        self.apply_file_transfer_results()
+        p: FileObject = self.sorting_task.get_most_recent_reviewed_file()
+        if p and self.is_current_file_in_transfer(p): return
+
         # On récupère le fichier top juste pour le fermer.
         c: FileObject = self.sorting_task.get_current_file()
         if c: c.close()
         
-        p: FileObject = self.sorting_task.get_most_recent_reviewed_file()
-        if p: self.set_unsaved_modification(True)
+        # En viewer mode on ne demande pas de sauvegarder.
+        if p and not self.viewer_mode: self.set_unsaved_modification(True)
 
         self.sorting_task.restore_previous_reviewed_file()
         self.update_info_frame()
@@ -671,6 +854,8 @@ class SortingGUI:
         self.app_config.switch_resize_mode()
         self.app_config.save_config()
         self.update_app_status()
+        self.refresh_display()
+        self.prefetch_neighbour_files()
 
     def open_in_folder(self) -> None:
 
@@ -684,17 +869,30 @@ class SortingGUI:
         if not self.sorting_task: return
 
         current: FileObject = self.sorting_task.get_current_file()
-        if isinstance(current, VideoObject): current.replay_video()
+        if not isinstance(current, VideoObject): return
+
+        # En poster mode, le bouton lance la lecture de la vidéo.
+        if FileDisplayer.is_showing_poster(current, self.app_config):
+            current.request_playback()
+            self.refresh_display()
+        else: current.replay_video()
 
     def send_to_trash(self) -> None:
 
         if self.viewer_mode: return
         if not self.is_sorting_task_valid(): return
+        if self.is_current_file_in_transfer(): return
         
+        # En mode différé, le fichier est seulement marqué pour la corbeille.
+        if self.sorting_task.deferred_mode:
+            self.sorting_task.assign(self.sorting_task.files.top(), trash=True)
+            self.next_task()
+            return
+
         self.next_task()
         p: FileObject = self.sorting_task.get_most_recent_reviewed_file()
         send2trash(os.path.normpath(p.path))
-        self.sorting_task.reviewed_files.remove(p)
+        self.sorting_task.remove_file(p)
 
         self.set_unsaved_modification(True)
         self.update_info_frame()
@@ -703,6 +901,7 @@ class SortingGUI:
 
         if self.viewer_mode: return
         if not self.is_sorting_task_valid(): return
+        if self.is_current_file_in_transfer(): return
 
         rename_gui: NameChangerGUI = NameChangerGUI(self.root, self.sorting_task, self.app_config)
         if rename_gui.has_changed_name: self.set_unsaved_modification(True)
@@ -713,12 +912,14 @@ class SortingGUI:
 
         if self.viewer_mode: return
         if not self.is_sorting_task_valid(): return
+        if self.is_current_file_in_transfer(): return
 
         current: FileObject = self.sorting_task.get_current_file()
         current.close()
-        no_ext_filename: str = '.'.join(os.path.splitext(current.filename)[:-1:])
+        filename: str = self.get_pending_filename(current)
+        no_ext_filename: str = '.'.join(os.path.splitext(filename)[:-1:])
 
-        if self.FAVORITE_MARK in current.filename:
+        if self.FAVORITE_MARK in filename:
             FilenameManager.rename_file(self.sorting_task, no_ext_filename.replace(self.FAVORITE_MARK, ''))
         else:
             FilenameManager.rename_file(self.sorting_task, (self.FAVORITE_MARK + no_ext_filename))
@@ -749,17 +950,62 @@ class SortingGUI:
         c: FileObject = self.sorting_task.get_current_file()
         if c: c.close()
 
-        random.shuffle(self.sorting_task.files.values)
+        self.sorting_task.shuffle()
         self.set_unsaved_modification(True)
         self.update_info_frame()
 
+    def apply_deferred_assignments(self) -> bool:
+
+        if self.viewer_mode: return False
+        if not self.sorting_task or not self.sorting_task.assignments:
+            messagebox.showinfo(message='There are no deferred assignments to apply.')
+            return False
+
+        # Le rapport est un dry-run : rien n'est déplacé avant la confirmation.
+        plan: list[dict] = DeferredAssignmentHelper.build_plan(self.sorting_task)
+        if not messagebox.askyesno(title='Apply deferred assignments', message=DeferredAssignmentHelper.format_report(plan) + '\n\nApply now ?'):
+            return False
+
+        c: FileObject | None = self.sorting_task.get_current_file()
+        if c: c.close()
+
+        if DeferredAssignmentHelper.apply_plan(self.sorting_task, plan, self._file_transfer_engine):
+            self.set_unsaved_modification(True)
+            self.schedule_file_transfer_poll()
+        return True
+
+    def resolve_pending_assignments(self) -> bool:
+
+        # Les assignations différées ne sont pas sauvegardées (et leurs fichiers sont déjà notés comme triés) : avant
+        # de quitter la task, on propose de les appliquer. Renvoie False si l'utilisateur annule.
+        if not self.sorting_task or not self.sorting_task.assignments: return True
+
+        response: bool | None = messagebox.askyesnocancel(title='Warning',
+            message=f'{len(self.sorting_task.assignments)} deferred assignment(s) have not been applied and will be lost. Do you want to review and apply them ?')
+        if response is None: return False
+        if response: self.apply_deferred_assignments()
+        return True
+
+    def get_pending_filename(self, file: FileObject) -> str:
+        # En mode différé, un renommage n'est que noté : le nom à afficher (et à comparer) est celui de l'assignation.
+        assignment: dict | None = self.sorting_task.get_assignment(self.sorting_task.index_of(file))
+        return assignment['name'] + file.extension if assignment and assignment.get('name') is not None else file.filename
+
     # ----- Parameters (Menubar) ----- #
 
+    def poster_mode_logic(self) -> None:
+        self.app_config.set_poster_mode(self._poster_mode_var.get())
+        self.app_config.save_config()
+        self.refresh_display()
+        self.prefetch_neighbour_files()
+
+    def deferred_mode_logic(self) -> None:
+        if self.sorting_task: self.sorting_task.set_deferred_mode(self.deferred_mode)
+
     def viewer_mode_logic(self) -> None:
             
         if self.viewer_mode:
             self.make_sorting_task_backup()
-            self.sorting_task.clear_custom_categories()
             button_color: str = self.app_config.colors.unusable_button_color
 
         else:
@@ -795,15 +1041,12 @@ class SortingGUI:
         if self.viewer_mode: return
         if not self.current_sorting_categories: return
 
-        if self.custom_category_pick == 0: new_pick = max(self.current_sorting_categories)
+        # Gestion du cas ou on veut descendre en bas en remontant depuis le premier
+        if self.custom_category_pick == 0: new_pick: int = len(self.current_sorting_categories) - 1
         else: new_pick: int = self.custom_category_pick - 1
 
-        data: dict = self.current_sorting_categories.get(new_pick)
-
-        if data:
-            self.current_sorting_categories.get(self.custom_category_pick)['button_ref'].config(bg=self.app_config.colors.button2_color, fg=self.app_config.colors.text1_color)
-            self.set_custom_category_pick(new_pick)
-            self.current_sorting_categories.get(self.custom_category_pick)['button_ref'].config(bg=self.app_config.colors.button1_color, fg=self.app_config.colors.text2_color)
+        self.set_custom_category_pick(new_pick)
+        self.sorting_list.set_selection(new_pick)
 
     def on_down_arrow(self, event: tk.Event) -> None:
         
@@ -811,30 +1054,54 @@ class SortingGUI:
         if not self.current_sorting_categories: return
         
         # Gestion du cas ou on veut remonter en haut en descendant depuis le dernier
-        if self.custom_category_pick == max(self.current_sorting_categories): new_pick = 0
+        if self.custom_category_pick >= len(self.current_sorting_categories) - 1: new_pick: int = 0
         else: new_pick: int = self.custom_category_pick + 1
 
-        data: dict = self.current_sorting_categories.get(new_pick)
-
-        if data:
-            self.current_sorting_categories.get(self.custom_category_pick)['button_ref'].config(bg=self.app_config.colors.button2_color, fg=self.app_config.colors.text1_color)
-            self.set_custom_category_pick(new_pick)
-            self.current_sorting_categories.get(self.custom_category_pick)['button_ref'].config(bg=self.app_config.colors.button1_color, fg=self.app_config.colors.text2_color)
+        self.set_custom_category_pick(new_pick)
+        self.sorting_list.set_selection(new_pick)
 
     def on_enter(self, event: tk.Event) -> None:
 
-        cc_dict: dict = self.current_sorting_categories.get(self.custom_category_pick)
-        # print(cc_dict)
-        self.sorting_button_logic(cc_dict)
+        if not 0 <= self.custom_category_pick < len(self.current_sorting_categories): return
+        self.sorting_button_logic(self.current_sorting_categories[self.custom_category_pick])
+
+    def on_hotkey(self, event: tk.Event) -> None:
+
+        # Les touches tapées dans la barre de recherche (ou un autre champ) ne sont pas des raccourcis.
+        if isinstance(event.widget, tk.Entry): return
+        if self.viewer_mode or self.remove_button_state: return
+        if not self.is_sorting_task_valid(): return
+
+        hotkey: str | None = CustomCategoryHelper.normalize_hotkey(event.char)
+        if hotkey is None: return
+
+        # Une seule touche : le fichier part dans la catégorie, et le suivant (déjà préchargé) s'affiche.
+        cc: dict | None = self.sorting_task.get_category_by_hotkey(hotkey)
+        if cc is not None: self.sorting_button_logic(cc)
 
     def on_mouse_wheel(self, event: tk.Event) -> None:
         
-        UNITS: float = 1
+        UNITS: int = 1
 
-        if event.delta > 0: self.sorting_canvas.yview_scroll(-UNITS, "units")
-        elif event.delta < 0: self.sorting_canvas.yview_scroll(UNITS, "units")
+        if event.delta > 0: self.sorting_list.scroll(-UNITS)
+        elif event.delta < 0: self.sorting_list.scroll(UNITS)
         else: pass
 
+    def on_display_canvas_resize(self, event: tk.Event) -> None:
+        self.refresh_display()
+        self.prefetch_neighbour_files()
+
+    def on_display_canvas_click(self, event: tk.Event) -> None:
+
+        # Un clic sur l'image quitte la barre de recherche : les raccourcis des catégories redeviennent actifs.
+        self.display_canvas.focus_set()
+        if not self.is_sorting_task_valid(): return
+
+        current: FileObject = self.sorting_task.get_current_file()
+        if isinstance(current, VideoObject) and not current.playback_requested:
+            current.request_playback()
+            self.refresh_display()
+
     def on_escape(self, event: tk.Event) -> None:
         self.root.iconify()
 
@@ -849,18 +1116,6 @@ class SortingGUI:
 
     # ----- App Logic (Update / Loop) ----- #
 
-    def toggle_sorting_scroll(self, toggle: bool) -> None:
-
-        if toggle:
-            self.sorting_canvas.configure(yscrollcommand=self.sorting_scrollbar.set)
-            self.sorting_scrollbar.config(command=self.sorting_canvas.yview)
-            self.root.bind("<MouseWheel>", self.on_mouse_wheel)
-        else:
-            self.sorting_canvas.yview_moveto(0.0)
-            self.sorting_canvas.configure(yscrollcommand=None)
-            self.sorting_scrollbar.config(command=None)
-            self.root.unbind("<MouseWheel>")
-
     def detect_entry(self) -> None:
         
         if self.search_bar_var != self._previous_bar_var:
@@ -869,14 +1124,49 @@ class SortingGUI:
 
         self._previous_bar_var = self.search_bar_var
 
+    def refresh_display(self) -> None:
+        self.render_scheduler.request_redraw()
+
+    def prefetch_neighbour_files(self) -> None:
+
+        if not self.is_sorting_task_valid(): return
+
+        # On précharge les prochains fichiers de la queue, ainsi que les derniers fichiers revus (retour arrière).
+        files: list[FileObject] = self.sorting_task.get_upcoming_files(self.PREFETCH_FORWARD_COUNT) + \
+            self.sorting_task.get_recent_reviewed_files(self.PREFETCH_BACKWARD_COUNT)
+        canvas_size: tuple[int, int] = (self.display_canvas.winfo_width(), self.display_canvas.winfo_height())
+        self.file_prefetcher.prefetch(files, canvas_size, self.app_config.resize_mode)
+        self.file_prefetcher.prefetch_metadata(files)
+        if self.app_config.poster_mode and FileDisplayer.poster_cache: FileDisplayer.poster_cache.prefetch([f.path for f in files if isinstance(f, VideoObject)])
+
     def update_app(self) -> None:
-        
+
+        # Appelé par le RenderScheduler, uniquement lors d'un évènement (changement de fichier, resize, thème)
+        # ou d'un tick du frame-clock lorsqu'une vidéo est affichée.
+        if not self.is_sorting_task_valid():
+            self.render_scheduler.stop_frame_clock()
+            self.display_canvas.delete("all")
+            self.current_image = None
+            return
+
+        # Un poster est une image fixe : le frame-clock ne tourne que pendant la lecture d'une vidéo.
+        current: FileObject = self.sorting_task.get_current_file()
+        showing_poster: bool = isinstance(current, VideoObject) and FileDisplayer.is_showing_poster(current, self.app_config)
+        if isinstance(current, VideoObject) and not showing_poster: self.render_scheduler.start_frame_clock(current.fps)
+        else: self.render_scheduler.stop_frame_clock()
+
         # Update le fichier displayed.
         self.current_image = FileDisplayer.update_display(self.sorting_task, self.display_canvas, self.app_config)
-        self.detect_entry()
-        self.root.update()  # Applique les updates à la fenêtre TK.
+
+        # Le poster est encore en création : on réessaie un peu plus tard.
+        if showing_poster and self.current_image is None: self.root.after(self.POSTER_POLL_INTERVAL, self.refresh_display)
 
     def update_info_frame(self) -> None:
+
+        # Tout changement du fichier courant passe par ici, on en profite pour demander un redraw
+        # et pour précharger les fichiers voisins.
+        self.refresh_display()
+        self.prefetch_neighbour_files()
         
         info_frame_color: str = self.app_config.colors.frame3_color
         text_color: str = self.app_config.colors.text1_color
@@ -894,11 +1184,25 @@ class SortingGUI:
         self.file_dimension_label.config(text=f"Dimension : {imgx}x{imgy}", bg=info_frame_color, fg=text_color)
         self.file_duration_label.config(text=f"File duration : {current_file_data.get('duration', 'N/A')} sec", bg=info_frame_color, fg=text_color)
 
+        self.update_remaining_files_label()
+
+    def update_remaining_files_label(self) -> None:
+
+        if not self.is_sorting_task_valid(): return
+
+        info_frame_color: str = self.app_config.colors.frame3_color
+        text_color: str = self.app_config.colors.text1_color
+
         if self.viewer_mode:
-            self.remaining_files_in_current_task.config(text=f"", bg=info_frame_color, fg=text_color) 
-        else:
-            self.remaining_files_in_current_task.config(text=f"Remaining Files in current task : {self.sorting_task.size} ({round(((self.sorting_task.init_file_count - self.sorting_task.size) / self.sorting_task.init_file_count) * 100, 2)}%)", bg=info_frame_color, fg=text_color)
-            
+            self.remaining_files_in_current_task.config(text=f"", bg=info_frame_color, fg=text_color)
+            return
+
+        # Si la task est encore en train d'être crawlée ou validée, le total n'est pas encore définitif.
+        crawling: str = ' (crawling...)' if self.sorting_task.file_feed else ''
+        validation: object | None = self.sorting_task.path_validation
+        if validation: crawling += f' (validating... {round(validation.checked / validation.total * 100)}%)'
+        self.remaining_files_in_current_task.config(text=f"Remaining Files in current task : {self.sorting_task.size} ({round(((self.sorting_task.init_file_count - self.sorting_task.size) / self.sorting_task.init_file_count) * 100, 2)}%){crawling}", bg=info_frame_color, fg=text_color)
+
     def update_app_status(self) -> None:
 
         # Quelques updates contextuelles devant être effectuées dans des cas particuliers.
@@ -919,7 +1223,7 @@ class SortingGUI:
         if not self.is_sorting_task_valid(): return
         
         # Texte sur le bouton de favori
-        if self.FAVORITE_MARK in self.sorting_task.get_current_file().filename:
+        if self.FAVORITE_MARK in self.get_pending_filename(self.sorting_task.get_current_file()):
             self.favorite_button.config(text='Unfavorite 💔', bg=self.app_config.colors.negative_color, fg=self.app_config.colors.text2_color)
         else:
             self.favorite_button.config(text='Favorite ★', bg=self.app_config.colors.positive_color, fg=self.app_config.colors.text2_color)
@@ -942,8 +1246,31 @@ class SortingGUI:
 
     def on_closing(self) -> None:
 
+        # Une fermeture est déjà en cours (attente des transferts).
+        if self._closing_job is not None: return
+
         # On ferme le viewer en premier lieu.
-        if self.viewer_mode: self.viewer_mode_logic()
+        if self.viewer_mode:
+            self.set_viewer_mode_state(False)
+            self.viewer_mode_logic()
+
+        if not self.resolve_pending_assignments(): return
+
+        self.finish_transfers_before_closing()
+
+    def finish_transfers_before_closing(self) -> None:
+
+        # Les déplacements en cours doivent être terminés (et reportés dans la task) avant de sauvegarder. On attend
+        # sans bloquer la boucle Tk : une copie vers un autre volume peut être longue.
+        self._closing_job = None
+        pending: int = self._file_transfer_engine.pending
+        if pending:
+            self.root.title(f'{self.APP_NAME} - Finishing {pending} transfer(s)...')
+            self._closing_job = self.root.after(self.FILE_FEED_INTERVAL, self.finish_transfers_before_closing)
+            return
+
+        self.apply_file_transfer_results()
+        self.update_app_status()
 
         if self.unsaved_modification:
             
@@ -960,14 +1287,21 @@ class SortingGUI:
 
     def quit_app(self) -> None:
         self.running = False
+        self.render_scheduler.stop()
+        self.file_prefetcher.shutdown()
+        FileDisplayer.poster_cache.shutdown()
+        FileDisplayer.thumbnail_cache.close()
+        self._file_transfer_engine.shutdown()
+        if self.sorting_task and self.sorting_task.file_feed: self.sorting_task.file_feed.cancel()
+        if self.sorting_task and self.sorting_task.path_validation: self.sorting_task.path_validation.cancel()
+        if self.sorting_task and self.sorting_task.journal: self.sorting_task.journal.discard()
         self.root.destroy()
 
     def run(self) -> None:
 
         self.running = True
         self.update_app_status()
-
-        while self.running:
-            self.update_app()
-            
+        self.refresh_display()
+        self.root.after(self.JOURNAL_MAINTENANCE_INTERVAL, self.journal_maintenance)
+        self.root.mainloop()
 
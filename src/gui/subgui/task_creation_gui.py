@@ -4,10 +4,12 @@ from src.core.app_config_object import AppConfigurationObject
 from src.core.sorting_task import SortingTask
 from src.scripts.task_data_manager import SortingTaskDataManager
 from src.scripts.yaml_helper import YAMLSafeHelper
+from src.scripts.crawler import Crawler
 
 
 import tkinter as tk
-from tkinter import ttk, filedialog
+from tkinter import ttk, filedialog, messagebox
+import re
 
 
 
@@ -28,6 +30,7 @@ class TaskCreationGUI:
     - __init__(root: tk.Tk, app_config: AppConfigurationObject, supported_extensions_fp: str): Initializes the GUI and sets up the window and components.
     - init_GUI() -> None: Initializes and configures the GUI components for creating a sorting task.
     - select_filesource_folder() -> None: Opens a dialog to select the folder containing files to sort.
+    - split_patterns(patterns: str) -> list[str]: Splits the ';' separated include/exclude patterns typed by the user.
     - confirm_task_creation() -> None: Creates a new sorting task with the specified options and closes the window.
     - on_enter(event: tk.Event) -> None: Handles the Enter key event to confirm the task creation.
     - on_escape(event: tk.Event) -> None: Closes the task creation window.
@@ -104,6 +107,15 @@ class TaskCreationGUI:
         self.folder_path_var: tk.StringVar = tk.StringVar()
         self.local_only_boolvar: tk.BooleanVar = tk.BooleanVar(value=False)
         self.shuffle_boolvar: tk.BooleanVar = tk.BooleanVar(value=True)
+        self.include_patterns_var: tk.StringVar = tk.StringVar()
+        self.exclude_patterns_var: tk.StringVar = tk.StringVar()
+
+        # Patterns de filtrage sur le nom des fichiers (globs, ou regex préfixées par 're:'), séparées par des ';'.
+        for label, var in (("Include patterns (;)", self.include_patterns_var), ("Exclude patterns (;)", self.exclude_patterns_var)):
+            pattern_frame: tk.Frame = tk.Frame(self.creating_task_window, background=bg_color)
+            pattern_frame.pack(anchor='w', padx=20, pady=5, fill='x')
+            ttk.Label(pattern_frame, text=label, style='TLabel').pack(side='left')
+            tk.Entry(pattern_frame, textvariable=var, width=50).pack(side='left', padx=5)
 
         options_frame: tk.Frame = tk.Frame(self.creating_task_window, background=bg_color)
         options_frame.pack(pady=20, padx=20, fill='x')
@@ -130,6 +142,10 @@ class TaskCreationGUI:
         folder_selected = filedialog.askdirectory()
         if folder_selected: self.folder_path_var.set(folder_selected)
 
+    @staticmethod
+    def split_patterns(patterns: str) -> list[str]:
+        return [p.strip() for p in patterns.split(';') if p.strip()]
+
     def confirm_task_creation(self) -> None:
         
         # On récupère les extensions séléctionnées et les paramètres
@@ -144,13 +160,25 @@ class TaskCreationGUI:
         if not task_path: return
         if not selected_ext: return
 
+        # Une regex invalide doit être signalée avant de fermer la fenêtre, pour pouvoir la corriger.
+        include_patterns: list[str] = self.split_patterns(self.include_patterns_var.get())
+        exclude_patterns: list[str] = self.split_patterns(self.exclude_patterns_var.get())
+        try:
+            Crawler.compile_patterns(include_patterns)
+            Crawler.compile_patterns(exclude_patterns)
+        except re.error as pattern_exception:
+            messagebox.showerror(title='Invalid pattern', message=f'Invalid filename pattern : {pattern_exception}', parent=self.creating_task_window)
+            return
+
         self.creating_task_window.destroy()
         task: SortingTask = SortingTaskDataManager.create_task(
             task_path=task_path,
             selected_ext=selected_ext,
             local_mode=local_mode,
             shuffle_mode=shuffle_mode,
-            config_folder=self.supported_extensions_filepath
+            config_folder=self.supported_extensions_filepath,
+            include_patterns=include_patterns,
+            exclude_patterns=exclude_patterns
         )
         self.set_sorting_task(task)
 
@@ -0,0 +1,156 @@
+import tkinter as tk
+from typing import Callable
+
+
+
+class VirtualizedList:
+
+    """
+    A vertical list of clickable rows that only creates the widgets of the visible rows : a pool of buttons (one per
+    visible row) is placed in a frame over the parent, and the buttons are recycled (new text and colors) when the
+    list is scrolled or when its items change. The items are plain labels, the list never stores references to its
+    widgets in the data it displays. The list scrolls row by row, with the given scrollbar or with scroll().
+    A click on a row calls on_select with the index of its item, a right-click calls on_context (if given).
+
+    Methods:
+    - set_items(labels: list[str]) -> None: Replaces the displayed items (the view goes back to the top).
+    - set_selection(index: int) -> None: Highlights the row at the given index, and scrolls to make it visible.
+    - set_colors(bg: str, fg: str, selected_bg: str, selected_fg: str) -> None: Changes the colors of the rows.
+    - scroll(rows: int) -> None: Scrolls the view by the given number of rows (negative to go up).
+    - yview(*args) -> None: Scrolls the view from a scrollbar command ('moveto' or 'scroll').
+    - refresh() -> None: Updates the visible rows (called when the parent is resized).
+
+    Properties:
+    - frame (tk.Frame): Returns the frame holding the rows.
+    - size (int): Returns the number of items.
+    - first_visible (int): Returns the index of the first visible item.
+    - visible_rows (int): Returns the number of rows that fit in the frame.
+    """
+
+    def __init__(self, parent: tk.Widget, scrollbar: tk.Scrollbar | None, row_height: int,
+                 on_select: Callable[[int], None], background: str, on_context: Callable[[int], None] | None = None) -> None:
+
+        self._parent: tk.Widget = parent
+        self._scrollbar: tk.Scrollbar | None = scrollbar
+        self._row_height: int = row_height
+        self._on_select: Callable[[int], None] = on_select
+        self._on_context: Callable[[int], None] | None = on_context
+
+        self._labels: list[str] = []
+        self._selection: int | None = None
+        self._first: int = 0
+        self._colors: tuple[str, str, str, str] = ('white', 'black', 'gray', 'white')
+
+        # Pool de boutons, et ce qu'affiche chacun d'eux (pour ne reconfigurer que ce qui a changé).
+        self._buttons: list[tk.Button] = []
+        self._button_states: list[tuple | None] = []
+
+        self._frame: tk.Frame = tk.Frame(parent, background=background)
+        self._frame.place(relx=0, rely=0, relwidth=1, relheight=1)
+        self._frame.bind('<Configure>', lambda event: self.refresh())
+
+        if self._scrollbar is not None: self._scrollbar.config(command=self.yview)
+
+    @property
+    def frame(self) -> tk.Frame:
+        return self._frame
+
+    @property
+    def size(self) -> int:
+        return len(self._labels)
+
+    @property
+    def first_visible(self) -> int:
+        return self._first
+
+    @property
+    def visible_rows(self) -> int:
+
+        # Avant le premier affichage, la frame n'a pas encore sa taille : on prend celle demandée par le parent.
+        height: int = self._frame.winfo_height()
+        if height <= 1: height = int(self._parent.cget('height'))
+        return max(1, height // self._row_height)
+
+    def set_items(self, labels: list[str]) -> None:
+        self._labels = labels
+        self._selection = None
+        self._first = 0
+        self.refresh()
+
+    def set_colors(self, bg: str, fg: str, selected_bg: str, selected_fg: str) -> None:
+        self._colors = (bg, fg, selected_bg, selected_fg)
+        self.refresh()
+
+    def set_selection(self, index: int) -> None:
+
+        self._selection = index
+
+        # On fait défiler juste assez pour que la ligne sélectionnée soit visible.
+        if 0 <= index < self.size:
+            if index < self._first: self._first = index
+            elif index >= self._first + self.visible_rows: self._first = index - self.visible_rows + 1
+
+        self.refresh()
+
+    def _max_first(self) -> int:
+        return max(0, self.size - self.visible_rows)
+
+    def scroll(self, rows: int) -> None:
+
+        first: int = min(max(0, self._first + rows), self._max_first())
+        if first == self._first: return
+        self._first = first
+        self.refresh()
+
+    def yview(self, *args) -> None:
+
+        if not args: return
+        if args[0] == 'moveto':
+            first: int = round(float(args[1]) * self.size)
+            self.scroll(first - self._first)
+        elif args[0] == 'scroll':
+            rows: int = int(args[1])
+            if args[2] == 'pages': rows *= self.visible_rows
+            self.scroll(rows)
+
+    def _ensure_pool(self, count: int) -> None:
+
+        # Le pool ne grandit qu'avec la hauteur de la frame, jamais avec le nombre d'éléments.
+        while len(self._buttons) < count:
+            slot: int = len(self._buttons)
+            button: tk.Button = tk.Button(self._frame, command=lambda slot=slot: self._on_click(slot, self._on_select))
+            if self._on_context is not None: button.bind('<Button-3>', lambda event, slot=slot: self._on_click(slot, self._on_context))
+            self._buttons.append(button)
+            self._button_states.append(None)
+
+    def _on_click(self, slot: int, callback: Callable[[int], None]) -> None:
+        index: int = self._first + slot
+        if index < self.size: callback(index)
+
+    def refresh(self) -> None:
+
+        self._first = min(self._first, self._max_first())
+        visible_rows: int = self.visible_rows
+        self._ensure_pool(visible_rows)
+        bg, fg, selected_bg, selected_fg = self._colors
+
+        for slot, button in enumerate(self._buttons):
+            index: int = self._first + slot
+
+            if slot >= visible_rows or index >= self.size:
+                if self._button_states[slot] is not None:
+                    button.place_forget()
+                    self._button_states[slot] = None
+                continue
+
+            selected: bool = index == self._selection
+            state: tuple = (self._labels[index], selected, self._colors)
+            if state == self._button_states[slot]: continue
+
+            button.config(text=self._labels[index], bg=selected_bg if selected else bg, fg=selected_fg if selected else fg)
+            if self._button_states[slot] is None: button.place(relwidth=1, rely=0, y=(slot * self._row_height), height=self._row_height)
+            self._button_states[slot] = state
+
+        if self._scrollbar is not None:
+            if self.size > visible_rows: self._scrollbar.set(self._first / self.size, (self._first + visible_rows) / self.size)
+            else: self._scrollbar.set(0.0, 1.0)
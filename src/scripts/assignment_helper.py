@@ -0,0 +1,92 @@
+from src.core.sorting_task import SortingTask
+from src.scripts.file_transfer import FileTransferEngine
+
+import os
+
+
+
+class DeferredAssignmentHelper:
+
+    """
+    A helper class for applying the deferred assignments of a SortingTask (see SortingTask.deferred_mode) in one batch.
+    The assignments are first turned into a plan (source, destination, conflicts) that can be shown to the user as a
+    dry-run report, then submitted to a FileTransferEngine grouped by destination directory.
+
+    Methods:
+    - build_plan(task: SortingTask) -> list[dict]:
+    Returns the planned operations ('index', 'src', 'dst' (None for the trash) and 'conflict'), sorted by destination directory.
+    - format_report(plan: list[dict]) -> str:
+    Returns a human readable summary of the plan (moves by destination directory, renames, trash, conflicts).
+    - apply_plan(task: SortingTask, plan: list[dict], transfer_engine: FileTransferEngine) -> int:
+    Submits the operations of the plan that have no conflict, returning how many were submitted.
+    """
+
+    REPORT_DIRECTORIES: int = 10
+
+    @staticmethod
+    def build_plan(task: SortingTask) -> list[dict]:
+
+        plan: list[dict] = []
+        planned_destinations: set[str] = set()
+
+        for index, assignment in task.assignments.items():
+
+            # Une entrée retirée de la task entre temps n'a plus rien à appliquer.
+            if index not in task.files and index not in task.reviewed_files: continue
+
+            src: str = task.table.path(index)
+            if assignment.get('trash'):
+                plan.append({'index': index, 'src': src, 'dst': None, 'conflict': False})
+                continue
+
+            filename: str = assignment['name'] + os.path.splitext(src)[-1] if assignment.get('name') else os.path.basename(src)
+            dst: str = os.path.join(assignment.get('category', os.path.dirname(src)), filename)
+            if dst == src: continue
+
+            conflict: bool = dst in planned_destinations or os.path.exists(dst)
+            planned_destinations.add(dst)
+            plan.append({'index': index, 'src': src, 'dst': dst, 'conflict': conflict})
+
+        # Les opérations sont regroupées par dossier de destination (la corbeille en dernier).
+        plan.sort(key=lambda op: (op['dst'] is None, os.path.dirname(op['dst'] or ''), op['dst'] or op['src']))
+        return plan
+
+    @staticmethod
+    def format_report(plan: list[dict]) -> str:
+
+        by_directory: dict[str, int] = {}
+        renames: int = 0
+        trash: int = 0
+        conflicts: list[str] = []
+
+        for op in plan:
+            if op['conflict']: conflicts.append(op['dst'])
+            elif op['dst'] is None: trash += 1
+            elif os.path.dirname(op['dst']) == os.path.dirname(op['src']): renames += 1
+            else: by_directory[os.path.dirname(op['dst'])] = by_directory.get(os.path.dirname(op['dst']), 0) + 1
+
+        lines: list[str] = [f'{len(plan) - len(conflicts)} operation(s) will be applied :']
+        for directory, count in sorted(by_directory.items(), key=lambda item: -item[1])[:DeferredAssignmentHelper.REPORT_DIRECTORIES]:
+            lines.append(f'- {count} file(s) moved to {directory}')
+        if len(by_directory) > DeferredAssignmentHelper.REPORT_DIRECTORIES:
+            lines.append(f'- ... and {len(by_directory) - DeferredAssignmentHelper.REPORT_DIRECTORIES} other folder(s)')
+        if renames: lines.append(f'- {renames} file(s) renamed')
+        if trash: lines.append(f'- {trash} file(s) sent to the trash')
+        if conflicts: lines.append(f'{len(conflicts)} operation(s) skipped, the destination already exists (e.g. {conflicts[0]})')
+
+        return '\n'.join(lines)
+
+    @staticmethod
+    def apply_plan(task: SortingTask, plan: list[dict], transfer_engine: FileTransferEngine) -> int:
+
+        submitted: int = 0
+        for op in plan:
+            if op['conflict']: continue
+
+            if op['dst'] is None: transfer_engine.submit_trash(op['index'], op['src'])
+            else: transfer_engine.submit(op['index'], op['src'], op['dst'])
+
+            task.clear_assignment(op['index'])
+            submitted += 1
+
+        return submitted
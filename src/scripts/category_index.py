@@ -0,0 +1,153 @@
+from src.core.sorting_task import SortingTask
+from src.scripts.string_maching_helper import StringMatchHelper
+
+from bisect import bisect_left
+import heapq
+import math
+
+
+
+class CategoryIndex:
+
+    """
+    A ranked, fuzzy search over the names of the custom categories of a sorting task, backed by a prefix index, so that
+    the right category comes first after a few keystrokes.
+    The names are split into words (see StringMatchHelper.split_string), and the lowercased words are kept in a sorted
+    list with the category they belong to. The index is rebuilt only when the categories of the task change
+    (see SortingTask.categories_version) or when another task is used.
+
+    A category matches the entry if one of its words starts with the entry (binary search in the index), or if the
+    characters of the entry appear in order in its name (fuzzy match, for entries of at least FUZZY_MIN_LENGTH characters).
+    The matches are ranked by score:
+    - NAME_PREFIX_SCORE if the name starts with the entry, WORD_PREFIX_SCORE if one of its words does,
+    - otherwise (fuzzy match) the ratio between the length of the entry and the length of the matched span of the name (at most 1),
+    - plus a boost of at most 1, for the categories used often (HITS_WEIGHT) and recently (RECENCY_WEIGHT) in the task
+    (see SortingTask.record_category_hit).
+
+    Methods:
+    - search(task: SortingTask, entry: str, limit: int | None = None) -> list[dict]: Returns the categories matching the entry,
+    best first (the limit best ones if given). Every category is returned by name if the entry is empty, so that the
+    layout of the buttons stays the same from one file to the next.
+    - rebuild(categories: list[dict]) -> None: Rebuilds the index over the given categories.
+
+    Properties:
+    - size (int): Returns the number of indexed words.
+    """
+
+    NAME_PREFIX_SCORE: float = 3.0
+    WORD_PREFIX_SCORE: float = 2.0
+    FUZZY_MIN_LENGTH: int = 2
+    HITS_WEIGHT: float = 0.5
+    HITS_SATURATION: int = 100
+    RECENCY_WEIGHT: float = 0.5
+
+    def __init__(self) -> None:
+
+        self._task: SortingTask | None = None
+        self._version: int | None = None
+        self._categories: list[dict] = []
+        self._names: list[str] = []
+        self._name_characters: list[frozenset[str]] = []
+        self._words: list[str] = []
+        self._word_categories: list[int] = []
+
+        # Candidats fuzzy de la dernière recherche : une recherche qui la prolonge (un caractère tapé en plus) n'a
+        # besoin de tester qu'eux.
+        self._last_fuzzy_entry: str | None = None
+        self._last_fuzzy_candidates: list[int] = []
+
+    @property
+    def size(self) -> int:
+        return len(self._words)
+
+    def rebuild(self, categories: list[dict]) -> None:
+
+        # Les catégories sont triées par nom : leur position sert aussi d'ordre d'affichage (et départage les égalités).
+        self._categories = sorted(categories, key=lambda c: c['name'])
+        self._names = [custom_category['name'].lower() for custom_category in self._categories]
+        self._name_characters = [frozenset(name) for name in self._names]
+
+        entries: list[tuple[str, int]] = sorted(
+            (word.lower(), position)
+            for position, custom_category in enumerate(self._categories)
+            for word in StringMatchHelper.split_string(custom_category['name'])
+        )
+        self._words = [word for word, _ in entries]
+        self._word_categories = [position for _, position in entries]
+
+        self._last_fuzzy_entry = None
+        self._last_fuzzy_candidates = []
+
+    def _ensure(self, task: SortingTask) -> None:
+        if task is self._task and task.categories_version == self._version: return
+        self.rebuild(task.get_custom_categories(sort_by_name=False))
+        self._task, self._version = task, task.categories_version
+
+    @staticmethod
+    def _fuzzy_span(name: str, prefix: str) -> int | None:
+
+        # Longueur de la portion du nom qui contient les caractères de la recherche, dans l'ordre (None s'ils n'y sont pas).
+        start: int = name.find(prefix[0])
+        if start < 0: return None
+
+        position: int = start
+        for char in prefix[1:]:
+            position = name.find(char, position + 1)
+            if position < 0: return None
+        return position - start + 1
+
+    def _boost(self, position: int, clock: int) -> float:
+
+        custom_category: dict = self._categories[position]
+        hits: int = custom_category.get('hits', 0)
+        if not hits: return 0.0
+
+        frequency: float = min(1.0, math.log1p(hits) / math.log1p(self.HITS_SATURATION))
+        recency: float = 1 / (1 + clock - custom_category.get('last_hit', 0)) if custom_category.get('last_hit') else 0.0
+        return self.HITS_WEIGHT * frequency + self.RECENCY_WEIGHT * recency
+
+    def _fuzzy_candidates(self, prefix: str) -> list[tuple[int, int]]:
+
+        # Une catégorie qui ne matche pas une recherche ne matche aucune de ses prolongations.
+        if self._last_fuzzy_entry is not None and prefix.startswith(self._last_fuzzy_entry): pool = self._last_fuzzy_candidates
+        else: pool = range(len(self._categories))
+
+        # Le test sur les caractères (en C) élimine la plupart des noms avant le calcul du span.
+        characters: set[str] = set(prefix)
+        candidates: list[tuple[int, int]] = []
+        for position in pool:
+            if not characters <= self._name_characters[position]: continue
+            span: int | None = self._fuzzy_span(self._names[position], prefix)
+            if span is not None: candidates.append((position, span))
+
+        self._last_fuzzy_entry, self._last_fuzzy_candidates = prefix, [position for position, _ in candidates]
+        return candidates
+
+    def search(self, task: SortingTask, entry: str, limit: int | None = None) -> list[dict]:
+
+        self._ensure(task)
+        if entry == '': return self._categories[:limit] if limit is not None else list(self._categories)
+
+        prefix: str = entry.lower()
+        clock: int = task.category_clock
+        scores: dict[int, float] = {}
+
+        # Tous les mots commençant par la recherche sont contigus dans la liste triée.
+        for i in range(bisect_left(self._words, prefix), len(self._words)):
+            if not self._words[i].startswith(prefix): break
+            position: int = self._word_categories[i]
+            if position in scores: continue
+            base: float = self.NAME_PREFIX_SCORE if self._names[position].startswith(prefix) else self.WORD_PREFIX_SCORE
+            scores[position] = base + self._boost(position, clock)
+
+        # Les autres catégories ne peuvent matcher qu'en fuzzy. Un score fuzzy ne dépasse jamais celui d'un préfixe de mot :
+        # si les préfixes remplissent déjà le top, le fuzzy est inutile.
+        if len(prefix) >= self.FUZZY_MIN_LENGTH and (limit is None or len(scores) < limit):
+            for position, span in self._fuzzy_candidates(prefix):
+                if position in scores: continue
+                scores[position] = len(prefix) / span + self._boost(position, clock)
+
+        # Meilleur score d'abord, puis ordre alphabétique.
+        key = lambda position: (-scores[position], position)
+        ranked: list[int] = heapq.nsmallest(limit, scores, key=key) if limit is not None else sorted(scores, key=key)
+        return [self._categories[position] for position in ranked]
@@ -1,6 +1,12 @@
-
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from queue import Queue as ThreadSafeQueue, Empty
+from threading import Thread, Event
+from typing import Iterator, Generator, Iterable
+import fnmatch
 import os
+import re
 import random
+import time
 
 
 class Crawler:
@@ -8,74 +14,249 @@ class Crawler:
     """
     Crawler is a class designed to manage and filter files in a directory based on allowed file extensions.
     It provides functionality to crawl through directories and retrieve files that match the specified extensions.
+    Directories are enumerated with os.scandir, and subdirectories are walked in parallel on a thread pool.
+
+    Allowed extensions are case-insensitive (stored case-folded in a frozenset), and the files can also be filtered by name
+    with include/exclude patterns : globs (e.g. '*_raw.*') or regular expressions when prefixed by 're:' (e.g. 're:^IMG_\\d+').
 
     Attributes:
-    - _allowed_ext (list[str]): A list of allowed file extensions.
+    - _allowed_ext (frozenset[str]): The case-folded allowed file extensions.
+    - _include (re.Pattern | None): The compiled include patterns. If set, only the matching file names are kept.
+    - _exclude (re.Pattern | None): The compiled exclude patterns. The matching file names are discarded.
 
     Methods:
-    - get_allowed() -> list[str]: Returns the list of allowed file extensions.
+    - get_allowed() -> frozenset[str]: Returns the set of allowed file extensions.
     - is_allowed(extension: str) -> bool: Checks if a given file extension is allowed.
+    - is_name_allowed(name: str, bypass_extension_limitation: bool = False) -> bool: Checks if a file name passes the extension and pattern filters.
     - add_allowed(*extensions: str) -> None: Adds new file extensions to the list of allowed extensions.
     - remove_allowed(*extensions: str) -> None: Removes specified file extensions from the list of allowed extensions.
     - clear_allowed() -> None: Clears all file extensions from the list of allowed extensions.
+    - set_patterns(include_patterns: list[str] | None = None, exclude_patterns: list[str] | None = None) -> None: Sets the include/exclude patterns.
+    - scan_directory(directory: str, bypass_extension_limitation: bool = False) -> tuple[list[str], list[str]]: Returns the valid files and the subdirectories of a directory.
+    - iter_folder(root: str, local_only: bool = False, bypass_extension_limitation: bool = False) -> Iterator[str]: Yields the valid files of the specified directory (root) as soon as they are found.
+    - stream_folder(root: str, local_only: bool = False, shuffle: bool = False, bypass_extension_limitation: bool = False) -> CrawlStream: Crawls the specified directory (root) in the background, the found files being retrieved by batches.
     - crawl_folder(root: str, local_only: bool = False, shuffle: bool = False, bypass_extension_limitation: bool = False) -> list[str]: Crawls the specified directory (root) and returns a list of valid files based on the allowed extensions.
         
     Parameters:
     - root (str): The root directory to crawl.
     - local_only (bool): If True, only crawls the specified root directory; if False, crawls subdirectories as well.
     - shuffle (bool): If True, shuffles the order of the returned files.
-    - bypass_extension_limitation (bool): If True, ignores the allowed extensions limitation.
+    - bypass_extension_limitation (bool): If True, ignores the allowed extensions limitation (the patterns still apply).
 
     Raises:
     - AssertionError: If the specified root path is not a directory or does not exist.
+    - re.error: If one of the regular expression patterns is invalid.
     """
 
-    def __init__(self, *allowed_extensions: str) -> None:
+    CRAWL_WORKERS: int = 8
+    REGEX_PATTERN_PREFIX: str = 're:'
+
+    def __init__(self, *allowed_extensions: str, include_patterns: list[str] | None = None, exclude_patterns: list[str] | None = None) -> None:
         
-        self._allowed_ext: list[str] = allowed_extensions
+        self._allowed_ext: frozenset[str] = Crawler.normalize_extensions(allowed_extensions)
+        self._include: re.Pattern | None = None
+        self._exclude: re.Pattern | None = None
+        self.set_patterns(include_patterns, exclude_patterns)
+
+    @staticmethod
+    def normalize_extensions(extensions: Iterable[str]) -> frozenset[str]:
+        return frozenset(ext.casefold() for ext in extensions)
+
+    @staticmethod
+    def compile_patterns(patterns: list[str] | None) -> re.Pattern | None:
+
+        if not patterns: return None
+
+        # Toutes les patterns sont fusionnées en une seule regex, pour ne faire qu'un match par nom de fichier.
+        regexes: list[str] = [
+            p[len(Crawler.REGEX_PATTERN_PREFIX):] if p.startswith(Crawler.REGEX_PATTERN_PREFIX) else fnmatch.translate(p)
+            for p in patterns
+        ]
+        return re.compile('|'.join(f'(?:{r})' for r in regexes), re.IGNORECASE)
 
-    def get_allowed(self) -> list[str]:
+    def set_patterns(self, include_patterns: list[str] | None = None, exclude_patterns: list[str] | None = None) -> None:
+        self._include = Crawler.compile_patterns(include_patterns)
+        self._exclude = Crawler.compile_patterns(exclude_patterns)
+
+    def get_allowed(self) -> frozenset[str]:
         return self._allowed_ext
     
     def is_allowed(self, extension: str) -> bool:
-        return extension in self.get_allowed()
+        return extension.casefold() in self.get_allowed()
+
+    def is_name_allowed(self, name: str, bypass_extension_limitation: bool = False) -> bool:
+
+        if not bypass_extension_limitation:
+
+            # Équivalent de os.path.splitext sur un simple nom (les points en tête de nom ne comptent pas).
+            dot: int = name.rfind('.')
+            if dot <= 0 or (name[0] == '.' and not name[:dot].strip('.')): return False
+            if name[dot:].casefold() not in self._allowed_ext: return False
+
+        if self._include is not None and not self._include.search(name): return False
+        if self._exclude is not None and self._exclude.search(name): return False
+
+        return True
     
     def add_allowed(self, *extensions: str) -> None:
-        for ext in extensions:
-            if not self.is_allowed(ext):
-                self.get_allowed().append(ext)
+        self._allowed_ext = self._allowed_ext | Crawler.normalize_extensions(extensions)
 
     def remove_allowed(self, *extensions: str) -> None:
-        for ext in extensions:
-            if self.is_allowed(ext):
-                self.get_allowed().remove(ext)
+        self._allowed_ext = self._allowed_ext - Crawler.normalize_extensions(extensions)
 
     def clear_allowed(self) -> None:
-        self.get_allowed().clear()
+        self._allowed_ext = frozenset()
     
-    def crawl_folder(self, root: str, local_only: bool = False, shuffle: bool = False, bypass_extension_limitation: bool = False) -> list[str]:
-
-        assert (os.path.isdir(root) and os.path.exists(root))
+    def scan_directory(self, directory: str, bypass_extension_limitation: bool = False) -> tuple[list[str], list[str]]:
 
         valid_files: list[str] = []
+        subdirectories: list[str] = []
+
+        # Comme os.walk, on ignore silencieusement les dossiers illisibles (permissions, partage déconnecté, ...).
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                    elif entry.is_file() and self.is_name_allowed(entry.name, bypass_extension_limitation):
+                        valid_files.append(entry.path)
+        except OSError:
+            pass
+
+        return valid_files, subdirectories
+
+    def iter_folder(self, root: str, local_only: bool = False, bypass_extension_limitation: bool = False) -> Iterator[str]:
+
+        assert (os.path.isdir(root) and os.path.exists(root))
 
         if local_only:
+            yield from self.scan_directory(root, bypass_extension_limitation)[0]
+            return
 
-            for file in os.listdir(root):
-                fp: str = os.path.join(root, file)
-                if bypass_extension_limitation or self.is_allowed(os.path.splitext(fp)[-1]): 
-                    valid_files.append(fp)
+        # Chaque dossier est scanné par un worker, et ses sous-dossiers sont soumis dès qu'ils sont découverts.
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=self.CRAWL_WORKERS, thread_name_prefix='crawler')
 
-        else:
+        try:
+            pending: set[Future] = {executor.submit(self.scan_directory, root, bypass_extension_limitation)}
 
-            for subroot, _, files in os.walk(root):
-                for file in files:
-                    fp: str = os.path.join(subroot, file)
-                    if bypass_extension_limitation or self.is_allowed(os.path.splitext(fp)[-1]):
-                        valid_files.append(fp)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    valid_files, subdirectories = future.result()
+                    for subdirectory in subdirectories:
+                        pending.add(executor.submit(self.scan_directory, subdirectory, bypass_extension_limitation))
+                    yield from valid_files
 
+        # Si le générateur est abandonné en cours de route, on n'attend pas la fin des scans en attente.
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stream_folder(self, root: str, local_only: bool = False, shuffle: bool = False, bypass_extension_limitation: bool = False) -> 'CrawlStream':
+
+        # iter_folder étant un générateur, on vérifie le root ici plutôt que dans le thread du stream.
+        assert (os.path.isdir(root) and os.path.exists(root))
+        return CrawlStream(self.iter_folder(root, local_only, bypass_extension_limitation), shuffle=shuffle)
+
+    def crawl_folder(self, root: str, local_only: bool = False, shuffle: bool = False, bypass_extension_limitation: bool = False) -> list[str]:
+
+        valid_files: list[str] = list(self.iter_folder(root, local_only, bypass_extension_limitation))
         if shuffle: random.shuffle(valid_files)
 
         return valid_files
 
 
+
+class CrawlStream:
+
+    """
+    CrawlStream consumes a file generator (typically Crawler.iter_folder) on a background thread and makes the found files
+    available by batches, so that a consumer (e.g. the GUI) can start working on the first files while the crawl goes on.
+
+    Methods:
+    - wait_first(timeout: float | None = None) -> list[str]: Blocks until the first batch is available (or the crawl is over), then drains it.
+    - drain(max_items: int | None = None) -> list[str]: Returns the files found since the last call, without blocking.
+    - cancel() -> None: Stops the crawl as soon as possible.
+
+    Properties:
+    - is_done (bool): Returns True once the crawl is over and every file has been drained.
+    - shuffle (bool): Returns True if the batches are shuffled (the consumer should then shuffle the whole result once done).
+    - found (int): Returns the number of files found so far.
+    """
+
+    BATCH_SIZE: int = 1024
+    FLUSH_INTERVAL: float = 0.1
+
+    def __init__(self, files: Generator[str, None, None], shuffle: bool = False) -> None:
+
+        self._files: Generator[str, None, None] = files
+        self._shuffle: bool = shuffle
+        self._found: int = 0
+        self._batches: ThreadSafeQueue = ThreadSafeQueue()
+        self._pending: list[str] = []
+        self._finished: Event = Event()
+        self._cancelled: Event = Event()
+
+        self._thread: Thread = Thread(target=self._run, name='crawl-stream', daemon=True)
+        self._thread.start()
+
+    @property
+    def is_done(self) -> bool:
+        return self._finished.is_set() and self._batches.empty() and not self._pending
+
+    @property
+    def shuffle(self) -> bool:
+        return self._shuffle
+
+    @property
+    def found(self) -> int:
+        return self._found
+
+    def _run(self) -> None:
+
+        batch: list[str] = []
+        last_flush: float = time.monotonic()
+
+        try:
+            for fp in self._files:
+
+                if self._cancelled.is_set(): break
+                batch.append(fp)
+                self._found += 1
+
+                # Le tout premier fichier est envoyé directement pour réduire le temps avant le premier affichage.
+                if len(batch) >= self.BATCH_SIZE or self._found == 1 or time.monotonic() - last_flush >= self.FLUSH_INTERVAL:
+                    self._flush(batch)
+                    batch = []
+                    last_flush = time.monotonic()
+
+            if batch: self._flush(batch)
+
+        # Un batch vide marque la fin du crawl, pour débloquer un éventuel wait_first.
+        finally:
+            self._files.close()
+            self._finished.set()
+            self._batches.put([])
+
+    def _flush(self, batch: list[str]) -> None:
+        if self.shuffle: random.shuffle(batch)
+        self._batches.put(batch)
+
+    def wait_first(self, timeout: float | None = None) -> list[str]:
+
+        try: self._pending.extend(self._batches.get(timeout=timeout))
+        except Empty: pass
+
+        return self.drain()
+
+    def drain(self, max_items: int | None = None) -> list[str]:
+
+        while max_items is None or len(self._pending) < max_items:
+            try: self._pending.extend(self._batches.get_nowait())
+            except Empty: break
+
+        if max_items is None: max_items = len(self._pending)
+        drained, self._pending = self._pending[:max_items], self._pending[max_items:]
+        return drained
+
+    def cancel(self) -> None:
+        self._cancelled.set()
@@ -2,10 +2,10 @@
 
 from src.core.sorting_task import SortingTask
 from src.core.file_objects import FileObject
+from src.scripts.file_transfer import FileTransferEngine
 
-from tkinter import messagebox, filedialog
+from tkinter import messagebox, filedialog, simpledialog
 import os
-import shutil
 
 
 
@@ -17,10 +17,16 @@ class CustomCategoryHelper:
     Methods:
     - delete_custom_category(sorting_task: SortingTask, custom_category: dict) -> None: Removes a custom category from the sorting task.
     - add_custom_category(sorting_task: SortingTask, custom_category: dict) -> None: Adds a new custom category to the sorting task.
-    - move_file_into_category(sorting_task: SortingTask, custom_category: dict) -> bool: Moves the currently selected file into the specified custom category.
+    - move_file_into_category(sorting_task: SortingTask, custom_category: dict, transfer_engine: FileTransferEngine) -> bool: Schedules the move of the
+    currently selected file into the specified custom category, the task path of the file being updated once the transfer is done.
     - add_custom_categories_from_dir(sorting_task: SortingTask) -> bool: Adds custom categories from a selected directory.
+    - normalize_hotkey(key: str) -> str | None: Returns the hotkey for a typed key (a lowercase letter or a digit), or None if the key cannot be a hotkey.
+    - ask_category_hotkey(sorting_task: SortingTask, custom_category: dict) -> bool: Asks the user for the hotkey of the category
+    (an empty answer removes it). Returns True if the hotkey of the category changed.
     """
 
+    HOTKEY_CHARACTERS: frozenset[str] = frozenset('0123456789abcdefghijklmnopqrstuvwxyz')
+
     @staticmethod
     def delete_custom_category(sorting_task: SortingTask, custom_category: dict) -> None:
         sorting_task.remove_custom_category(custom_category)
@@ -30,20 +36,25 @@ class CustomCategoryHelper:
         sorting_task.add_custom_categories(custom_category)
 
     @staticmethod
-    def move_file_into_category(sorting_task: SortingTask, custom_category: dict) -> bool:
+    def move_file_into_category(sorting_task: SortingTask, custom_category: dict, transfer_engine: FileTransferEngine) -> bool:
 
         current: FileObject = sorting_task.get_current_file()
         current.close()
 
+        # En mode différé, on se contente de noter la catégorie choisie.
+        if sorting_task.deferred_mode:
+            sorting_task.assign(sorting_task.index_of(current), category=custom_category['path'])
+            return True
+
         new_directory: str = os.path.join(custom_category['path'], current.filename)
         
-        # Ce fichier existe déjà.
-        if os.path.exists(new_directory):
+        # Ce fichier existe déjà (ou va exister, une fois un transfert en cours terminé).
+        if os.path.exists(new_directory) or transfer_engine.is_busy(new_directory):
             messagebox.showwarning(message=f'File with the same name already exist in given directory (@ {new_directory})')
             return False
 
-        shutil.move(current.path, new_directory)
-        current.set_new_path(new_directory)
+        # Le déplacement se fait en arrière-plan : le chemin du fichier dans la task ne change qu'une fois le transfert réussi.
+        transfer_engine.submit(sorting_task.index_of(current), current.path, new_directory)
         return True
     
     @staticmethod
@@ -59,3 +70,30 @@ class CustomCategoryHelper:
         sorting_task.add_custom_categories(*categories)
         return True
 
+    @staticmethod
+    def normalize_hotkey(key: str) -> str | None:
+        key = key.lower()
+        return key if key in CustomCategoryHelper.HOTKEY_CHARACTERS else None
+
+    @staticmethod
+    def ask_category_hotkey(sorting_task: SortingTask, custom_category: dict) -> bool:
+
+        answer: str | None = simpledialog.askstring('Category Hotkey',
+            f"Hotkey for '{custom_category['name']}' (a letter or a digit, empty to remove) :",
+            initialvalue=custom_category.get('hotkey', ''))
+        if answer is None: return False
+
+        answer = answer.strip()
+        if not answer:
+            if 'hotkey' not in custom_category: return False
+            sorting_task.set_category_hotkey(custom_category, None)
+            return True
+
+        hotkey: str | None = CustomCategoryHelper.normalize_hotkey(answer) if len(answer) == 1 else None
+        if hotkey is None:
+            messagebox.showwarning(message=f'Invalid hotkey : {answer} (expected a single letter or digit)')
+            return False
+
+        if custom_category.get('hotkey') == hotkey: return False
+        sorting_task.set_category_hotkey(custom_category, hotkey)
+        return True
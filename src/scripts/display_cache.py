@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+
+class DisplayCache:
+
+    """
+    DisplayCache is a thread-safe LRU cache holding ready-to-display renditions of files, bounded by a byte budget.
+    Each entry is stored with its (estimated) size in bytes, and the least recently used entries are evicted
+    as soon as the total size exceeds the budget.
+
+    Methods:
+    - get(key: tuple) -> object: Returns the cached value for the key (and marks it as recently used), or None.
+    - put(key: tuple, value: object, nbytes: int) -> None: Stores a value in the cache, evicting older entries if needed.
+    - contains(key: tuple) -> bool: Returns True if the key is currently cached, without touching its LRU position.
+    - discard(key: tuple) -> None: Removes the key from the cache, if it exists.
+    - clear() -> None: Empties the cache.
+
+    Properties:
+    - budget (int): Returns the maximum number of bytes the cache may hold.
+    - used_bytes (int): Returns the number of bytes currently held by the cache.
+    - size (int): Returns the number of entries currently cached.
+    """
+
+    def __init__(self, budget: int) -> None:
+
+        assert budget > 0, f"[E] Le budget du cache doit être positif (={budget})."
+        self._budget: int = budget
+        self._used_bytes: int = 0
+        self._entries: OrderedDict[tuple, tuple[object, int]] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    @property
+    def used_bytes(self) -> int:
+        return self._used_bytes
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> object:
+
+        with self._lock:
+            entry: tuple[object, int] | None = self._entries.get(key)
+            if entry is None: return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: tuple, value: object, nbytes: int) -> None:
+
+        # Une entrée plus grande que le budget entier ne ferait que vider le cache pour rien.
+        if nbytes > self.budget: return
+
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (value, nbytes)
+            self._used_bytes += nbytes
+
+            while self._used_bytes > self.budget:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._used_bytes -= evicted_bytes
+
+    def contains(self, key: tuple) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def discard(self, key: tuple) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._used_bytes = 0
+
+    def _pop(self, key: tuple) -> None:
+        entry: tuple[object, int] | None = self._entries.pop(key, None)
+        if entry is not None: self._used_bytes -= entry[1]
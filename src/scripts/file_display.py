@@ -1,17 +1,24 @@
-
-
 from src.core.file_objects import FileObject, ImageObject, VideoObject
 from src.core.sorting_task import SortingTask
 from src.core.app_config_object import AppConfigurationObject
+from src.scripts.display_cache import DisplayCache
+from src.scripts.poster_cache import PosterCache
+from src.scripts.thumbnail_cache import ThumbnailCache
 
 import tkinter as tk
 from PIL import Image, ImageTk
+from collections import OrderedDict
+import os
 
 
 class FileDisplayer:
-    
+
     """
     Displays files (images and videos) on a given Tkinter canvas.
+    Scaled images are kept in an LRU DisplayCache, so that redrawing the same file on the same canvas costs nothing,
+    and in the persistent ThumbnailCache (set by the application), so that a file displayed in a previous session does not have to be decoded again.
+    The DisplayCache is shared with the prefetch threads and only holds PIL images : the PhotoImages of the last displayed
+    files are kept in a small separate cache, only touched by the Tk thread (a PhotoImage must be created and deleted there).
 
     Methods:
     - update_display(sorting_task: SortingTask, target_canvas: tk.Canvas, app_config: AppConfigurationObject) -> ImageTk:
@@ -21,9 +28,40 @@ class FileDisplayer:
     - display_image_file(img: ImageObject, target_canvas: tk.Canvas, app_config: AppConfigurationObject) -> ImageTk:
     Displays an image file on the canvas, resizing based on the application's configuration.
     - display_video_file(vid: VideoObject, target_canvas: tk.Canvas, app_config: AppConfigurationObject) -> ImageTk:
-        Displays a video frame on the canvas, resizing based on the application's configuration.
+    Displays the current video frame on the canvas. Frames are decoded and scaled by the video decoder thread, and the
+    canvas is only redrawn when a new frame is due. In poster mode, the poster of the video is displayed instead, until its playback is requested.
+    - display_video_poster(vid: VideoObject, target_canvas: tk.Canvas, app_config: AppConfigurationObject) -> ImageTk:
+    Displays the poster (contact sheet) of a video on the canvas. Returns None while the poster is being created.
+    - is_showing_poster(vid: VideoObject, app_config: AppConfigurationObject) -> bool:
+    Returns True if the video is displayed as a poster (poster mode, playback not requested and poster readable).
+    - compute_display_geometry(image_size: tuple[int, int], canvas_size: tuple[int, int], resize_mode: int) -> tuple[int, int, int, int]:
+    Returns the (width, height, x_offset, y_offset) of an image of the given size once displayed on the canvas.
+    - get_cache_key(fp: str, canvas_size: tuple[int, int], resize_mode: int) -> tuple | None:
+    Returns the display cache key of a file for the given canvas size and resize mode, or None if the file cannot be stat'ed.
+    - display_missing_file(fp: str, target_canvas: tk.Canvas) -> None: Shows a "missing file" message instead of the file.
+    - get_photo_image(cache_key: tuple, pil_image: Image.Image) -> ImageTk: Returns the PhotoImage of a cached PIL image,
+    created once and kept in the Tk-only PhotoImage cache. Must be called from the Tk thread.
+    - load_scaled_image(img: ImageObject, canvas_size: tuple[int, int], resize_mode: int) -> tuple[tuple, tuple[Image.Image, int, int], int]:
+    Decodes (at reduced resolution) and scales an image without touching Tkinter, returning its cache key, cache value and size in bytes.
+    The scaled image is read from the ThumbnailCache first, and stored there once decoded.
     """
-    
+
+    DISPLAY_CACHE_BUDGET: int = 256 * 1024 * 1024
+    display_cache: DisplayCache = DisplayCache(DISPLAY_CACHE_BUDGET)
+
+    # PhotoImages des derniers fichiers affichés, par clé du cache d'affichage (thread de Tkinter uniquement).
+    PHOTO_CACHE_SIZE: int = 8
+    _photo_cache: OrderedDict[tuple, ImageTk.PhotoImage] = OrderedDict()
+
+    # Dernière frame vidéo affichée (chemin, numéro de frame, taille du canvas) et sa PhotoImage.
+    _video_frame_key: tuple | None = None
+    _video_frame_image: ImageTk.PhotoImage | None = None
+
+    # Créés par l'application (ils démarrent des threads), et non à l'import. Sans eux, rien n'est gardé d'une session
+    # à l'autre et les vidéos sont lues sans poster.
+    thumbnail_cache: ThumbnailCache | None = None
+    poster_cache: PosterCache | None = None
+
     @staticmethod
     def update_display(sorting_task: SortingTask, target_canvas: tk.Canvas, app_config: AppConfigurationObject) -> ImageTk:
 
@@ -33,7 +71,7 @@ class FileDisplayer:
 
     @staticmethod
     def display_file(sorting_task: SortingTask, target_canvas: tk.Canvas, app_config: AppConfigurationObject) -> ImageTk:
-        
+
         file: FileObject = sorting_task.get_current_file()
 
         if isinstance(file, ImageObject):
@@ -43,89 +81,186 @@ class FileDisplayer:
         else: raise NotImplementedError(f'[E] Unknown Filetype {type(file)} for file @ {file.path}.')
 
     @staticmethod
-    def display_image_file(img: ImageObject, target_canvas: tk.Canvas, app_config: AppConfigurationObject) -> ImageTk:
-        
-        # On refresh le canvas de l'image précédente.
-        target_canvas.delete("all")
+    def compute_display_geometry(image_size: tuple[int, int], canvas_size: tuple[int, int], resize_mode: int) -> tuple[int, int, int, int]:
 
-        pil_image: Image = Image.open(img.path)
-        tk_image: ImageTk.PhotoImage = None
-        canvas_width: int = target_canvas.winfo_width()
-        canvas_height: int = target_canvas.winfo_height()
+        image_width, image_height = image_size
+        canvas_width, canvas_height = canvas_size
 
-        # Mode strech fait un resize bête à la taille du canvas.
-        if app_config.is_in_stretch_mode():
-            pil_image = pil_image.resize((canvas_width, canvas_height), Image.Resampling.LANCZOS)
-            tk_image = ImageTk.PhotoImage(pil_image)
-            target_canvas.create_image(0, 0, anchor=tk.NW, image=tk_image)
+        # Mode strech (=1) fait un resize bête à la taille du canvas.
+        if resize_mode == 1:
+            return canvas_width, canvas_height, 0, 0
 
-        # Mode adjust trouve le ratio d'étirement le plus proche du ration du canvas.
-        elif app_config.is_in_adjust_mode():
+        # Mode adjust (=0) trouve le ratio d'étirement le plus proche du ration du canvas.
+        elif resize_mode == 0:
 
-            image_width, image_height = img.dimension
             image_ratio: float = image_width / image_height
             canvas_ratio: float = canvas_width / canvas_height
 
             if image_ratio > canvas_ratio:
                 new_width: int = canvas_width
-                new_height: int = round(canvas_width / image_ratio)
+                new_height: int = max(1, round(canvas_width / image_ratio))
             else:
-                new_width: int = round(canvas_height * image_ratio)
+                new_width: int = max(1, round(canvas_height * image_ratio))
                 new_height: int = canvas_height
 
-            pil_image = pil_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
             x_offset: int = (canvas_width - new_width) // 2
             y_offset: int = (canvas_height - new_height) // 2
-            tk_image = ImageTk.PhotoImage(pil_image)
-            target_canvas.create_image(x_offset, y_offset, anchor=tk.NW, image=tk_image)
+            return new_width, new_height, x_offset, y_offset
 
-        else: pass
+        else: raise ValueError(f'[E] Mode de resize inconnu (={resize_mode}).')
 
-        # Pour éviter que l'image se fasse garbage collecter par Tkinter.
+    @staticmethod
+    def get_cache_key(fp: str, canvas_size: tuple[int, int], resize_mode: int) -> tuple | None:
+        # Le mtime invalide naturellement l'entrée si le fichier est modifié entre deux affichages.
+        # Un fichier supprimé (ou déplacé) depuis l'extérieur de l'application n'a pas de clé.
+        try: return (fp, os.stat(fp).st_mtime_ns, canvas_size, resize_mode)
+        except OSError: return None
+
+    @staticmethod
+    def display_missing_file(fp: str, target_canvas: tk.Canvas) -> None:
+        target_canvas.delete("all")
+        target_canvas.create_text(target_canvas.winfo_width() // 2, target_canvas.winfo_height() // 2,
+                                  text=f'Fichier introuvable :\n{fp}', fill='gray', justify=tk.CENTER)
+
+    @staticmethod
+    def load_scaled_image(img: ImageObject, canvas_size: tuple[int, int], resize_mode: int) -> tuple[tuple, tuple[Image.Image, int, int], int]:
+
+        # Ne touche pas à Tkinter, et peut donc être appelé depuis un thread de prefetch.
+        cache_key: tuple | None = FileDisplayer.get_cache_key(img.path, canvas_size, resize_mode)
+        if cache_key is None: raise FileNotFoundError(f"[E] Le fichier @ {img.path} n'existe plus.")
+
+        # Une image déjà affichée dans ces conditions (même lors d'une session précédente) n'est pas décodée de nouveau.
+        thumbnail_cache: ThumbnailCache | None = FileDisplayer.thumbnail_cache
+        thumbnail_key: str = ThumbnailCache.make_key(img.path, f'display|{canvas_size[0]}x{canvas_size[1]}|{resize_mode}')
+        pil_image: Image.Image | None = thumbnail_cache.get_image(thumbnail_key) if thumbnail_cache else None
+
+        if pil_image is not None:
+            new_width, new_height = pil_image.size
+            x_offset, y_offset = (canvas_size[0] - new_width) // 2, (canvas_size[1] - new_height) // 2
+
+        # Sinon, on ne décode que la résolution nécessaire pour l'affichage, puis on resize à la taille exacte.
+        else:
+            new_width, new_height, x_offset, y_offset = FileDisplayer.compute_display_geometry(img.dimension, canvas_size, resize_mode)
+            pil_image = img.load_for_size((new_width, new_height))
+            pil_image = pil_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            if thumbnail_cache: thumbnail_cache.put_image(thumbnail_key, pil_image)
+
+        return cache_key, (pil_image, x_offset, y_offset), (new_width * new_height * 4)
+
+    @staticmethod
+    def get_photo_image(cache_key: tuple, pil_image: Image.Image) -> ImageTk.PhotoImage:
+
+        # À n'appeler que depuis le thread de Tkinter : les PhotoImages évincées y sont libérées.
+        tk_image: ImageTk.PhotoImage | None = FileDisplayer._photo_cache.get(cache_key)
+        if tk_image is not None:
+            FileDisplayer._photo_cache.move_to_end(cache_key)
+            return tk_image
+
+        tk_image = ImageTk.PhotoImage(pil_image)
+        FileDisplayer._photo_cache[cache_key] = tk_image
+        while len(FileDisplayer._photo_cache) > FileDisplayer.PHOTO_CACHE_SIZE: FileDisplayer._photo_cache.popitem(last=False)
         return tk_image
 
     @staticmethod
-    def display_video_file(vid: VideoObject, target_canvas: tk.Canvas, app_config: AppConfigurationObject) -> ImageTk:
-        
+    def display_image_file(img: ImageObject, target_canvas: tk.Canvas, app_config: AppConfigurationObject) -> ImageTk:
+
         # On refresh le canvas de l'image précédente.
         target_canvas.delete("all")
 
-        pil_image: Image = vid.get_current_frame()
-        if not pil_image: return
+        canvas_size: tuple[int, int] = (target_canvas.winfo_width(), target_canvas.winfo_height())
+        resize_mode: int = app_config.resize_mode
+        cache_key: tuple | None = FileDisplayer.get_cache_key(img.path, canvas_size, resize_mode)
+        if cache_key is None:
+            FileDisplayer.display_missing_file(img.path, target_canvas)
+            return None
+        cached: tuple[Image.Image, int, int] | None = FileDisplayer.display_cache.get(cache_key)
 
-        canvas_width: int = target_canvas.winfo_width()
-        canvas_height: int = target_canvas.winfo_height()
-        tk_image: ImageTk.PhotoImage = None
+        # Si l'image n'a jamais été affichée dans ces conditions, on la décode, la resize et on la garde en cache.
+        # Le fichier peut encore disparaître (ou être illisible) entre le stat et sa lecture.
+        if cached is None:
+            try: cache_key, cached, nbytes = FileDisplayer.load_scaled_image(img, canvas_size, resize_mode)
+            except OSError as load_exception:
+                print(f"[W] Impossible de lire le fichier @ {img.path}. (e: {load_exception})")
+                FileDisplayer.display_missing_file(img.path, target_canvas)
+                return None
+            FileDisplayer.display_cache.put(cache_key, cached, nbytes)
 
-        if app_config.is_in_stretch_mode():
+        # Le cache d'affichage (partagé avec le FilePrefetcher) ne contient que des images PIL, la PhotoImage est créée ici.
+        pil_image, x_offset, y_offset = cached
+        tk_image: ImageTk.PhotoImage = FileDisplayer.get_photo_image(cache_key, pil_image)
 
-            pil_image = pil_image.resize((target_canvas.winfo_width(), target_canvas.winfo_height()), Image.Resampling.LANCZOS)
-            tk_image = ImageTk.PhotoImage(pil_image)
-            target_canvas.create_image(0, 0, anchor=tk.NW, image=tk_image)
+        target_canvas.create_image(x_offset, y_offset, anchor=tk.NW, image=tk_image)
 
-        elif app_config.is_in_adjust_mode():
-            
-            image_width, image_height = vid.dimension
-            image_ratio: float = image_width / image_height
-            canvas_ratio: float = canvas_width / canvas_height
-            
-            if image_ratio > canvas_ratio:
-                new_width: int = canvas_width
-                new_height: int = round(canvas_width / image_ratio)
-            else:
-                new_width: int = round(canvas_height * image_ratio)
-                new_height: int = canvas_height
+        # Pour éviter que l'image se fasse garbage collecter par Tkinter.
+        return tk_image
 
-            pil_image = pil_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            x_offset: int = (canvas_width - new_width) // 2
-            y_offset: int = (canvas_height - new_height) // 2
-            tk_image = ImageTk.PhotoImage(pil_image)
-            target_canvas.create_image(x_offset, y_offset, anchor=tk.NW, image=tk_image)
+    @staticmethod
+    def is_showing_poster(vid: VideoObject, app_config: AppConfigurationObject) -> bool:
+
+        if not app_config.poster_mode or vid.playback_requested or FileDisplayer.poster_cache is None: return False
+
+        # Une vidéo dont le poster n'a pas pu être créé est lue normalement.
+        return FileDisplayer.poster_cache.request(vid.path) is not None or FileDisplayer.poster_cache.is_pending(vid.path)
+
+    @staticmethod
+    def display_video_poster(vid: VideoObject, target_canvas: tk.Canvas, app_config: AppConfigurationObject) -> ImageTk:
+
+        target_canvas.delete("all")
+
+        poster: Image.Image | None = FileDisplayer.poster_cache.request(vid.path)
+        if poster is None: return None
+
+        # Le poster resize est gardé dans le cache d'affichage, comme les images.
+        canvas_size: tuple[int, int] = (target_canvas.winfo_width(), target_canvas.winfo_height())
+        file_key: tuple | None = FileDisplayer.get_cache_key(vid.path, canvas_size, app_config.resize_mode)
+        if file_key is None:
+            FileDisplayer.display_missing_file(vid.path, target_canvas)
+            return None
+        cache_key: tuple = ('poster',) + file_key
+        cached: tuple[Image.Image, int, int] | None = FileDisplayer.display_cache.get(cache_key)
 
-        else: pass
+        if cached is None:
+            new_width, new_height, x_offset, y_offset = FileDisplayer.compute_display_geometry(poster.size, canvas_size, app_config.resize_mode)
+            cached = (poster.resize((new_width, new_height), Image.Resampling.BILINEAR), x_offset, y_offset)
+            FileDisplayer.display_cache.put(cache_key, cached, (new_width * new_height * 4))
+
+        pil_image, x_offset, y_offset = cached
+        tk_image: ImageTk.PhotoImage = FileDisplayer.get_photo_image(cache_key, pil_image)
+        target_canvas.create_image(x_offset, y_offset, anchor=tk.NW, image=tk_image)
 
         # Pour éviter que l'image se fasse garbage collecter par Tkinter.
         return tk_image
-    
+
+    @staticmethod
+    def display_video_file(vid: VideoObject, target_canvas: tk.Canvas, app_config: AppConfigurationObject) -> ImageTk:
+
+        # En poster mode, la vidéo n'est ouverte que lorsque sa lecture est demandée.
+        if FileDisplayer.is_showing_poster(vid, app_config):
+            return FileDisplayer.display_video_poster(vid, target_canvas, app_config)
+
+        canvas_size: tuple[int, int] = (target_canvas.winfo_width(), target_canvas.winfo_height())
+        new_width, new_height, x_offset, y_offset = FileDisplayer.compute_display_geometry(vid.dimension, canvas_size, app_config.resize_mode)
+
+        # Le decoder renvoie des frames déjà à la taille d'affichage, décodées dans son propre thread.
+        pil_image: Image = vid.get_current_frame((new_width, new_height))
+        if not pil_image: return FileDisplayer._video_frame_image
+
+        # Aucune nouvelle frame n'est due depuis le dernier tick : le canvas est déjà à jour.
+        frame_key: tuple = (vid.path, vid.decoder.frame_number, canvas_size)
+        if frame_key == FileDisplayer._video_frame_key and target_canvas.find_all(): return FileDisplayer._video_frame_image
+
+        # Une frame décodée avant un resize du canvas n'a pas encore la bonne taille.
+        if pil_image.size != (new_width, new_height): pil_image = pil_image.resize((new_width, new_height), Image.Resampling.BILINEAR)
+
+        # On refresh le canvas de l'image précédente.
+        target_canvas.delete("all")
+        tk_image: ImageTk.PhotoImage = ImageTk.PhotoImage(pil_image)
+        target_canvas.create_image(x_offset, y_offset, anchor=tk.NW, image=tk_image)
+        FileDisplayer._video_frame_key, FileDisplayer._video_frame_image = frame_key, tk_image
+
+        # Pour éviter que l'image se fasse garbage collecter par Tkinter.
+        return tk_image
+
+
 
 
@@ -0,0 +1,96 @@
+from src.core.file_objects import FileObject, ImageObject
+from src.scripts.file_display import FileDisplayer
+
+from concurrent.futures import ThreadPoolExecutor, Future
+from threading import RLock
+
+
+
+class FilePrefetcher:
+
+    """
+    Decodes and pre-scales the upcoming files of a sorting task on a thread pool, and stores the results in the
+    FileDisplayer display cache. Only PIL images are stored from the workers : the Tk thread then only has to convert the cached image into a PhotoImage.
+
+    Methods:
+    - prefetch(files: list[FileObject], canvas_size: tuple[int, int], resize_mode: int) -> None:
+    Schedules the decoding of the given files, cancelling the pending jobs that are not wanted anymore.
+    - prefetch_metadata(files: list[FileObject]) -> None:
+    Schedules the reading of the metadata (stat and header) of the given files that have not been read yet.
+    - shutdown() -> None: Cancels the pending jobs and stops the thread pool.
+
+    Properties:
+    - pending (int): Returns the number of jobs that are scheduled or running.
+    """
+
+    def __init__(self, max_workers: int = 2) -> None:
+
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+        self._jobs: dict[tuple, Future] = {}
+        self._metadata_jobs: dict[str, Future] = {}
+        self._lock: RLock = RLock()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def prefetch(self, files: list[FileObject], canvas_size: tuple[int, int], resize_mode: int) -> None:
+
+        # Un canvas qui n'a pas encore été affiché a une taille de 1x1, inutile de précharger quoi que ce soit.
+        if canvas_size[0] <= 1 or canvas_size[1] <= 1: return
+
+        wanted: dict[tuple, ImageObject] = {(f.path, canvas_size, resize_mode): f for f in files if isinstance(f, ImageObject)}
+
+        with self._lock:
+
+            # Les jobs qui ne concernent plus les prochains fichiers sont annulés s'ils n'ont pas encore démarré
+            # (le callback _forget les retire alors de la liste des jobs).
+            for job_id, future in list(self._jobs.items()):
+                if job_id not in wanted: future.cancel()
+
+            for job_id, img in wanted.items():
+                if job_id in self._jobs: continue
+                future: Future = self._executor.submit(self._load, img, canvas_size, resize_mode)
+                self._jobs[job_id] = future
+                future.add_done_callback(lambda _, job_id=job_id: self._forget(job_id))
+
+    def prefetch_metadata(self, files: list[FileObject]) -> None:
+
+        with self._lock:
+            for f in files:
+                # Métadonnées déjà lues (ou en cours de lecture) : rien à faire.
+                if f.has_metadata or f.path in self._metadata_jobs: continue
+                future: Future = self._executor.submit(self._load_metadata, f)
+                self._metadata_jobs[f.path] = future
+                future.add_done_callback(lambda _, fp=f.path: self._forget_metadata(fp))
+
+    @staticmethod
+    def _load_metadata(f: FileObject) -> None:
+        try: f.load_metadata()
+        except Exception as prefetch_exception:
+            print(f"[W] Impossible de lire les métadonnées du fichier @ {f.path}. (e: {prefetch_exception})")
+
+    def _forget_metadata(self, fp: str) -> None:
+        with self._lock:
+            self._metadata_jobs.pop(fp, None)
+
+    def _forget(self, job_id: tuple) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    @staticmethod
+    def _load(img: ImageObject, canvas_size: tuple[int, int], resize_mode: int) -> None:
+
+        try:
+            cache_key: tuple | None = FileDisplayer.get_cache_key(img.path, canvas_size, resize_mode)
+            if cache_key is None or FileDisplayer.display_cache.contains(cache_key): return
+            cache_key, cached, nbytes = FileDisplayer.load_scaled_image(img, canvas_size, resize_mode)
+            FileDisplayer.display_cache.put(cache_key, cached, nbytes)
+
+        # Le prefetch est opportuniste : en cas d'erreur, l'image sera simplement décodée à l'affichage.
+        except Exception as prefetch_exception:
+            print(f"[W] Impossible de précharger le fichier @ {img.path}. (e: {prefetch_exception})")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,158 @@
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue as ThreadSafeQueue, Empty
+from threading import Condition
+from collections import deque
+from send2trash import send2trash
+import shutil
+import os
+
+
+
+class FileTransferEngine:
+
+    """
+    Moves files on a background thread pool, so that moving a big file to another volume does not freeze the Tk thread.
+    A move within the same device is a simple os.rename. Otherwise the file is copied by chunks to a temporary file next
+    to the destination, its size is verified, the temporary file is renamed to the destination and the source is removed.
+    The number of concurrent transfers is limited per destination device (one slow USB drive does not block the others) :
+    the transfers beyond the limit wait in a queue of their device, and are only given to the thread pool once a slot
+    of the device is free, so that they never hold a worker that a transfer to another device could use.
+
+    Methods:
+    - submit(token: object, src: str, dst: str) -> None: Schedules the move of src to dst. The token identifies the transfer in the results.
+    - submit_trash(token: object, src: str) -> None: Schedules sending src to the trash (its result has None as destination).
+    - drain_results() -> list[tuple[object, str, str, Exception | None]]: Returns the finished transfers (token, src, dst, error) since the last call.
+    - is_busy(fp: str) -> bool: Returns True if the path is the source or the destination of a pending transfer.
+    - wait_idle() -> None: Blocks until every pending transfer is finished.
+    - shutdown() -> None: Waits for the pending transfers (queued ones included) to finish and stops the thread pool.
+
+    Properties:
+    - pending (int): Returns the number of transfers that are scheduled or running.
+    """
+
+    TRANSFER_WORKERS: int = 4
+    TRANSFERS_PER_DEVICE: int = 2
+    CHUNK_SIZE: int = 8 * 1024 * 1024
+    PARTIAL_SUFFIX: str = '.partial'
+
+    def __init__(self) -> None:
+
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=self.TRANSFER_WORKERS, thread_name_prefix='transfer')
+        self._results: ThreadSafeQueue = ThreadSafeQueue()
+        self._busy_paths: set[str] = set()
+        self._device_running: dict[int | None, int] = {}
+        self._device_queues: dict[int | None, deque[tuple[object, str, str]]] = {}
+        self._lock: Condition = Condition()
+        self._pending: int = 0
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def is_busy(self, fp: str) -> bool:
+        with self._lock:
+            return fp in self._busy_paths
+
+    def submit(self, token: object, src: str, dst: str) -> None:
+
+        device: int | None = self._destination_device(dst)
+
+        with self._lock:
+            self._pending += 1
+            self._busy_paths.update((src, dst))
+
+            # Le device est plein : le transfert attend son tour sans occuper de worker.
+            if self._device_running.get(device, 0) >= self.TRANSFERS_PER_DEVICE:
+                self._device_queues.setdefault(device, deque()).append((token, src, dst))
+                return
+
+            self._device_running[device] = self._device_running.get(device, 0) + 1
+            self._executor.submit(self._run, token, src, dst, device)
+
+    def submit_trash(self, token: object, src: str) -> None:
+
+        with self._lock:
+            self._pending += 1
+            self._busy_paths.add(src)
+
+        self._executor.submit(self._run, token, src, None, None)
+
+    @staticmethod
+    def _destination_device(dst: str) -> int | None:
+        # Un dossier de destination illisible est signalé par le transfert lui-même (son erreur est dans les résultats).
+        try: return os.stat(os.path.dirname(dst) or os.curdir).st_dev
+        except OSError: return None
+
+    def _run(self, token: object, src: str, dst: str | None, device: int | None) -> None:
+
+        error: Exception | None = None
+        try:
+            if dst is None: send2trash(os.path.normpath(src))
+            elif device is None: raise FileNotFoundError(f'[E] Le dossier de destination de {dst} est inaccessible.')
+            else: self.move(src, dst, same_device=(os.stat(src).st_dev == device))
+        except Exception as transfer_exception:
+            error = transfer_exception
+
+        # Le résultat est publié avant de réveiller wait_idle, pour qu'il soit disponible dès la fin de l'attente.
+        self._results.put((token, src, dst, error))
+
+        with self._lock:
+            self._pending -= 1
+            self._busy_paths.difference_update((src, dst))
+
+            # Le slot libéré passe au prochain transfert en attente sur le même device.
+            if dst is not None:
+                waiting: deque | None = self._device_queues.get(device)
+                if waiting:
+                    self._executor.submit(self._run, *waiting.popleft(), device)
+                    if not waiting: del self._device_queues[device]
+                else:
+                    self._device_running[device] -= 1
+                    if not self._device_running[device]: del self._device_running[device]
+
+            self._lock.notify_all()
+
+    @staticmethod
+    def move(src: str, dst: str, same_device: bool) -> None:
+
+        # Comme shutil.move, on refuse d'écraser un fichier existant (os.rename l'écraserait en silence sous Linux).
+        if os.path.exists(dst): raise FileExistsError(f'[E] Le fichier @ {dst} existe déjà.')
+
+        if same_device:
+            os.rename(src, dst)
+            return
+
+        # Copie par morceaux dans un fichier temporaire, pour ne jamais laisser un fichier tronqué à la destination.
+        partial: str = dst + FileTransferEngine.PARTIAL_SUFFIX
+        try:
+            with open(src, 'rb') as fsrc, open(partial, 'wb') as fdst:
+                shutil.copyfileobj(fsrc, fdst, FileTransferEngine.CHUNK_SIZE)
+            shutil.copystat(src, partial)
+
+            if os.path.getsize(partial) != os.path.getsize(src):
+                raise OSError(f'[E] Copie incomplète de {src} vers {dst}.')
+
+            os.replace(partial, dst)
+        except BaseException:
+            if os.path.exists(partial): os.remove(partial)
+            raise
+
+        os.remove(src)
+
+    def drain_results(self) -> list[tuple[object, str, str, Exception | None]]:
+
+        results: list[tuple[object, str, str, Exception | None]] = []
+        while True:
+            try: results.append(self._results.get_nowait())
+            except Empty: return results
+
+    def wait_idle(self) -> None:
+        with self._lock:
+            self._lock.wait_for(lambda: self._pending == 0)
+
+    def shutdown(self) -> None:
+        # Les transferts en attente sont des choix de l'utilisateur : on les termine avant de quitter (ceux en file
+        # d'attente d'un device sont soumis par les workers, le pool ne peut donc être fermé qu'une fois tout terminé).
+        self.wait_idle()
+        self._executor.shutdown(wait=True)
@@ -27,10 +27,16 @@ class FilenameManager:
         if sorting_task.is_empty(): return
 
         current: FileObject = sorting_task.get_current_file()
+
+        # En mode différé, le renommage est seulement noté, et sera appliqué avec les autres assignations.
+        if sorting_task.deferred_mode:
+            sorting_task.assign(sorting_task.index_of(current), name=new_name)
+            return
+
         current.close()  # le videocap pourrait monopoliser le fichier, donc on le ferme
         new_fp: str = os.path.join(current.dirname, new_name) + current.extension
         os.rename(current.path, new_fp)
-        current.set_new_path(new_fp)
+        sorting_task.set_file_path(current, new_fp)
 
     @staticmethod
     def rename_file_random(sorting_task: SortingTask, random_length: int) -> None:
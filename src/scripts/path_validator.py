@@ -0,0 +1,173 @@
+from src.core.path_table import PathTable
+
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from queue import Queue as ThreadSafeQueue, Empty
+from threading import Thread, Event
+from array import array
+from typing import Sequence
+import os
+
+
+
+class PathValidator:
+
+    """
+    Checks the existence of many file paths at once (e.g. when loading a task), with one os.scandir per directory
+    instead of one stat per file, the directories being listed concurrently on a thread pool. On a network share
+    (SMB, NFS), this turns one round-trip per file into one round-trip per directory.
+
+    Methods:
+    - find_missing(paths: Sequence[str]) -> list[int]: Returns the positions (in paths) of the paths that do not exist anymore, in order.
+    - list_directory(directory: str, names: list[str]) -> list[bool]: Returns, for each name, whether it exists in the directory.
+    - report_missing(missing_paths: list[str], label: str) -> None: Prints a summary of the missing paths.
+    """
+
+    VALIDATION_WORKERS: int = 16
+    REPORT_EXAMPLES: int = 5
+
+    @staticmethod
+    def list_directory(directory: str, names: list[str]) -> list[bool]:
+
+        try:
+            with os.scandir(directory or os.curdir) as entries:
+                existing: set[str] = {entry.name for entry in entries}
+
+        # Dossier disparu : tous ses fichiers manquent.
+        except (FileNotFoundError, NotADirectoryError):
+            return [False] * len(names)
+
+        # Dossier illisible (permissions, ...) : on revient à un stat par fichier.
+        except OSError:
+            return [os.path.exists(os.path.join(directory, name)) for name in names]
+
+        # Un nom absent du listing peut encore exister sur un système de fichiers insensible à la casse (Windows, macOS) :
+        # on ne vérifie donc individuellement que ceux-là, qui sont rares.
+        return [name in existing or os.path.exists(os.path.join(directory, name)) for name in names]
+
+    @staticmethod
+    def find_missing(paths: Sequence[str]) -> list[int]:
+
+        # On regroupe les fichiers par dossier, en gardant leur position dans la liste d'origine.
+        by_directory: dict[str, tuple[list[int], list[str]]] = {}
+        for position, fp in enumerate(paths):
+            directory, name = os.path.split(fp)
+            positions, names = by_directory.setdefault(directory, ([], []))
+            positions.append(position)
+            names.append(name)
+
+        missing: list[int] = []
+        with ThreadPoolExecutor(max_workers=PathValidator.VALIDATION_WORKERS, thread_name_prefix='validator') as executor:
+            results = executor.map(lambda item: PathValidator.list_directory(item[0], item[1][1]), by_directory.items())
+
+            for (positions, _), exists in zip(by_directory.values(), results):
+                missing.extend(position for position, found in zip(positions, exists) if not found)
+
+        missing.sort()
+        return missing
+
+    @staticmethod
+    def report_missing(missing_paths: list[str], label: str) -> None:
+
+        if not missing_paths: return
+
+        examples: str = ', '.join(missing_paths[:PathValidator.REPORT_EXAMPLES])
+        if len(missing_paths) > PathValidator.REPORT_EXAMPLES: examples += ', ...'
+        print(f"[W] {len(missing_paths)} {label} introuvable(s), retiré(s) de la tâche : {examples}")
+
+
+
+class PathValidationStream:
+
+    """
+    PathValidationStream checks the existence of the entries of a PathTable on a background thread (one os.scandir per
+    directory, as PathValidator), so that a loaded task can be used before all its files have been validated.
+    The directories are checked in the order of their first entry in the given indices (typically the queue order),
+    and the missing entries are made available as soon as their directory has been listed.
+
+    Methods:
+    - drain() -> list[int]: Returns the indices of the missing entries found since the last call, without blocking.
+    - cancel() -> None: Stops the validation as soon as possible.
+
+    Properties:
+    - is_done (bool): Returns True once every entry has been checked and every missing entry has been drained.
+    - checked (int): Returns the number of entries checked so far.
+    - total (int): Returns the number of entries to check.
+    - missing_paths (list[str]): Returns the paths of the missing entries found so far.
+
+    Note:
+    - The table is read from the background thread while it may change on the Tk thread (rename, move), so a missing
+    entry should be checked once again before being removed.
+    """
+
+    def __init__(self, table: PathTable, indices: array) -> None:
+
+        self._table: PathTable = table
+        self._indices: array = indices
+        self._checked: int = 0
+        self._missing: ThreadSafeQueue = ThreadSafeQueue()
+        self._missing_paths: list[str] = []
+        self._finished: Event = Event()
+        self._cancelled: Event = Event()
+
+        self._thread: Thread = Thread(target=self._run, name='path-validation', daemon=True)
+        self._thread.start()
+
+    @property
+    def is_done(self) -> bool:
+        return self._finished.is_set() and self._missing.empty()
+
+    @property
+    def checked(self) -> int:
+        return self._checked
+
+    @property
+    def total(self) -> int:
+        return len(self._indices)
+
+    @property
+    def missing_paths(self) -> list[str]:
+        return self._missing_paths
+
+    def _check_directory(self, dir_id: int, indices: array) -> list[int]:
+
+        if self._cancelled.is_set(): return []
+
+        names: list[str] = [self._table.filename(index) for index in indices]
+        exists: list[bool] = PathValidator.list_directory(self._table.dir_prefix(dir_id), names)
+        return [index for index, found in zip(indices, exists) if not found]
+
+    def _run(self) -> None:
+
+        try:
+            # Les dict gardent l'ordre d'insertion : les dossiers des premiers fichiers de la queue sont vérifiés en premier.
+            by_directory: dict[int, array] = {}
+            for index in self._indices:
+                by_directory.setdefault(self._table.dir_id(index), array('I')).append(index)
+
+            executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=PathValidator.VALIDATION_WORKERS, thread_name_prefix='validator')
+            try:
+                futures: dict[Future, int] = {
+                    executor.submit(self._check_directory, dir_id, indices): len(indices)
+                    for dir_id, indices in by_directory.items()
+                }
+                for future in as_completed(futures):
+                    if self._cancelled.is_set(): break
+                    for index in future.result():
+                        self._missing_paths.append(self._table.path(index))
+                        self._missing.put(index)
+                    self._checked += futures[future]
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        finally:
+            self._finished.set()
+
+    def drain(self) -> list[int]:
+
+        missing: list[int] = []
+        while True:
+            try: missing.append(self._missing.get_nowait())
+            except Empty: return missing
+
+    def cancel(self) -> None:
+        self._cancelled.set()
@@ -0,0 +1,123 @@
+from src.scripts.thumbnail_cache import ThumbnailCache
+
+from PIL import Image
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from threading import RLock
+import math
+import cv2
+
+
+
+class PosterCache:
+
+    """
+    Builds the posters (contact sheets) of video files on a background thread pool : POSTER_FRAMES frames sampled across
+    the duration of the video, read with one seek each, and laid out on a grid. The posters are stored in the given
+    ThumbnailCache, so that a video is only decoded once, even across sessions. The last posters are also kept in memory.
+
+    Methods:
+    - request(fp: str) -> Image.Image | None: Returns the poster of the video if it is ready, or schedules its creation and returns None.
+    - is_pending(fp: str) -> bool: Returns True while the poster of the video is being created (request returning None
+    while no job is pending means the video could not be read).
+    - prefetch(fps: list[str]) -> None: Schedules the creation of the posters of the given videos.
+    - build_poster(fp: str) -> Image.Image | None: Decodes the sampled frames of a video and returns its poster (None if the video cannot be read).
+    - shutdown() -> None: Cancels the pending jobs and stops the thread pool.
+    """
+
+    POSTER_FRAMES: int = 9
+    TILE_WIDTH: int = 480
+    MEMORY_POSTERS: int = 16
+
+    def __init__(self, thumbnail_cache: ThumbnailCache, max_workers: int = 2) -> None:
+
+        self._thumbnail_cache: ThumbnailCache = thumbnail_cache
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='poster')
+        self._jobs: dict[str, Future] = {}
+        self._posters: OrderedDict[str, Image.Image | None] = OrderedDict()
+        self._lock: RLock = RLock()
+
+    @staticmethod
+    def build_poster(fp: str) -> Image.Image | None:
+
+        video_cap: cv2.VideoCapture = cv2.VideoCapture(fp)
+        try:
+            frame_count: int = int(video_cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            width: int = int(video_cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height: int = int(video_cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if frame_count <= 0 or width <= 0 or height <= 0: return None
+
+            columns: int = math.ceil(math.sqrt(PosterCache.POSTER_FRAMES))
+            rows: int = math.ceil(PosterCache.POSTER_FRAMES / columns)
+            tile_size: tuple[int, int] = (PosterCache.TILE_WIDTH, max(1, round(PosterCache.TILE_WIDTH * height / width)))
+            poster: Image.Image = Image.new('RGB', (tile_size[0] * columns, tile_size[1] * rows))
+
+            # Une frame au milieu de chaque tranche de la vidéo : on évite ainsi la toute première (souvent noire) et la dernière.
+            for k in range(PosterCache.POSTER_FRAMES):
+                video_cap.set(cv2.CAP_PROP_POS_FRAMES, int((k + 0.5) * frame_count / PosterCache.POSTER_FRAMES))
+                ret, frame = video_cap.read()
+                if not ret: continue
+
+                frame = cv2.resize(frame, tile_size, interpolation=cv2.INTER_AREA)
+                poster.paste(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)), ((k % columns) * tile_size[0], (k // columns) * tile_size[1]))
+
+            return poster
+        finally:
+            video_cap.release()
+
+    def _load(self, fp: str) -> Image.Image | None:
+
+        try:
+            # Le poster d'un fichier modifié (ou remplacé) n'est plus valable : sa taille et son mtime font partie de la clé.
+            thumbnail_key: str = ThumbnailCache.make_key(fp, f'poster|{self.POSTER_FRAMES}|{self.TILE_WIDTH}')
+            poster: Image.Image | None = self._thumbnail_cache.get_image(thumbnail_key)
+            if poster is not None: return poster
+
+            poster = PosterCache.build_poster(fp)
+            if poster is not None: self._thumbnail_cache.put_image(thumbnail_key, poster)
+            return poster
+
+        # Le poster n'est qu'un aperçu : en cas d'erreur, la vidéo peut toujours être lue normalement.
+        except Exception as poster_exception:
+            print(f"[W] Impossible de créer le poster de la vidéo @ {fp}. (e: {poster_exception})")
+            return None
+
+    def _store(self, fp: str, future: Future) -> None:
+
+        with self._lock:
+            self._jobs.pop(fp, None)
+            if future.cancelled(): return
+
+            self._posters[fp] = future.result()
+            self._posters.move_to_end(fp)
+            while len(self._posters) > self.MEMORY_POSTERS: self._posters.popitem(last=False)
+
+    def _schedule(self, fp: str) -> None:
+
+        # Appelé avec le lock (un RLock : le callback est exécuté tout de suite si le job est déjà terminé).
+        if fp in self._posters or fp in self._jobs: return
+        future: Future = self._executor.submit(self._load, fp)
+        self._jobs[fp] = future
+        future.add_done_callback(lambda future, fp=fp: self._store(fp, future))
+
+    def request(self, fp: str) -> Image.Image | None:
+
+        with self._lock:
+            if fp in self._posters:
+                self._posters.move_to_end(fp)
+                return self._posters[fp]
+
+            self._schedule(fp)
+            return None
+
+    def is_pending(self, fp: str) -> bool:
+        with self._lock:
+            return fp in self._jobs
+
+    def prefetch(self, fps: list[str]) -> None:
+
+        with self._lock:
+            for fp in fps: self._schedule(fp)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
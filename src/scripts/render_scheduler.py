@@ -0,0 +1,75 @@
+import tkinter as tk
+from typing import Callable
+
+
+
+class RenderScheduler:
+
+    """
+    Schedules the redraws of the display canvas on the Tkinter event loop (root.after), instead of redrawing in a busy loop.
+    Redraw requests are coalesced so that several events in the same loop iteration only trigger one redraw, and a
+    frame-clock can be started to tick at a given FPS (used while a video is displayed).
+
+    Methods:
+    - request_redraw() -> None: Asks for a redraw on the next idle iteration of the Tkinter loop. Multiple requests are merged.
+    - start_frame_clock(fps: float) -> None: Starts (or restarts) the frame-clock, redrawing at the given FPS.
+    - stop_frame_clock() -> None: Stops the frame-clock if it is running.
+    - stop() -> None: Cancels every pending redraw and stops the frame-clock.
+
+    Properties:
+    - is_frame_clock_running (bool): Returns True if the frame-clock is currently ticking.
+    """
+
+    DEFAULT_FPS: float = 30.0
+    MAX_FPS: float = 120.0
+
+    def __init__(self, root: tk.Tk, redraw_callback: Callable[[], None]) -> None:
+
+        self._root: tk.Tk = root
+        self._redraw_callback: Callable[[], None] = redraw_callback
+        self._pending_redraw: str | None = None
+        self._frame_clock: str | None = None
+        self._frame_delay: int = 0
+
+    @property
+    def is_frame_clock_running(self) -> bool:
+        return self._frame_clock is not None
+
+    def request_redraw(self) -> None:
+
+        # Une requête est déjà en attente, elle sera traitée au prochain idle.
+        if self._pending_redraw is not None: return
+        self._pending_redraw = self._root.after_idle(self._on_redraw)
+
+    def _on_redraw(self) -> None:
+        self._pending_redraw = None
+        self._redraw_callback()
+
+    def start_frame_clock(self, fps: float) -> None:
+
+        # Certains fichiers renvoient un FPS nul ou absurde, on se rabat alors sur une valeur par défaut.
+        if not fps or fps <= 0 or fps > self.MAX_FPS: fps = self.DEFAULT_FPS
+        delay: int = max(1, round(1000 / fps))
+
+        if self.is_frame_clock_running and delay == self._frame_delay: return
+
+        self.stop_frame_clock()
+        self._frame_delay = delay
+        self._frame_clock = self._root.after(self._frame_delay, self._on_tick)
+
+    def stop_frame_clock(self) -> None:
+
+        if self._frame_clock is not None:
+            self._root.after_cancel(self._frame_clock)
+            self._frame_clock = None
+
+    def _on_tick(self) -> None:
+        self._frame_clock = self._root.after(self._frame_delay, self._on_tick)
+        self._redraw_callback()
+
+    def stop(self) -> None:
+
+        self.stop_frame_clock()
+        if self._pending_redraw is not None:
+            self._root.after_cancel(self._pending_redraw)
+            self._pending_redraw = None
@@ -0,0 +1,123 @@
+from src.core.sorting_task import SortingTask
+from src.core.assertion_helper import AssertionHelper
+
+from typing import Iterator
+import itertools
+import sqlite3
+import json
+import os
+
+
+
+class SQLiteTaskHelper:
+
+    """
+    A helper class for storing sorting tasks in a SQLite file, as an alternative to the YAML format.
+    Every table entry of the task is a row (path, type, state and sequence number), so that a save only has to write
+    the entries that changed since the previous one, and a load streams the rows instead of parsing one big document.
+
+    Methods:
+    - dump_task(task: SortingTask, task_path: str, incremental: bool = True) -> bool:
+    Saves the task in the SQLite file. If incremental, only the entries changed since the last save are written.
+    - load_task(task_path: str) -> SortingTask:
+    Loads a task from a SQLite file, dropping the custom categories that do not exist anymore. The existence of the files
+    is not checked here (see SortingTaskDataManager.start_path_validation).
+    - iter_rows(cursor: sqlite3.Cursor) -> Iterator[list[tuple]]:
+    Yields the rows of a query by chunks of FETCH_SIZE.
+
+    Raises:
+    - AssertionError: If the file does not have the .sqlite extension, or if its format version is not supported.
+    - sqlite3.Error: If the file cannot be read or written.
+    """
+
+    EXTENSION: str = '.sqlite'
+    FORMAT_VERSION: int = 1
+    FETCH_SIZE: int = 50000
+
+    SCHEMA: tuple[str, ...] = (
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+        "CREATE TABLE IF NOT EXISTS categories (position INTEGER PRIMARY KEY, data TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, path TEXT NOT NULL, kind INTEGER NOT NULL, state INTEGER NOT NULL, seq INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS entries_order ON entries (state, seq)",
+    )
+
+    @staticmethod
+    def iter_rows(cursor: sqlite3.Cursor) -> Iterator[list[tuple]]:
+        while rows := cursor.fetchmany(SQLiteTaskHelper.FETCH_SIZE):
+            yield rows
+
+    @staticmethod
+    def _entry_rows(task: SortingTask, indices: Iterator[int]) -> Iterator[tuple]:
+        # L'id d'une ligne est toujours l'indice de l'entrée dans la PathTable de la task.
+        for index in indices:
+            yield (index, task.table.path(index), task.table.kind(index), task.entry_state(index), task.entry_seq(index))
+
+    @staticmethod
+    def dump_task(task: SortingTask, task_path: str, incremental: bool = True) -> bool:
+
+        assert os.path.splitext(task_path)[-1] == SQLiteTaskHelper.EXTENSION, f"[E] Le fichier {os.path.basename(task_path)} n'est pas un fichier {SQLiteTaskHelper.EXTENSION}."
+
+        # Une sauvegarde incrémentale n'a de sens que dans le fichier de la dernière sauvegarde.
+        full_save: bool = not incremental or task.needs_full_save or not os.path.exists(task_path)
+
+        connection: sqlite3.Connection = sqlite3.connect(task_path)
+        try:
+            with connection:
+                for statement in SQLiteTaskHelper.SCHEMA: connection.execute(statement)
+
+                if full_save:
+                    connection.execute("DELETE FROM entries")
+                    connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?)", SQLiteTaskHelper._entry_rows(task, range(len(task.table))))
+                else:
+                    changed, new = task.get_unsaved_entries()
+                    connection.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", SQLiteTaskHelper._entry_rows(task, itertools.chain(changed, new)))
+
+                # Les catégories sont peu nombreuses, on les réécrit à chaque fois.
+                connection.execute("DELETE FROM categories")
+                connection.executemany("INSERT INTO categories VALUES (?, ?)", [
+                    (position, json.dumps(custom_category))
+                    for position, custom_category in enumerate(task.get_custom_categories(sort_by_name=False))
+                ])
+
+                connection.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                    ('format_version', str(SQLiteTaskHelper.FORMAT_VERSION)),
+                    ('init_file_count', json.dumps(task.init_file_count)),
+                ])
+        finally:
+            connection.close()
+
+        task.mark_saved()
+        return True
+
+    @staticmethod
+    def load_task(task_path: str) -> SortingTask:
+
+        AssertionHelper.verify_file_extension(task_path, SQLiteTaskHelper.EXTENSION)
+
+        connection: sqlite3.Connection = sqlite3.connect(task_path)
+        try:
+            meta: dict[str: str] = dict(connection.execute("SELECT key, value FROM meta"))
+            assert int(meta.get('format_version', 0)) == SQLiteTaskHelper.FORMAT_VERSION, f"[E] Version de fichier de tâche non supportée @ {task_path}."
+
+            custom_categories: list[dict] = [json.loads(data) for (data,) in connection.execute("SELECT data FROM categories ORDER BY position")]
+            task: SortingTask = SortingTask(files=None, reviewed_files=None, custom_categories=[c for c in custom_categories if os.path.exists(c['path'])])
+
+            # Les lignes sont lues par paquets, dans l'ordre des ids (= indices de la PathTable).
+            for rows in SQLiteTaskHelper.iter_rows(connection.execute("SELECT path, kind, state, seq FROM entries ORDER BY id")):
+                paths, kinds, states, seqs = zip(*rows)
+                task.load_entries(list(paths), bytes(kinds), bytes(states), seqs)
+
+            # L'ordre de la queue et du stack vient de l'index (state, seq).
+            pending: list[int] = [index for (index,) in connection.execute("SELECT id FROM entries WHERE state = ? ORDER BY seq", (SortingTask.STATE_PENDING,))]
+            reviewed: list[int] = [index for (index,) in connection.execute("SELECT id FROM entries WHERE state = ? ORDER BY seq", (SortingTask.STATE_REVIEWED,))]
+            task.load_order(pending, reviewed)
+        finally:
+            connection.close()
+
+        task.mark_saved()
+
+        init_file_count: int | None = json.loads(meta.get('init_file_count', 'null'))
+        if init_file_count: task.set_init_file_count(init_file_count)
+        task.set_path(task_path)
+
+        return task
@@ -1,6 +1,10 @@
 
 
 
+import re
+
+
+
 class StringMatchHelper:
 
     """
@@ -15,27 +19,14 @@ class StringMatchHelper:
     string to match, ignoring case.
     """
 
-    @staticmethod
-    def split_string(string: str) -> str:
-
-        ret: list[str] = []
-        current_word: str = ''
+    IGNORED_CHARACTERS: re.Pattern = re.compile(r'[.\'"-]')
+    DELIMITERS: re.Pattern = re.compile(r'[ _()]+')
 
-        for char in string:
-
-            if char in {' ', '_', '(', ')'}:
-                if current_word:
-                    ret.append(current_word)
-                    current_word = ''
-
-            elif char in {'.', '\'', '"', '-'}:
-                pass
-            
-            else: current_word += char
-
-        if current_word: ret.append(current_word)
+    @staticmethod
+    def split_string(string: str) -> list[str]:
 
-        return ret
+        # Les caractères ignorés sont retirés avant le découpage, les délimiteurs consécutifs ne donnent pas de mot vide.
+        return [word for word in StringMatchHelper.DELIMITERS.split(StringMatchHelper.IGNORED_CHARACTERS.sub('', string)) if word]
 
     @staticmethod
     def string_match(string_to_match: str, target_string: str) -> bool:
@@ -2,10 +2,14 @@
 
 from src.scripts.task_object_manager import SortingTaskObjectManager
 from src.core.sorting_task import SortingTask
-from src.core.file_objects import FileObject
-from src.scripts.crawler import Crawler
+from src.scripts.sqlite_task_helper import SQLiteTaskHelper
+from src.scripts.crawler import Crawler, CrawlStream
+from src.scripts.path_validator import PathValidator, PathValidationStream
+from src.scripts.task_journal import TaskJournal
 
 from tkinter import filedialog
+from array import array
+from itertools import islice
 import os
 
 
@@ -16,21 +20,40 @@ class SortingTaskDataManager:
     A manager class for creating, loading, and saving sorting tasks.
 
     Methods:
-    - create_task(task_path: str, selected_ext: list[str], local_mode: bool, shuffle_mode: bool, config_folder: str) -> SortingTask:
-    Creates a new sorting task by crawling a specified folder for files of selected extensions.
+    - create_task(task_path: str, selected_ext: list[str], local_mode: bool, shuffle_mode: bool, config_folder: str,
+        include_patterns: list[str] | None = None, exclude_patterns: list[str] | None = None) -> SortingTask:
+    Creates a new sorting task by crawling a specified folder for files of selected extensions. The task is returned as soon as
+    the first files are found, the crawl going on in the background (see feed_task).
+    - feed_task(task: SortingTask, valid_ext: dict[str: frozenset[str]], max_items: int) -> bool:
+    Moves the files found by the background crawl into the task, returning True while the crawl is still going on.
     - load_task(supported_extension_fp: str) -> SortingTask:
-    Loads a sorting task from a YAML file selected by the user.
+    Loads a sorting task from a task file (SQLite or YAML) selected by the user, replaying its journal if the previous session crashed.
+    The task is returned as soon as its first files have been validated, the other ones being validated in the background (see validate_task).
+    - start_path_validation(task: SortingTask) -> None:
+    Checks the first files of the task right away, and starts checking the other ones in the background.
+    - validate_task(task: SortingTask) -> bool:
+    Removes from the task the missing files found by the background validation, returning True while it is still going on.
     - save_task(task: SortingTask, task_fp: str) -> bool:
-    Saves the current sorting task to a specified file path, returning the success status.
+    Saves the current sorting task to a specified file path, returning the success status. SQLite task files are saved
+    incrementally (only what changed since the last save), YAML task files are entirely rewritten. The task journal is then emptied.
+    - attach_journal(task: SortingTask) -> TaskJournal:
+    Starts journaling the operations done on a saved task (see TaskJournal), returning the journal.
     - save_as_task(task: SortingTask) -> bool:
     Opens a dialog for the user to specify a file path to save the current sorting task.
     """
 
+    HEAD_VALIDATION_COUNT: int = 64
+    TASK_FILETYPES: list[tuple[str, str]] = [("SQLite task files", "*.sqlite"), ("YAML files", "*.yaml")]
+
     @staticmethod
-    def create_task(task_path: str, selected_ext: list[str], local_mode: bool, shuffle_mode: bool, config_folder: str) -> SortingTask:
+    def create_task(task_path: str, selected_ext: list[str], local_mode: bool, shuffle_mode: bool, config_folder: str,
+        include_patterns: list[str] | None = None, exclude_patterns: list[str] | None = None) -> SortingTask:
+
+        crwl: Crawler = Crawler(*selected_ext, include_patterns=include_patterns, exclude_patterns=exclude_patterns)
+        stream: CrawlStream = crwl.stream_folder(task_path, local_only=local_mode, shuffle=shuffle_mode)
 
-        crwl: Crawler = Crawler(*selected_ext)
-        files: list[FileObject] = crwl.crawl_folder(task_path, local_only=local_mode, shuffle=shuffle_mode)
+        # On n'attend que les premiers fichiers, le reste du crawl est ajouté à la task au fur et à mesure (feed_task).
+        files: list[str] = stream.wait_first()
         task: SortingTask = SortingTaskObjectManager.create_task_object(
             files=files,
             reviewed_files=None,
@@ -40,37 +63,122 @@ class SortingTaskDataManager:
             task_path=None)
 
         task.set_init_file_count(task.size)
-        
+        task.set_file_feed(stream)
+
         return task
 
+    @staticmethod
+    def feed_task(task: SortingTask, valid_ext: dict[str: frozenset[str]], max_items: int) -> bool:
+
+        stream: CrawlStream = task.file_feed
+        if not stream: return False
+
+        files: list[str] = stream.drain(max_items)
+        added: int = SortingTaskObjectManager.enqueue_files(task, files, valid_ext)
+        task.set_init_file_count((task.init_file_count or 0) + added)
+
+        if not stream.is_done: return True
+
+        # Les batches n'ont été mélangés qu'entre eux, on mélange donc une dernière fois toute la queue
+        # (sauf le fichier courant, déjà affiché).
+        if stream.shuffle: task.shuffle(keep_head=True)
+        task.set_file_feed(None)
+        return False
+
     @staticmethod
     def load_task(supported_extension_fp: str) -> SortingTask:
 
         file_path: str = filedialog.askopenfilename(
             title="Select a file",
-            filetypes=[("YAML files", "*.yaml")]
+            filetypes=[("Task files", "*.sqlite *.yaml")] + SortingTaskDataManager.TASK_FILETYPES
         )
 
-        if file_path: return SortingTaskObjectManager.load_task_data(file_path, supported_extension_fp)
+        if not file_path: return None
+
+        if os.path.splitext(file_path)[-1] == SQLiteTaskHelper.EXTENSION: task: SortingTask = SQLiteTaskHelper.load_task(file_path)
+        else: task: SortingTask = SortingTaskObjectManager.load_task_data(file_path, supported_extension_fp)
+
+        # Le journal est rejoué avant la validation : ses opérations portent sur l'état sauvegardé de la task. Il est
+        # ensuite rattaché avant la validation, pour que les fichiers qu'elle retire soient journalisés eux aussi
+        # (les opérations suivantes seront rejouées sur une task dans le même état).
+        replayed: int = TaskJournal.replay(task, file_path)
+        if replayed: print(f"[W] {replayed} opération(s) non sauvegardée(s) récupérée(s) depuis le journal @ {TaskJournal.get_journal_path(file_path)}.")
+        if task.path: SortingTaskDataManager.attach_journal(task)
+
+        SortingTaskDataManager.start_path_validation(task)
+        return task
+
+    @staticmethod
+    def start_path_validation(task: SortingTask) -> None:
+
+        # Les fichiers affichés en premier (tête de la queue, derniers fichiers triés) sont vérifiés tout de suite.
+        head: list[int] = list(islice(task.files.iter_values(), SortingTaskDataManager.HEAD_VALIDATION_COUNT)) + \
+            task.reviewed_files.peek(SortingTaskDataManager.HEAD_VALIDATION_COUNT)
+        missing: list[int] = [head[i] for i in PathValidator.find_missing([task.table.path(index) for index in head])]
+        PathValidator.report_missing([task.table.path(index) for index in missing], 'fichier(s)')
+        for index in missing: task.remove_entry(index)
+
+        # Le reste est vérifié en arrière-plan, dans l'ordre de la queue.
+        checked: set[int] = set(head)
+        tail: array = array('I', (index for index in task.files.iter_values() if index not in checked))
+        tail.extend(index for index in task.reviewed_files.iter_values() if index not in checked)
+        if tail: task.set_path_validation(PathValidationStream(task.table, tail))
+
+    @staticmethod
+    def validate_task(task: SortingTask) -> bool:
+
+        validation: PathValidationStream = task.path_validation
+        if not validation: return False
+
+        # Le thread de validation lit la table pendant qu'elle peut changer (renommage, déplacement) : on revérifie donc
+        # chaque fichier manquant avant de le retirer.
+        for index in validation.drain():
+            if not os.path.exists(task.table.path(index)): task.remove_entry(index)
+
+        if not validation.is_done: return True
+
+        PathValidator.report_missing(validation.missing_paths, 'fichier(s)')
+        task.set_path_validation(None)
+        return False
 
     @staticmethod
     def save_task(task: SortingTask, task_fp: str) -> bool:
 
         if not task_fp: return SortingTaskDataManager.save_as_task(task)
 
-        filename: str = os.path.basename(task_fp)
-        dirname: str = os.path.dirname(task_fp)
-        status: bool = SortingTaskObjectManager.dump_task_data(task, dirname, filename)
+        # Le format SQLite n'écrit que les changements, à condition de sauvegarder dans le même fichier que la dernière fois.
+        if os.path.splitext(task_fp)[-1] == SQLiteTaskHelper.EXTENSION:
+            status: bool = SQLiteTaskHelper.dump_task(task, task_fp, incremental=(task.path == task_fp))
+        else:
+            filename: str = os.path.basename(task_fp)
+            dirname: str = os.path.dirname(task_fp)
+            status: bool = SortingTaskObjectManager.dump_task_data(task, dirname, filename)
+
         task.set_path(task_fp)
+
+        # Le fichier de la task contient maintenant toutes les opérations : on vide le journal (ou on en démarre un
+        # nouveau, à côté du nouveau fichier, pour un save as).
+        if status:
+            if task.journal and task.journal.task_path == task_fp: task.journal.reset()
+            else:
+                if task.journal: task.journal.discard()
+                SortingTaskDataManager.attach_journal(task)
+
         return status
 
+    @staticmethod
+    def attach_journal(task: SortingTask) -> TaskJournal:
+        journal: TaskJournal = TaskJournal(task.path)
+        task.set_journal(journal)
+        return journal
+
     @staticmethod
     def save_as_task(task: SortingTask) -> bool:
   
         file_path: str = filedialog.asksaveasfilename(
-            title="Save YAML file",
-            defaultextension=".yaml",
-            filetypes=[("YAML files", "*.yaml")]
+            title="Save task file",
+            defaultextension=SQLiteTaskHelper.EXTENSION,
+            filetypes=SortingTaskDataManager.TASK_FILETYPES
         )
 
         # Une fois qu'on a un PATH, il s'agit d'un dump normal.
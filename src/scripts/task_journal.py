@@ -0,0 +1,191 @@
+from src.core.sorting_task import SortingTask
+
+import json
+import time
+import os
+
+
+
+class TaskJournal:
+
+    """
+    An append-only journal of the operations done on a saved SortingTask (files added by a crawl still running, dequeue,
+    restore, rename/move, trash, shuffle, requeue),
+    written next to the task file (<task file>.journal). Each operation is one JSON line, flushed right away and fsync'd
+    by batches, so that a crash only loses the last few operations. The journal is replayed when the task is loaded,
+    and emptied (compacted) each time the task file is saved.
+
+    The first line of the journal records the size and mtime of the task file it applies to : a journal left behind
+    by a save that did not reset it is considered stale and ignored.
+
+    Methods:
+    - record(op: dict) -> None: Appends an operation to the journal.
+    - sync() -> None: Forces the pending operations to disk.
+    - reset() -> None: Empties the journal, after the task file has been saved.
+    - close() -> None: Syncs and closes the journal file.
+    - discard() -> None: Closes and deletes the journal file.
+    - get_journal_path(task_path: str) -> str: Returns the journal path of a task file.
+    - replay(task: SortingTask, task_path: str) -> int: Applies the journal of a task file to the freshly loaded task, returning the number of operations applied.
+
+    Properties:
+    - task_path (str): Returns the path of the task file of the journal.
+    - count (int): Returns the number of operations in the journal.
+    """
+
+    EXTENSION: str = '.journal'
+    FSYNC_BATCH: int = 32
+    FSYNC_INTERVAL: float = 1.0
+
+    def __init__(self, task_path: str) -> None:
+
+        self._task_path: str = task_path
+        self._count: int = 0
+        self._unsynced: int = 0
+        self._last_sync: float = time.monotonic()
+
+        # Un journal valide (crash précédent, déjà rejoué au load) est complété. Sinon, on en démarre un nouveau.
+        header, operations = TaskJournal._read(task_path)
+        if header is not None and header == TaskJournal._task_file_stamp(task_path):
+            self._count = len(operations)
+            self._file = open(TaskJournal.get_journal_path(task_path), 'a', encoding='utf-8')
+        else:
+            self._file = open(TaskJournal.get_journal_path(task_path), 'w', encoding='utf-8')
+            self._write_header()
+
+    @property
+    def task_path(self) -> str:
+        return self._task_path
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @staticmethod
+    def get_journal_path(task_path: str) -> str:
+        return task_path + TaskJournal.EXTENSION
+
+    @staticmethod
+    def _task_file_stamp(task_path: str) -> dict | None:
+        try: stat: os.stat_result = os.stat(task_path)
+        except OSError: return None
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    @staticmethod
+    def _read(task_path: str) -> tuple[dict | None, list[dict]]:
+
+        try:
+            with open(TaskJournal.get_journal_path(task_path), 'r', encoding='utf-8') as f:
+                lines: list[str] = f.read().splitlines()
+        except OSError:
+            return None, []
+
+        # La dernière ligne peut avoir été coupée par le crash : on s'arrête à la première ligne illisible.
+        records: list[dict] = []
+        for line in lines:
+            try: records.append(json.loads(line))
+            except ValueError: break
+
+        if not records: return None, []
+        return records[0].get('task'), records[1:]
+
+    def _write_header(self) -> None:
+        self._file.write(json.dumps({'task': TaskJournal._task_file_stamp(self.task_path)}) + '\n')
+        self._file.flush()
+        self.sync()
+
+    def record(self, op: dict) -> None:
+
+        self._file.write(json.dumps(op) + '\n')
+        self._file.flush()
+        self._count += 1
+        self._unsynced += 1
+
+        if self._unsynced >= self.FSYNC_BATCH or time.monotonic() - self._last_sync >= self.FSYNC_INTERVAL:
+            self.sync()
+
+    def sync(self) -> None:
+
+        if self._file.closed: return
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def reset(self) -> None:
+        self._file.close()
+        self._file = open(TaskJournal.get_journal_path(self.task_path), 'w', encoding='utf-8')
+        self._count = 0
+        self._write_header()
+
+    def close(self) -> None:
+        if self._file.closed: return
+        self.sync()
+        self._file.close()
+
+    def discard(self) -> None:
+
+        self._file.close()
+        try: os.remove(TaskJournal.get_journal_path(self.task_path))
+        except OSError: pass
+
+    @staticmethod
+    def _find_index(task: SortingTask, fp: str, lookup: dict[str, int]) -> int | None:
+
+        # Les opérations portent presque toujours sur le fichier courant ou le dernier fichier trié.
+        for index in (task.files.top(), task.reviewed_files.top()):
+            if index is not None and task.table.path(index) == fp: return index
+
+        # Sinon (fichier retiré par la validation, ...), on construit une seule fois un index des chemins vivants.
+        if not lookup:
+            for index in task.files.iter_values(): lookup[task.table.path(index)] = index
+            for index in task.reviewed_files.iter_values(): lookup[task.table.path(index)] = index
+
+        return lookup.get(fp)
+
+    @staticmethod
+    def replay(task: SortingTask, task_path: str) -> int:
+
+        header, operations = TaskJournal._read(task_path)
+        if header is None: return 0
+
+        if header != TaskJournal._task_file_stamp(task_path):
+            print(f"[W] Journal obsolète ignoré @ {TaskJournal.get_journal_path(task_path)}.")
+            return 0
+
+        lookup: dict[str, int] = {}
+        for op in operations:
+
+            if op['op'] == 'add':
+                task.add_files(op['paths'], bytes(op['kinds']))
+                task.set_init_file_count((task.init_file_count or 0) + len(op['paths']))
+                lookup.clear()
+
+            # Les anciens journaux ne notaient pas le chemin : on ne peut alors que rejouer par position.
+            elif op['op'] == 'dequeue' and 'path' not in op: task.dequeue_entry()
+            elif op['op'] == 'restore' and 'path' not in op: task.restore_previous_reviewed_file()
+
+            # Sinon, on rejoue sur le fichier noté, même si la task a changé entre temps (fichier retiré, ...).
+            elif op['op'] in ('dequeue', 'restore'):
+                index: int | None = TaskJournal._find_index(task, op['path'], lookup)
+                if index is None: continue
+
+                if op['op'] == 'dequeue':
+                    if task.files.top() == index: task.dequeue_entry()
+                    else: task.review_entry(index)
+                else:
+                    if task.reviewed_files.top() == index: task.restore_previous_reviewed_file()
+                    else: task.requeue_entry(index)
+
+            elif op['op'] == 'shuffle': task.shuffle(keep_head=op['keep_head'], seed=op['seed'])
+
+            elif op['op'] in ('path', 'drop', 'requeue'):
+                index: int | None = TaskJournal._find_index(task, op['old'], lookup)
+                if index is None: continue
+                lookup.pop(op['old'], None)
+
+                if op['op'] == 'drop': task.remove_entry(index)
+                elif op['op'] == 'requeue': task.requeue_entry(index)
+                else:
+                    task.set_entry_path(index, op['path'])
+                    if lookup: lookup[op['path']] = index
+
+        return len(operations)
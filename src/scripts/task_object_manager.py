@@ -2,8 +2,10 @@
 
 from src.core.sorting_task import SortingTask
 from src.core.file_objects import FileObject, VideoObject, ImageObject
+from src.core.path_table import PathTable
 from src.core.assertion_helper import AssertionHelper
 from src.scripts.yaml_helper import YAMLSafeHelper
+from src.scripts.crawler import Crawler
 
 import os
 import pathlib
@@ -18,8 +20,14 @@ class SortingTaskObjectManager:
     Methods:
     - get_file_extension(file: str) -> str:
     Returns the file extension of a given file if it exists.
-    - create_file_object(file: str, valid_ext: dict[str: list[str]]) -> FileObject:
+    - create_file_object(file: str, valid_ext: dict[str: frozenset[str]]) -> FileObject:
     Creates a FileObject based on the file extension and valid extensions.
+    - get_file_kind(file: str, valid_ext: dict[str: frozenset[str]]) -> int:
+    Returns the PathTable kind (image or video) of a file from its extension only, without touching the filesystem.
+    - load_valid_extensions(supported_ext_fp: str) -> dict[str: frozenset[str]]:
+    Loads the supported extensions YAML file, as case-folded sets of extensions.
+    - enqueue_files(task: SortingTask, files: list[str], valid_ext: dict[str: frozenset[str]]) -> int:
+    Adds the given files at the end of the task queue (no FileObject is created), returning how many were added.
     - create_task_object(
         files: list[str] = None,
         reviewed_files: list[str] = None,
@@ -32,7 +40,8 @@ class SortingTaskObjectManager:
     - dump_task_data(task: SortingTask, task_folder: str, taskname: str) -> bool:
     Saves the sorting task data to a YAML file in the specified folder.
     - load_task_data(task_path: str, supported_ext_fp: str) -> SortingTask:
-    Loads a sorting task from a YAML file and returns a SortingTask object.
+    Loads a sorting task from a YAML file and returns a SortingTask object. The existence of the files is not checked here
+    (see SortingTaskDataManager.start_path_validation).
     """
 
     @staticmethod
@@ -45,9 +54,10 @@ class SortingTaskObjectManager:
             return os.path.splitext(file)[-1]
 
     @staticmethod
-    def create_file_object(file: str, valid_ext: dict[str: list[str]]) -> FileObject:
+    def create_file_object(file: str, valid_ext: dict[str: frozenset[str]]) -> FileObject:
 
         file_ext: str = SortingTaskObjectManager.get_file_extension(file)
+        if file_ext: file_ext = file_ext.casefold()
         task_obj: FileObject = None
 
         if file_ext in valid_ext.get('image_extensions', []): task_obj = ImageObject(file)
@@ -56,6 +66,36 @@ class SortingTaskObjectManager:
 
         return task_obj
 
+    @staticmethod
+    def get_file_kind(file: str, valid_ext: dict[str: frozenset[str]]) -> int:
+
+        # Pas de stat ici : les fichiers viennent du crawler ou d'une tâche déjà validée.
+        file_ext: str = os.path.splitext(file)[-1].casefold()
+
+        if file_ext in valid_ext.get('image_extensions', []): return PathTable.KIND_IMAGE
+        elif file_ext in valid_ext.get('video_extensions', []): return PathTable.KIND_VIDEO
+        else: raise NotImplementedError(f'Unknown ext {file_ext}')
+
+    @staticmethod
+    def load_valid_extensions(supported_ext_fp: str) -> dict[str: frozenset[str]]:
+        AssertionHelper.verify_file_extension(supported_ext_fp, '.yaml')
+        supported: dict[str: list[str]] = YAMLSafeHelper.safe_load(supported_ext_fp)
+        return {category: Crawler.normalize_extensions(extensions) for category, extensions in supported.items()}
+
+    @staticmethod
+    def enqueue_files(task: SortingTask, files: list[str], valid_ext: dict[str: frozenset[str]]) -> int:
+
+        # Le type de chaque fichier ne dépend que de son extension : on le calcule une fois par extension.
+        kinds_by_ext: dict[str: int] = {}
+        kinds: bytearray = bytearray()
+        for file in files:
+            file_ext: str = file[file.rfind('.'):]
+            kind: int | None = kinds_by_ext.get(file_ext)
+            if kind is None: kind = kinds_by_ext[file_ext] = SortingTaskObjectManager.get_file_kind(file, valid_ext)
+            kinds.append(kind)
+
+        return len(task.add_files(files, kinds))
+
     @staticmethod
     def create_task_object(
         files: list[str] = None,
@@ -66,22 +106,16 @@ class SortingTaskObjectManager:
         task_path: str = None,
     ) -> SortingTask:
 
-        AssertionHelper.verify_file_extension(supported_ext_fp, '.yaml')
-        valid_ext: dict = YAMLSafeHelper.safe_load(supported_ext_fp)
+        valid_ext: dict = SortingTaskObjectManager.load_valid_extensions(supported_ext_fp)
         task: SortingTask = SortingTask(files=None, reviewed_files=None, custom_categories=custom_categories)
 
 
-        # Pour chaque file, on crée son fileobject associé, et on l'ajoute à la SortingTask si il n'est pas None.
-        if files:
-            for file in files:
-                task_obj: FileObject = SortingTaskObjectManager.create_file_object(file=file, valid_ext=valid_ext)
-                if task_obj: task.file_enqueue(task_obj)
+        # Les fichiers sont seulement ajoutés à la table de la SortingTask, leurs FileObjects seront créés à l'affichage.
+        if files: SortingTaskObjectManager.enqueue_files(task, files, valid_ext)
 
-        # Pour chaque reviewed file, on crée son fileobject associé, et on l'ajoute à la SortingTask si il n'est pas None.
         if reviewed_files:
             for reviewed_file in reviewed_files:
-                task_obj: FileObject = SortingTaskObjectManager.create_file_object(file=reviewed_file, valid_ext=valid_ext)
-                if task_obj: task.reviewed_files.push(task_obj)
+                task.add_reviewed_file(reviewed_file, SortingTaskObjectManager.get_file_kind(reviewed_file, valid_ext))
 
         if init_file_count: task.set_init_file_count(init_file_count)
         if task_path: task.set_path(task_path)
@@ -101,14 +135,10 @@ class SortingTaskObjectManager:
 
         # On récupère dans l'ordre les catégories custom crées par l'utilisateur, les
         # fichiers à trier et enfin le dernier fichier trié s'il existe.
-        for custom_category in task.get_custom_categories():
-            custom_category.pop('button_ref', None)
-            task_data['custom_categories'].append(custom_category)
-
-        for file in task.files.values:
-            task_data['files'].append(file.path)
-        for reviewed_file in task.reviewed_files.values:
-            task_data['reviewed_files'].append(reviewed_file.path)
+        task_data['custom_categories'].extend(task.get_custom_categories())
+
+        task_data['files'].extend(task.iter_file_paths())
+        task_data['reviewed_files'].extend(task.iter_reviewed_file_paths())
         
         if task.init_file_count:
             task_data['init_file_count'] = task.init_file_count
@@ -129,32 +159,18 @@ class SortingTaskObjectManager:
         AssertionHelper.verify_file_extension(task_path, '.yaml')
         task_data: dict = YAMLSafeHelper.safe_load(task_path)
 
-        valid_files: list = []
-        invalid_files: list = []
-        valid_prev_files: list = []
-        invalid_prev_files: list = []
         valid_custom_categories: list = []
         invalid_custom_categories: list = []
 
-        # On parcourt les fichiers dans les données du load .yaml et on les récupère 
-        # si les path sont encore valides (Les fichiers n'ont pas changé de place / été supprimés).
-
-        for file in task_data['files']:
-            if os.path.exists(file): valid_files.append(file)
-            else: invalid_files.append(file)
-
-        for prev_file in task_data['reviewed_files']:
-            if os.path.exists(prev_file): valid_prev_files.append(prev_file)
-            else: invalid_prev_files.append(prev_file)
-
+        # L'existence des fichiers est vérifiée après coup, en arrière-plan, pour que la tâche soit utilisable tout de suite.
         for custom_category in task_data['custom_categories']:
             if os.path.exists(custom_category['path']): valid_custom_categories.append(custom_category)
             else: invalid_custom_categories.append(custom_category)
 
         # On crée finalement la SortingTask afin de la return.
         task: SortingTask = SortingTaskObjectManager.create_task_object(
-            files=valid_files,
-            reviewed_files=valid_prev_files,
+            files=task_data['files'],
+            reviewed_files=task_data['reviewed_files'],
             custom_categories=valid_custom_categories,
             supported_ext_fp=supported_ext_fp,
             init_file_count=task_data['init_file_count'],
@@ -0,0 +1,233 @@
+from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, local
+import hashlib
+import sqlite3
+import time
+import io
+import os
+
+
+
+class ThumbnailCache:
+
+    """
+    A persistent cache of the renditions of files (display-resolution images, video posters, ...), shared by every task
+    and every session. The renditions are stored as JPEG (or PNG, for images with transparency) in a single SQLite file,
+    keyed by the path, size and mtime of the original file and by a variant string describing the rendition, so that
+    a modified file is never served from the cache. The total size of the cache is capped, the least recently used
+    renditions being evicted first.
+
+    Writes (encoding and storing, eviction, and the last access times of the cache hits, updated by batches) are done on a
+    background thread with its own connection, while each reading thread has its own connection : thanks to the WAL mode,
+    reads are never blocked by a write, and the lock only guards the counters shared by the threads.
+
+    Methods:
+    - make_key(fp: str, variant: str) -> str: Returns the cache key of a rendition of the file (stats the file).
+    - get_image(key: str) -> Image.Image | None: Returns the cached rendition, or None if it is not cached.
+    - put_image(key: str, image: Image.Image) -> None: Schedules the storage of a rendition in the cache.
+    - flush() -> None: Blocks until every scheduled write is done.
+    - close() -> None: Flushes the pending writes and closes the cache file.
+
+    Properties:
+    - path (str): Returns the path of the cache file.
+    - used_bytes (int): Returns the size of the renditions currently stored.
+    """
+
+    CACHE_PATH: str = os.path.join(os.path.expanduser('~'), '.folderflow', 'cache', 'thumbnails.sqlite')
+    MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    EVICTION_RATIO: float = 0.9
+    JPEG_QUALITY: int = 90
+
+    SCHEMA: tuple[str, ...] = (
+        "CREATE TABLE IF NOT EXISTS thumbnails (key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS thumbnails_lru ON thumbnails (last_access)",
+    )
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = MAX_BYTES) -> None:
+
+        self._path: str = path
+        self._max_bytes: int = max_bytes
+        self._used_bytes: int = 0
+        self._lock: Lock = Lock()
+        self._writer: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='thumbnail-writer')
+        self._opened: bool = False
+        self._disabled: bool = False
+
+        # Une connexion pour le writer (seul à écrire), et une connexion par thread de lecture : en WAL, les lectures
+        # ne sont jamais bloquées par les écritures, l'éviction ou les commits du writer.
+        self._write_connection: sqlite3.Connection | None = None
+        self._read_connections: list[sqlite3.Connection] = []
+        self._local: local = local()
+
+        # Dates de dernier accès en attente d'écriture (les lectures ne font aucun commit).
+        self._touched: dict[str, float] = {}
+        self._touch_scheduled: bool = False
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def used_bytes(self) -> int:
+        with self._lock:
+            return self._used_bytes
+
+    @staticmethod
+    def make_key(fp: str, variant: str) -> str:
+        stat: os.stat_result = os.stat(fp)
+        return hashlib.sha1(f'{os.path.abspath(fp)}|{stat.st_size}|{stat.st_mtime_ns}|{variant}'.encode('utf-8')).hexdigest()
+
+    def _open(self) -> bool:
+
+        # Le fichier est ouvert (et son schéma créé) au premier accès, quel que soit le thread. La connexion d'écriture
+        # n'est ensuite utilisée que par le writer (check_same_thread=False pour qu'elle puisse être créée ailleurs).
+        if self._opened: return not self._disabled
+
+        with self._lock:
+            if self._opened: return not self._disabled
+            self._opened = True
+
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._write_connection = sqlite3.connect(self.path, check_same_thread=False)
+                self._write_connection.execute("PRAGMA journal_mode=WAL")
+
+                # Un cache peut perdre ses dernières écritures en cas de crash : pas besoin d'un fsync à chaque commit.
+                self._write_connection.execute("PRAGMA synchronous=NORMAL")
+                with self._write_connection:
+                    for statement in self.SCHEMA: self._write_connection.execute(statement)
+                self._used_bytes = self._write_connection.execute("SELECT COALESCE(SUM(size), 0) FROM thumbnails").fetchone()[0]
+
+            # Le cache n'est qu'une optimisation : sans lui, les fichiers sont simplement décodés à chaque fois.
+            except sqlite3.Error as cache_exception:
+                print(f"[W] Cache de miniatures indisponible @ {self.path}. (e: {cache_exception})")
+                self._write_connection = None
+                self._disabled = True
+
+            return not self._disabled
+
+    def _read_connection(self) -> sqlite3.Connection | None:
+
+        if not self._open(): return None
+
+        connection: sqlite3.Connection | None = getattr(self._local, 'connection', None)
+        if connection is not None: return connection
+
+        # Gardée dans la liste pour être fermée par close (depuis un autre thread, d'où check_same_thread=False).
+        with self._lock:
+            if self._disabled: return None
+            try: connection = sqlite3.connect(self.path, check_same_thread=False)
+            except sqlite3.Error as cache_exception:
+                print(f"[W] Lecture impossible dans le cache de miniatures. (e: {cache_exception})")
+                return None
+            self._read_connections.append(connection)
+
+        self._local.connection = connection
+        return connection
+
+    def get_image(self, key: str) -> Image.Image | None:
+
+        connection: sqlite3.Connection | None = self._read_connection()
+        if connection is None: return None
+
+        try:
+            row: tuple | None = connection.execute("SELECT data FROM thumbnails WHERE key = ?", (key,)).fetchone()
+            if row is None: return None
+        except sqlite3.Error as cache_exception:
+            print(f"[W] Lecture impossible dans le cache de miniatures. (e: {cache_exception})")
+            return None
+
+        # La date d'accès (pour l'éviction LRU) est écrite plus tard par le writer, avec celles des autres lectures.
+        with self._lock:
+            self._touched[key] = time.time()
+            if not self._touch_scheduled:
+                try:
+                    self._writer.submit(self._write_touched)
+                    self._touch_scheduled = True
+                except RuntimeError: pass
+
+        image: Image.Image = Image.open(io.BytesIO(row[0]))
+        image.load()
+        return image
+
+    @staticmethod
+    def _encode(image: Image.Image) -> bytes:
+
+        # Le PNG garde la transparence, le JPEG est bien plus compact (et rapide à décoder) pour le reste.
+        buffer: io.BytesIO = io.BytesIO()
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            image.save(buffer, format='PNG')
+        else:
+            image.convert('RGB').save(buffer, format='JPEG', quality=ThumbnailCache.JPEG_QUALITY)
+        return buffer.getvalue()
+
+    def _store(self, key: str, image: Image.Image) -> None:
+
+        # Toujours appelé sur le writer : la connexion d'écriture n'a pas besoin du lock.
+        try:
+            data: bytes = self._encode(image)
+            if not self._open(): return
+            connection: sqlite3.Connection = self._write_connection
+
+            with connection:
+                previous: tuple | None = connection.execute("SELECT size FROM thumbnails WHERE key = ?", (key,)).fetchone()
+                connection.execute("INSERT OR REPLACE INTO thumbnails VALUES (?, ?, ?, ?)", (key, data, len(data), time.time()))
+
+            with self._lock:
+                self._used_bytes += len(data) - (previous[0] if previous else 0)
+                over_cap: bool = self._used_bytes > self._max_bytes
+            if over_cap: self._evict(connection)
+
+        except Exception as cache_exception:
+            print(f"[W] Écriture impossible dans le cache de miniatures. (e: {cache_exception})")
+
+    def _write_touched(self) -> None:
+
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._touch_scheduled = False
+
+        if not touched or not self._open(): return
+
+        try:
+            with self._write_connection:
+                self._write_connection.executemany("UPDATE thumbnails SET last_access = ? WHERE key = ?", ((t, k) for k, t in touched.items()))
+        except sqlite3.Error as cache_exception:
+            print(f"[W] Écriture impossible dans le cache de miniatures. (e: {cache_exception})")
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+
+        # On descend un peu sous le plafond, pour ne pas évincer à chaque nouvelle écriture.
+        target: int = int(self._max_bytes * self.EVICTION_RATIO)
+        with self._lock: used_bytes: int = self._used_bytes
+
+        evicted: list[str] = []
+        freed: int = 0
+        for key, size in connection.execute("SELECT key, size FROM thumbnails ORDER BY last_access"):
+            if used_bytes - freed <= target: break
+            evicted.append(key)
+            freed += size
+
+        with connection: connection.executemany("DELETE FROM thumbnails WHERE key = ?", ((key,) for key in evicted))
+        with self._lock: self._used_bytes -= freed
+
+    def put_image(self, key: str, image: Image.Image) -> None:
+
+        # Un job de prefetch peut encore terminer après la fermeture du cache (fermeture de l'app) : le rendu est alors perdu.
+        try: self._writer.submit(self._store, key, image)
+        except RuntimeError: pass
+
+    def flush(self) -> None:
+        self._writer.submit(lambda: None).result()
+
+    def close(self) -> None:
+
+        self._writer.shutdown(wait=True)
+        with self._lock:
+            self._opened, self._disabled = True, True
+            for connection in self._read_connections: connection.close()
+            self._read_connections.clear()
+            if self._write_connection is not None:
+                self._write_connection.close()
+                self._write_connection = None
@@ -1,13 +1,22 @@
-
-
 from src.core.assertion_helper import AssertionHelper
 import yaml
 
+# On utilise le loader/dumper C de libyaml quand PyYAML a été compilé avec, sinon l'implémentation Python.
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+    YAML_BACKEND: str = 'libyaml'
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+    YAML_BACKEND: str = 'python'
+    print("[W] libyaml n'est pas disponible, les fichiers YAML seront lus et écrits avec l'implémentation Python de PyYAML (plus lente).")
+
 
 class YAMLSafeHelper:
-    
+
     """
     A helper class for safely loading and dumping YAML files.
+    The libyaml C loader/dumper (CSafeLoader/CSafeDumper) is used when available, with a fallback on the pure Python ones.
+    The documents are parsed from / emitted to the file stream directly, without building the whole text in memory.
 
     Methods:
     - safe_load(yaml_filepath: str) -> dict:
@@ -16,26 +25,32 @@ class YAMLSafeHelper:
     - safe_dump(yaml_filepath: str, data: dict) -> None:
     Dumps a dictionary into a YAML file.
     Raises an error if the file extension is not .yaml or if dumping fails.
+    - get_backend() -> str:
+    Returns the active YAML backend ('libyaml' or 'python').
     """
 
+    @staticmethod
+    def get_backend() -> str:
+        return YAML_BACKEND
+
     @staticmethod
     def safe_load(yaml_filepath: str) -> dict:
 
         AssertionHelper.verify_file_extension(yaml_filepath, '.yaml')
-        
+
         try:
             with open(yaml_filepath, 'r') as f:
-                return yaml.safe_load(f)
+                return yaml.load(f, Loader=SafeLoader)
         except Exception as yaml_exception:
             raise yaml_exception(f'[E] Unknown error occurred while loading YAML file data @ {yaml_filepath}.')
-        
+
     @staticmethod
     def safe_dump(yaml_filepath: str, data: dict) -> None:
 
         AssertionHelper.verify_file_extension(yaml_filepath, '.yaml')
-        
+
         try:
             with open(yaml_filepath, 'w') as f:
-                yaml.safe_dump(data, f)
+                yaml.dump(data, f, Dumper=SafeDumper)
         except Exception as yaml_exception:
-            raise yaml_exception(f'[E] Unknown error occurred while dumping data in YAML file @ {yaml_filepath}.')
\ No newline at end of file
+            raise yaml_exception(f'[E] Unknown error occurred while dumping data in YAML file @ {yaml_filepath}.')